@@ -15,6 +15,7 @@ Attributes:
 
 Methods:
 - post(request: HttpRequest) -> None: Method to post an announcement instance.
+- broadcast() -> str: Method to email an announcement instance to every active employee.
 - archive() -> None: Method to delete an announcement instance.
 - repost() -> None: Method to re-post an announcement instance.
 
@@ -50,6 +51,7 @@ class Announcements(models.Model, ExportModelOperationsMixin("announcements")):
 
     Methods:
     - post(request: HttpRequest) -> None: Method to post an announcement instance.
+    - broadcast() -> str: Method to email an announcement instance to every active employee.
     - archive() -> None: Method to delete an announcement instance.
     - update() -> None: Method to update an announcement instance.
 
@@ -117,20 +119,37 @@ class Announcements(models.Model, ExportModelOperationsMixin("announcements")):
         Returns:
             None
 
-        This method sets the 'posted_by' attribute to the user id from the request,
-        sets the 'status' attribute to 'ACTIVE', saves the object, and logs the success or error message.
+        This method sets the 'posted_by' attribute to the user from the request,
+        sets the 'status' attribute to 'ACTIVE', saves the object, emails it to every active employee,
+        and logs the success or error message.
 
         """
         try:
-            self.posted_by = request.user.employee_id
+            self.posted_by = request.user
             self.status = "A"
             self.save()
+            self.broadcast()
             logger.success(f"Successfully posted {self.pk}")
         except Exception as e:
             if self.pk is None:
                 logger.error(f"ERROR: Unable to post - ID is unavailable - Post Contents: (message:{self.message}, Error: {e})")
             logger.error(f"ERROR: Unable to post {self.pk} - {e}")
 
+    def broadcast(self) -> str:
+        """
+        Method to email an announcement instance to every active employee.
+
+        Returns:
+            str: The campaign identifier of the bulk send. It is keyed on the announcement alone, so broadcasting it again
+                after an edit or a re-post does not re-email employees already reached.
+
+        """
+        from common.mailer import PostOffice
+
+        context = {"announcement_title": self.announcement_title, "message": self.message}
+        campaign_id = f"announcement-{self.pk}"
+        return PostOffice("HR@netthandshome.care").send_bulk("announcement", Employee.objects.filter(is_active=True), context=context, campaign_id=campaign_id)
+
     def create_draft(self, request: HttpRequest) -> None:
         """
         Method to create a draft version of an announcement instance.
@@ -35,6 +35,7 @@ def post_announcement(request: HttpRequest, pk: int) -> HttpResponse:
         new_announcement = Announcements.objects.get(id=pk)
         new_announcement.status = "A"
         new_announcement.save()
+        new_announcement.broadcast()
         return HttpResponse(status=204)
 
 
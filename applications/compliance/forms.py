@@ -2,6 +2,7 @@ from crispy_forms.bootstrap import FormActions
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import HTML, Column, Layout, Reset, Row, Submit
 from django import forms
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from applications.compliance.models import Compliance, Contract
@@ -127,6 +128,14 @@ class ComplianceForm(forms.ModelForm):
         self.helper.form_action = "/employee"
         self.helper.form_id = "profile"
         self.helper.form_method = "post"
+        if self.instance.pk is not None:
+            for field_name in Compliance.VERIFICATION_FIELDS:
+                self.fields[field_name].widget.attrs.update(
+                    {
+                        "data-presign-url": reverse("compliance:presign_verification_upload", args=[self.instance.pk]),
+                        "data-confirm-url": reverse("compliance:confirm_verification_upload", args=[self.instance.pk]),
+                    }
+                )
         self.fields["initial_idph_background_check_completion_date"].widget = forms.widgets.DateInput(
             attrs={"type": "date", "class": "form-control"},
         )
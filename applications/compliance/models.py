@@ -99,6 +99,14 @@ class Compliance(TimeStampedModel, models.Model, ExportModelOperationsMixin("com
 
     """
 
+    # NOTE: The verification files staff may upload straight to object storage (see views.presign_verification_upload).
+    VERIFICATION_FIELDS: tuple[str, ...] = (
+        "aps_check_verification",
+        "hhs_oig_exclusionary_check_verification",
+        "idph_background_check_verification",
+        "pre_training_verification",
+    )
+
     class JOB_TITLE(models.TextChoices):
         AIDE = "AIDE", _("Homecare Aide")
         COORDINATOR = "CARE_COORDINATOR", _("Care Coordinator")
@@ -1,24 +1,203 @@
-import json
+import hashlib
 import os
+import tempfile
+from typing import NamedTuple
 
-import boto3
 import pymupdf
-import requests
 from botocore.exceptions import ClientError
 from celery import shared_task
 from django.conf import settings
-from django.http import HttpResponse
+from django.core.cache import cache
 from loguru import logger
-from rest_framework import status
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from applications.employee.models import Employee
+from common.documents import (
+    DocumentDerivatives,
+    get_derivative_names,
+    get_derivatives_cache_key,
+    get_document_type,
+)
+from common.metrics import metrics
+from common.s3 import create_transfer_config, get_s3_client
+from common.upload import S3HANDLER, STREAM_CHUNK_SIZE, StreamedUpload
 
 MAIL_RETRY_MULTIPLIER = 1
 MAIL_RETRY_MIN_WAIT = 4
 MAIL_RETRY_MAX_WAIT = 10
 MAX_ATTEMPTS = stop_after_attempt(3)
 WAIT_STRATEGY = wait_exponential(multiplier=MAIL_RETRY_MULTIPLIER, min=MAIL_RETRY_MIN_WAIT, max=MAIL_RETRY_MAX_WAIT)
+INGESTION_RETRY_DELAY = 30  # seconds; doubled on every retry
+DERIVATIVE_RETRY_DELAY = 60  # seconds; doubled on every retry
+
+
+def get_docuseal_idempotency_key(docuseal_payload: dict, body: bytes) -> str:
+    """
+    Build the key identifying a DocuSeal webhook delivery, shared by every retry of the same event.
+
+    Args:
+        docuseal_payload (dict): The parsed webhook payload.
+        body (bytes): The raw request body, hashed when the payload carries no submitter id.
+
+    Returns:
+        str: The idempotency key.
+
+    """
+    if (submitter_id := docuseal_payload.get("data", {}).get("id")) is not None:
+        return f"docuseal:{docuseal_payload.get('event_type', 'form.completed')}:{submitter_id}"
+    return f"docuseal:{hashlib.sha256(body).hexdigest()}"
+
+
+def ingest_signed_document(idempotency_key: str, document: dict, object_name: str) -> StreamedUpload | None:
+    """
+    Stream one signed document into S3 unless an earlier attempt already stored it.
+
+    Args:
+        idempotency_key (str): The key of the webhook delivery.
+        document (dict): The DocuSeal document, with its `url`.
+        object_name (str): The S3 object name.
+
+    Returns:
+        StreamedUpload | None: The upload, or None if the document was already stored.
+
+    """
+    document_key = f"{idempotency_key}:{object_name}"
+    if cache.get(document_key) is not None:
+        logger.info(f"Skipping {object_name} - Already Ingested")
+        return None
+    upload = S3HANDLER.stream_to_s3(document["url"], object_name)
+    cache.set(document_key, upload.sha256 or "", timeout=settings.DOCUSEAL_IDEMPOTENCY_TTL)
+    return upload
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True)
+def ingest_signed_documents(self, docuseal_payload: dict, idempotency_key: str) -> int:
+    """
+    Stream the signed copy of a DocuSeal submission into S3 and record it on the signing employee.
+
+    The registry maps every template to a single Employee field, which records the signed copy DocuSeal delivers as the
+    submission's first document. The other documents of a submission (such as its audit log) have no field to record
+    them in, so they are not transferred. A copy already stored by an earlier attempt is not transferred again.
+
+    A submission for an unregistered template or an unknown employee can never be ingested, so it is dropped and its
+    idempotency key released. If every retry of a transfer fails, the key is released as well, so a later DocuSeal
+    retry is accepted again.
+
+    Args:
+        self: The Celery task instance.
+        docuseal_payload (dict): The webhook payload.
+        idempotency_key (str): The key of the webhook delivery, from `get_docuseal_idempotency_key`.
+
+    Returns:
+        int: The number of documents transferred by this attempt.
+
+    """
+    data = docuseal_payload["data"]
+    if (document_type := get_document_type(data["template"])) is None or not data["documents"]:
+        cache.delete(idempotency_key)
+        logger.error(f"Dropping DocuSeal Submission {idempotency_key} - No Signed Copy of a Registered Template")
+        return 0
+    try:
+        employee = Employee.objects.get(employee_id=data["external_id"])
+    except Employee.DoesNotExist:
+        cache.delete(idempotency_key)
+        logger.error(f"Dropping DocuSeal Submission {idempotency_key} - No Employee {data['external_id']}")
+        return 0
+
+    object_name = S3HANDLER.generate_filename(docuseal_payload)
+    try:
+        upload = ingest_signed_document(idempotency_key, data["documents"][0], object_name)
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            cache.delete(idempotency_key)
+        logger.warning(f"Ingestion of DocuSeal Submission {idempotency_key} Failed - Retrying: {e}")
+        raise self.retry(exc=e, countdown=INGESTION_RETRY_DELAY * 2**self.request.retries) from e
+
+    field_value = os.path.relpath(object_name, "restricted")
+    setattr(employee, document_type.employee_field, field_value)
+    employee.save(update_fields=[document_type.employee_field])
+    # NOTE: Derivatives are queued until they are stored rather than only by the attempt that transferred the document,
+    # so a retry after a failure past the transfer still queues them.
+    if cache.get(get_derivatives_cache_key(field_value)) is None:
+        generate_document_derivatives.delay(object_name)
+    transferred = int(upload is not None)
+    logger.success(f"Ingested {transferred} Signed Document for {employee.last_name}, {employee.first_name} ({idempotency_key})")
+    return transferred
+
+
+class RenderedDerivatives(NamedTuple):
+    thumbnail: bytes
+    text: str
+
+
+def render_document_derivatives(pdf: bytes | str, linearized_path: str, thumbnail_width: int) -> RenderedDerivatives:
+    """
+    Render the derivatives of a PDF in one pass over a single opened document.
+
+    Args:
+        pdf (bytes | str): The PDF, or the path of a file holding it.
+        linearized_path (str): The path to write the linearized PDF to.
+        thumbnail_width (int): The width of the first-page thumbnail, in pixels.
+
+    Returns:
+        RenderedDerivatives: The first-page PNG thumbnail and the text of every page.
+
+    """
+    with pymupdf.open(pdf) if isinstance(pdf, str) else pymupdf.open(stream=pdf, filetype="pdf") as document:
+        first_page = document[0]
+        scale = thumbnail_width / first_page.rect.width
+        thumbnail = first_page.get_pixmap(matrix=pymupdf.Matrix(scale, scale), alpha=False).tobytes("png")
+        text = "\f".join(page.get_text() for page in document)
+        document.save(linearized_path, garbage=3, deflate=True, linear=True)
+    return RenderedDerivatives(thumbnail, text)
+
+
+@shared_task(bind=True, max_retries=3, acks_late=True)
+def generate_document_derivatives(self, object_name: str, bucket: str = settings.AWS_STORAGE_BUCKET_NAME) -> DocumentDerivatives:
+    """
+    Store a linearized copy, a first-page thumbnail and the extracted text of a signed document next to it in S3.
+
+    Documents up to `DOCUMENT_DERIVATIVE_SPOOL_MAX_SIZE` are rendered from memory; larger ones are spooled to a temporary
+    file in chunks and rendered from there. The linearized copy is written to disk and uploaded with the S3 transfer
+    settings, so large copies are sent in multipart parts. The derivative names are derived from the document's, so a
+    retry overwrites rather than duplicates them. Once all three are stored, the document is marked in the cache so
+    `ComplianceProfileDetailView` shows its thumbnail.
+
+    Args:
+        self: The Celery task instance.
+        object_name (str): The S3 object name of the signed PDF.
+        bucket (str): The bucket holding the document.
+
+    Returns:
+        DocumentDerivatives: The object names of the stored derivatives.
+
+    """
+    derivatives = get_derivative_names(object_name)
+    try:
+        s3_client = get_s3_client()
+        with tempfile.TemporaryDirectory() as directory:
+            document = s3_client.get_object(Bucket=bucket, Key=object_name)
+            size = document["ContentLength"]
+            if size <= settings.DOCUMENT_DERIVATIVE_SPOOL_MAX_SIZE:
+                pdf = document["Body"].read()
+            else:
+                pdf = os.path.join(directory, "document.pdf")
+                with open(pdf, "wb") as file:
+                    for chunk in document["Body"].iter_chunks(STREAM_CHUNK_SIZE):
+                        file.write(chunk)
+            linearized_path = os.path.join(directory, "linearized.pdf")
+            rendered = render_document_derivatives(pdf, linearized_path, settings.DOCUMENT_THUMBNAIL_WIDTH)
+            linearized_size = os.path.getsize(linearized_path)
+            if not S3HANDLER.upload_file_to_s3(linearized_path, bucket=bucket, object_name=derivatives.linearized, content_type="application/pdf"):
+                raise RuntimeError(f"Uploading {derivatives.linearized} Failed")
+        s3_client.put_object(Bucket=bucket, Key=derivatives.thumbnail, Body=rendered.thumbnail, ContentType="image/png")
+        s3_client.put_object(Bucket=bucket, Key=derivatives.text, Body=rendered.text.encode(), ContentType="text/plain; charset=utf-8")
+    except Exception as e:
+        logger.warning(f"Generating Derivatives of {object_name} Failed - Retrying: {e}")
+        raise self.retry(exc=e, countdown=DERIVATIVE_RETRY_DELAY * 2**self.request.retries) from e
+    cache.set(get_derivatives_cache_key(os.path.relpath(object_name, "restricted")), True, timeout=None)
+    logger.success(f"Stored Derivatives of {object_name} - {size} -> {linearized_size} bytes linearized, {len(rendered.thumbnail)} bytes thumbnail")
+    return derivatives
 
 
 @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
@@ -42,87 +221,14 @@ def upload_file_to_s3(file_name, bucket=settings.AWS_STORAGE_BUCKET_NAME, object
         object_name = os.path.basename(file_name)
 
     # Upload the file
-    s3_client = boto3.client("s3")
     try:
-        s3_client.upload_file(file_name, bucket, object_name)
+        get_s3_client().upload_file(file_name, bucket, object_name, Callback=metrics.increment_s3_upload_bytes, Config=create_transfer_config())
         return True
     except ClientError as e:
         logger.error(e)
         return False
 
 
-@retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
-@shared_task(
-    bind=True,
-    serializer="json",
-)
-def process_signed_form(self, docseal_payload: dict) -> HttpResponse:
-    """
-    Process a signed form by downloading the document, saving it locally, and uploading it to object storage.
-
-    Args:
-        self: The celery task instance
-        docseal_payload (dict): A dictionary containing information about the signed form.
-
-    Returns:
-        HttpResponse: An HTTP response indicating the success or failure of the process.
-
-    Raises:
-        requests.RequestException: If there is an issue with downloading the file.
-        Exception: If there is a general error during the process.
-
-    """
-    if not isinstance(docseal_payload, dict):
-        docseal_payload = json.loads(docseal_payload)
-
-    try:
-        # Use dictionary unpacking to reduce repeated key access
-        document_data = docseal_payload["documents"]
-        employee_data = docseal_payload["data"]
-
-        document_type = document_data["name"].split("_")[0]
-        employee = Employee.objects.select_related("last_name", "first_name").get(employee_id=employee_data["external_id"])
-
-        # Use f-strings for more efficient string formatting
-        pre_file = f"{document_type}/{document_type}-{employee.last_name}_{employee.first_name}.pdf"
-        file_name = f"attestations/{document_type}/{document_data['name'].split('_')[0]}-{employee.last_name}_{employee.first_name}.pdf"
-
-        # Use the `requests` library's built-in error handling
-        response = requests.get(document_data["submission"]["url"], timeout=10)
-
-        response.raise_for_status()  # Raise an exception for bad status codes
-
-        with open(file_name, "wb") as file:
-            file.write(response.content)
-
-        logger.info("File downloaded successfully!")
-
-        # Use `pymupdf` more efficiently by avoiding unnecessary file I/O
-        with pymupdf.open(pre_file) as doc:
-            doc.save(file_name, linear=True)
-            if upload_file_to_s3(file_name=file_name):
-                logger.success(
-                    f"SUCCESS: PROCESSED SIGNED {document_type} for {employee.last_name}, {employee.first_name.split()[0]} - signed form persisted in object storage",
-                    status=status.HTTP_201_CREATED,
-                )
-                return HttpResponse(
-                    content=f"SUCCESS: PROCESSED SIGNED {document_type} for {employee.last_name}, {employee.first_name.split()[0]} - signed form persisted in object storage",
-                    status=status.HTTP_201_CREATED,
-                )
-            else:
-                logger.error()
-                return HttpResponse(
-                    content=f"FAILED: UNABLE T PROCESSED SIGNED {document_type} for {employee.last_name}, {employee.first_name.split()[0]} - signed form persisted in object storage",
-                    status=status.HTTP_201_CREATED,
-                )
-    except requests.RequestException as e:
-        logger.warning("Failed to download the file.")
-        return HttpResponse(content=f"ERROR: FAILED TO PROCESS SIGNED {document_type} for {employee.last_name}, {employee.first_name.split()[0]} - {e}", status=status.HTTP_417_EXPECTATION_FAILED)
-    except Exception as e:
-        logger.exception(e)
-        return HttpResponse(content=f"ERROR: FAILED TO PROCESS SIGNED {document_type} for {employee.last_name}, {employee.first_name.split()[0]} - {e}", status=status.HTTP_417_EXPECTATION_FAILED)
-
-
 @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
 @shared_task(
     bind=True,
@@ -0,0 +1,51 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from applications.compliance.models import Contract
+from common.managers import CachedRows, pack_rows, unpack_rows
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class RowPackingTestCase(TestCase):
+    def test_round_trip_preserves_non_native_types(self):
+        row = (1, "IDOA", datetime.date(2024, 7, 1), datetime.datetime(2024, 7, 1, 12, 30), Decimal("12.50"), None, True)
+        field_names, rows = unpack_rows(pack_rows(["a", "b", "c", "d", "e", "f", "g"], [row]))
+        self.assertEqual(field_names, ["a", "b", "c", "d", "e", "f", "g"])
+        self.assertEqual(tuple(rows[0]), row)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedQuerySetTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        Contract.objects.create(code="IDOA", name="Department on Aging", contract_year_start=datetime.date(2024, 7, 1), active=True)
+        Contract.objects.create(code="DHS", name="Department of Human Services", active=False)
+
+    def test_filters_are_cached_under_separate_keys(self):
+        active = Contract.objects.queryset_from_cache({"active": True})
+        inactive = Contract.objects.queryset_from_cache({"active": False})
+        self.assertEqual([contract.code for contract in active], ["IDOA"])
+        self.assertEqual([contract.code for contract in inactive], ["DHS"])
+
+    def test_cache_hit_skips_database_and_rehydrates_instances(self):
+        Contract.objects.queryset_from_cache({"active": True})
+        with self.assertNumQueries(0):
+            contracts = Contract.objects.queryset_from_cache({"active": True})
+        self.assertIsInstance(contracts, CachedRows)
+        self.assertIsInstance(contracts[0], Contract)
+        self.assertEqual(contracts[0].contract_year_start, datetime.date(2024, 7, 1))
+
+    def test_save_invalidates_cached_rows(self):
+        Contract.objects.queryset_from_cache({"active": True})
+        Contract.objects.create(code="HFS", name="Healthcare and Family Services", active=True)
+        self.assertEqual(len(Contract.objects.queryset_from_cache({"active": True})), 2)
+
+    @override_settings(QUERYSET_CACHE_MAX_ROWS=1)
+    def test_oversized_result_is_not_cached(self):
+        Contract.objects.queryset_from_cache()
+        with self.assertNumQueries(1):
+            self.assertEqual(len(Contract.objects.queryset_from_cache()), 2)
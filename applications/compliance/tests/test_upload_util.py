@@ -0,0 +1,237 @@
+import hashlib
+import io
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+
+import boto3
+import pymupdf
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import ANY, Stubber
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from applications.compliance.tasks import generate_document_derivatives
+from common import s3
+from common.documents import (
+    get_derivatives_cache_key,
+    get_document_registry,
+    get_document_type,
+)
+from common.metrics import metrics
+from common.upload import S3HANDLER, FileValidationError, UploadHandler
+
+PART_SIZE = 5 * 1024 * 1024
+
+
+class S3ClientTestCase(SimpleTestCase):
+    def setUp(self):
+        self.addCleanup(setattr, s3, "_s3_client", s3._s3_client)
+        self.addCleanup(setattr, s3, "_s3_client_pid", s3._s3_client_pid)
+        s3._s3_client = None
+        s3._s3_client_pid = None
+
+    def test_client_is_shared_across_threads_and_handlers(self):
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(s3.get_s3_client())) for _ in range(8)]
+        with mock.patch.object(s3, "create_s3_client", side_effect=lambda: object()) as create_s3_client:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertIs(UploadHandler("resume").s3_client, clients[0])
+        self.assertEqual(create_s3_client.call_count, 1)
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+    def test_client_is_recreated_after_fork(self):
+        with mock.patch.object(s3, "create_s3_client", side_effect=lambda: object()):
+            parent_client = s3.get_s3_client()
+            with mock.patch.object(s3.os, "getpid", return_value=s3._s3_client_pid + 1):
+                child_client = s3.get_s3_client()
+        self.assertIsNot(parent_client, child_client)
+
+    @override_settings(S3_MULTIPART_THRESHOLD=PART_SIZE, S3_MULTIPART_PART_SIZE=PART_SIZE, S3_MAX_CONCURRENCY=64, AWS_S3_MAX_POOL_CONNECTIONS=25)
+    def test_file_uploads_use_the_transfer_settings_and_count_progress(self):
+        client = mock.Mock()
+        with tempfile.NamedTemporaryFile() as file, mock.patch("common.upload.get_s3_client", return_value=client):
+            self.assertTrue(S3HANDLER.upload_file_to_s3(file.name, bucket="bucket", object_name="resume.pdf"))
+        transfer_config = client.upload_file.call_args.kwargs["Config"]
+        self.assertEqual((transfer_config.multipart_threshold, transfer_config.multipart_chunksize, transfer_config.max_concurrency), (PART_SIZE, PART_SIZE, 25))
+        self.assertEqual(client.upload_file.call_args.kwargs["Callback"], metrics.increment_s3_upload_bytes)
+
+
+class DocumentRegistryTestCase(SimpleTestCase):
+    def setUp(self):
+        get_document_registry.cache_clear()
+        self.addCleanup(get_document_registry.cache_clear)
+
+    def test_templates_resolve_by_id_then_by_name(self):
+        self.assertEqual(get_document_type({"id": 91067, "name": "Renamed I-9"}).employee_field, "dhs_i9")
+        self.assertEqual(get_document_type({"id": None, "name": "US Internal Revenue Services - Withholding Certificate (W4) - 2024"}).employee_field, "irs_w4_attestation")
+        self.assertIsNone(get_document_type({"id": 1, "name": "Unregistered"}))
+        payload = {"data": {"template": {"id": 91067, "name": "Renamed I-9"}, "metadata": {"first_name": "Jane", "last_name": "Doe"}}}
+        self.assertEqual(S3HANDLER.generate_filename(payload, 1), "restricted/attestations/dha_i9/dhs_i9_doe_jane-2.pdf")
+
+    def test_new_template_is_configuration(self):
+        document_types = [{"template_id": 1, "template_name": "Handbook", "doc_type": "handbook", "employee_field": "job_duties_attestation", "s3_prefix": "restricted/handbooks"}]
+        with override_settings(DOCUSEAL_DOCUMENT_TYPES=document_types):
+            self.assertEqual(S3HANDLER.get_doc_type(1), "handbook")
+            self.assertEqual(get_document_type({"id": 1}).s3_prefix, "restricted/handbooks")
+
+    def test_unknown_employee_field_is_rejected(self):
+        document_types = [{"template_id": 1, "template_name": "Handbook", "doc_type": "handbook", "employee_field": "handbook_attestation"}]
+        with override_settings(DOCUSEAL_DOCUMENT_TYPES=document_types), self.assertRaises(ImproperlyConfigured):
+            get_document_registry()
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    body = b""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@override_settings(S3_MULTIPART_PART_SIZE=PART_SIZE)
+class StreamToS3TestCase(SimpleTestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), DocumentHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/document.pdf"
+        self.client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        patcher = mock.patch("common.upload.get_s3_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def serve(self, body: bytes) -> None:
+        DocumentHandler.body = body
+
+    def test_large_document_is_streamed_in_parts(self):
+        body = bytes(range(256)) * (11 * 1024 * 1024 // 256)
+        self.serve(body)
+        self.stubber.add_response("create_multipart_upload", {"UploadId": "upload-1"}, {"Bucket": "bucket", "Key": "signed.pdf", "ContentType": "application/pdf"})
+        for part_number in (1, 2, 3):
+            expected = {"Bucket": "bucket", "Key": "signed.pdf", "Body": ANY, "ContentMD5": ANY, "UploadId": "upload-1", "PartNumber": part_number}
+            self.stubber.add_response("upload_part", {"ETag": f'"etag-{part_number}"'}, expected)
+        parts = [{"ETag": f'"etag-{part_number}"', "PartNumber": part_number} for part_number in (1, 2, 3)]
+        self.stubber.add_response("complete_multipart_upload", {}, {"Bucket": "bucket", "Key": "signed.pdf", "UploadId": "upload-1", "MultipartUpload": {"Parts": parts}})
+
+        upload = S3HANDLER.stream_to_s3(self.url, "signed.pdf", bucket="bucket")
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual(upload.size, len(body))
+        self.assertEqual(upload.sha256, hashlib.sha256(body).hexdigest())
+
+    def test_small_document_is_stored_with_one_request(self):
+        self.serve(b"%PDF-1.7 signed")
+        self.stubber.add_response("put_object", {"ETag": '"etag"'}, {"Bucket": "bucket", "Key": "signed.pdf", "Body": ANY, "ContentType": "application/pdf"})
+
+        upload = S3HANDLER.stream_to_s3(self.url, "signed.pdf", bucket="bucket", checksum=False)
+
+        self.stubber.assert_no_pending_responses()
+        self.assertEqual((upload.size, upload.sha256), (15, None))
+
+    def test_failed_part_aborts_the_upload(self):
+        self.serve(b"x" * (PART_SIZE + 1))
+        self.stubber.add_response("create_multipart_upload", {"UploadId": "upload-1"}, {"Bucket": "bucket", "Key": "signed.pdf", "ContentType": "application/pdf"})
+        self.stubber.add_client_error("upload_part", service_error_code="InternalError", http_status_code=500)
+        self.stubber.add_response("abort_multipart_upload", {}, {"Bucket": "bucket", "Key": "signed.pdf", "UploadId": "upload-1"})
+
+        with self.assertRaises(ClientError):
+            S3HANDLER.stream_to_s3(self.url, "signed.pdf", bucket="bucket")
+        self.stubber.assert_no_pending_responses()
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}, DOCUMENT_THUMBNAIL_WIDTH=120)
+class DocumentDerivativesTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        patcher = mock.patch("applications.compliance.tasks.get_s3_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def generate(self, spool_max_size: int) -> list[bytes]:
+        with pymupdf.open() as document:
+            document.new_page().insert_text((72, 72), "Signed by Jane Doe")
+            pdf = document.tobytes()
+        stem = "restricted/attestations/hca_policy_attestation/hca_policy_attestation_doe_jane"
+        self.stubber.add_response("get_object", {"Body": StreamingBody(io.BytesIO(pdf), len(pdf)), "ContentLength": len(pdf)}, {"Bucket": "bucket", "Key": f"{stem}.pdf"})
+        for key, content_type in ((f"{stem}.thumbnail.png", "image/png"), (f"{stem}.txt", "text/plain; charset=utf-8")):
+            self.stubber.add_response("put_object", {"ETag": '"etag"'}, {"Bucket": "bucket", "Key": key, "Body": ANY, "ContentType": content_type})
+        linearized = []
+
+        def upload_file_to_s3(file_name, bucket, object_name, content_type):
+            self.assertEqual((bucket, object_name, content_type), ("bucket", f"{stem}.linearized.pdf", "application/pdf"))
+            with open(file_name, "rb") as file:
+                linearized.append(file.read())
+            return True
+
+        with override_settings(DOCUMENT_DERIVATIVE_SPOOL_MAX_SIZE=spool_max_size), mock.patch("applications.compliance.tasks.S3HANDLER.upload_file_to_s3", side_effect=upload_file_to_s3):
+            generate_document_derivatives.apply(args=[f"{stem}.pdf", "bucket"]).get()
+
+        self.stubber.assert_no_pending_responses()
+        self.assertTrue(cache.get(get_derivatives_cache_key("attestations/hca_policy_attestation/hca_policy_attestation_doe_jane.pdf")))
+        return linearized
+
+    def test_derivatives_are_rendered_in_one_pass_and_stored_next_to_the_document(self):
+        linearized = self.generate(spool_max_size=16 * 1024 * 1024)
+        self.assertEqual(len(linearized), 1)
+        self.assertTrue(linearized[0].startswith(b"%PDF"))
+
+    def test_documents_over_the_spool_limit_are_rendered_from_disk(self):
+        self.assertEqual(len(self.generate(spool_max_size=1)), 1)
+
+
+@override_settings(AWS_STORAGE_BUCKET_NAME="bucket", S3_PRESIGNED_UPLOAD_TTL=300)
+class DirectUploadTestCase(SimpleTestCase):
+    def setUp(self):
+        self.client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="testing", aws_secret_access_key="testing")
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        patcher = mock.patch("common.upload.get_s3_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.upload = UploadHandler("applicant/resume").presign_upload(SimpleNamespace(first_name="jane", last_name="doe"), "application/pdf", 1024, scope="resume_cv:session")
+        self.key = self.upload.fields["key"]
+
+    def stored(self, size: int, content_type: str = "application/pdf") -> None:
+        self.stubber.add_response("head_object", {"ContentLength": size, "ContentType": content_type}, {"Bucket": "bucket", "Key": self.key})
+
+    def test_policy_is_scoped_to_the_generated_name(self):
+        self.assertRegex(self.key, r"^restricted/applicant/resume/doe_jane_[0-9a-f]{32}\.pdf$")
+        self.assertEqual(UploadHandler("applicant/resume").generate_randomized_file_name(SimpleNamespace(first_name="Jane", last_name="Doe"), "cv.pdf"), "applicant/resume/doe_jane.pdf")
+        self.assertEqual((self.upload.fields["Content-Type"], self.upload.fields["acl"]), ("application/pdf", "private"))
+
+    def test_confirmed_upload_returns_its_field_name(self):
+        self.stored(512)
+        self.assertEqual(S3HANDLER.confirm_direct_upload(self.upload.token, scope="resume_cv:session"), self.key.removeprefix("restricted/"))
+
+    def test_uploads_outside_the_policy_are_rejected(self):
+        with self.assertRaises(FileValidationError):
+            S3HANDLER.confirm_direct_upload(self.upload.token, scope="resume_cv:another-session")
+        with self.assertRaises(FileValidationError):
+            S3HANDLER.confirm_direct_upload(self.upload.token[:-2], scope="resume_cv:session")
+        self.stored(2048)
+        with self.assertRaises(FileValidationError):
+            S3HANDLER.confirm_direct_upload(self.upload.token, scope="resume_cv:session")
+        self.stubber.add_client_error("head_object", service_error_code="404", http_status_code=404)
+        with self.assertRaises(FileValidationError):
+            S3HANDLER.confirm_direct_upload(self.upload.token, scope="resume_cv:session")
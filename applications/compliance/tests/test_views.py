@@ -1,11 +1,17 @@
-from unittest.mock import MagicMock, patch
+import json
+from unittest.mock import MagicMock, call, patch
 
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import RequestFactory, TestCase, override_settings
 
+from applications.compliance.tasks import ingest_signed_documents
+from applications.compliance.views import signed_attestations
 from applications.employee.models import Employee
 from applications.employee.views import Hire
+from common.documents import get_derivatives_cache_key
+from common.upload import StreamedUpload
 
 
 class TestEmployeeViews(TestCase):
@@ -62,3 +68,57 @@ class TestEmployeeViews(TestCase):
         self.assertIn(b"Failed to hire applicant. Invalid or no 'pk' value provided", response.content)
 
     # Add more test cases for reject, terminate, and promote functions
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class SignedAttestationIngestionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create_user(password="testpassword", first_name="Jane", last_name="Doe", email="jane.doe@example.com")
+        self.payload = {
+            "event_type": "form.completed",
+            "data": {
+                "id": 42,
+                "external_id": self.employee.employee_id,
+                "metadata": {"first_name": "Jane", "last_name": "Doe"},
+                "template": {"id": 90909, "name": "Nett Hands HCA Policy - 2024"},
+                "documents": [{"name": "hca_policy", "url": "https://docuseal.example/1.pdf"}, {"name": "audit_log", "url": "https://docuseal.example/2.pdf"}],
+            },
+        }
+
+    def post(self, payload):
+        return signed_attestations(RequestFactory().post("/signed/", data=json.dumps(payload), content_type="application/json"))
+
+    def test_webhook_is_queued_once(self):
+        with patch("applications.compliance.views.ingest_signed_documents.delay") as delay:
+            self.assertEqual(self.post(self.payload).status_code, 202)
+            self.assertEqual(self.post(self.payload).status_code, 200)
+        delay.assert_called_once()
+
+    def test_unknown_document_type_is_rejected(self):
+        self.payload["data"]["template"] = {"id": 1, "name": "Unknown"}
+        self.assertEqual(self.post(self.payload).status_code, 406)
+
+    def test_signed_copy_is_ingested_once(self):
+        def stream_to_s3(url, object_name):
+            return StreamedUpload(object_name, 10, "sha256")
+
+        with patch("applications.compliance.tasks.S3HANDLER.stream_to_s3", side_effect=stream_to_s3) as stream, patch("applications.compliance.tasks.generate_document_derivatives.delay") as derive:
+            self.assertEqual(ingest_signed_documents.apply(args=[self.payload, "docuseal:form.completed:42"]).get(), 1)
+            # NOTE: A retry that finds the document stored still queues its derivatives until they are stored.
+            self.assertEqual(ingest_signed_documents.apply(args=[self.payload, "docuseal:form.completed:42"]).get(), 0)
+            cache.set(get_derivatives_cache_key("attestations/hca_policy_attestation/hca_policy_attestation_doe_jane.pdf"), True)
+            self.assertEqual(ingest_signed_documents.apply(args=[self.payload, "docuseal:form.completed:42"]).get(), 0)
+        self.assertEqual(derive.call_args_list, [call("restricted/attestations/hca_policy_attestation/hca_policy_attestation_doe_jane.pdf")] * 2)
+        stream.assert_called_once_with("https://docuseal.example/1.pdf", "restricted/attestations/hca_policy_attestation/hca_policy_attestation_doe_jane.pdf")
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.hca_policy_attestation.name, "attestations/hca_policy_attestation/hca_policy_attestation_doe_jane.pdf")
+
+    def test_submission_for_unknown_employee_is_dropped_without_retrying(self):
+        self.payload["data"]["external_id"] = self.employee.employee_id + 1
+        cache.set("docuseal:form.completed:42", "queued")
+
+        with patch("applications.compliance.tasks.S3HANDLER.stream_to_s3") as stream:
+            self.assertEqual(ingest_signed_documents.apply(args=[self.payload, "docuseal:form.completed:42"]).get(), 0)
+        stream.assert_not_called()
+        self.assertIsNone(cache.get("docuseal:form.completed:42"))
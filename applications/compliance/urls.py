@@ -6,6 +6,8 @@ This module defines the URL patterns for the compliance application in Django. I
 URL Patterns:
 - /compliance/ : Displays the Compliance Profile Detail View.
 - /staff_compliance/<int:pk> : Allows staff members to update compliance information.
+- /staff_compliance/<int:pk>/uploads/presign : Issues a presigned POST for uploading a verification file straight to S3.
+- /staff_compliance/<int:pk>/uploads/confirm : Records a verification file uploaded straight to S3.
 - /sign/hca : Handles signing of HCA compliance documents.
 - /sign/idoa : Handles signing of IDOA compliance documents.
 - /sign/dnd : Handles signing of Do Not Drive compliance documents.
@@ -29,6 +31,8 @@ app_name = "compliance"
 urlpatterns = [
     re_path(r"^compliance/$", views.ComplianceProfileDetailView.as_view(), name="compliance-profile"),
     path("staff_compliance/<int:pk>", csrf_exempt(views.ComplianceProfileFormView.as_view()), name="staff_update_compliance"),
+    path("staff_compliance/<int:pk>/uploads/presign", views.presign_verification_upload, name="presign_verification_upload"),
+    path("staff_compliance/<int:pk>/uploads/confirm", views.confirm_verification_upload, name="confirm_verification_upload"),
     path("sign/hca", views.DocusealComplianceDocsSigning_HCA.as_view(), name="hca_sign"),
     path("sign/idoa", views.DocusealComplianceDocsSigning_IDOA.as_view(), name="idoa_sign"),
     path("sign/dnd", views.DocusealComplianceDocsSigning_DoNotDrive.as_view(), name="dnd_sign"),
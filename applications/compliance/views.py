@@ -11,6 +11,8 @@ Classes:
 
 Functions:
 - signed_attestations: Handles signed attestation forms.
+- presign_verification_upload: Issues a presigned POST for uploading a compliance verification file straight to S3.
+- confirm_verification_upload: Records a compliance verification file uploaded straight to S3.
 
 Attributes:
 - Various template names and context object names are defined for different views.
@@ -22,10 +24,13 @@ For more detailed information on each class and function, refer to the individua
 """
 
 import json
-import os
-from typing import Any
+from typing import Any, NamedTuple
 
-from django.http import HttpRequest, HttpResponse
+from django.conf import settings
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy
 from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
@@ -37,8 +42,17 @@ from rest_framework import status
 
 from applications.compliance.forms import ComplianceForm, ContractForm
 from applications.compliance.models import Compliance
+from applications.compliance.tasks import (
+    get_docuseal_idempotency_key,
+    ingest_signed_documents,
+)
 from applications.employee.models import Employee
-from common.upload import S3HANDLER
+from common.documents import (
+    get_derivative_names,
+    get_derivatives_cache_key,
+    get_document_type,
+)
+from common.upload import S3HANDLER, FileValidationError, UploadHandler
 
 # SECTION - Contract Related Viewws
 
@@ -64,9 +78,18 @@ class CreateContractFormView(CreateView):
 
 # !SECTION
 # SECTION - Compliance Related Views
+class AttestationPreview(NamedTuple):
+    label: str
+    url: str
+    thumbnail_url: str | None
+
+
 class ComplianceProfileDetailView(DetailView):
     """
     This class is a DetailView that displays the details of a Compliance object.
+
+    Signed attestations are listed by their first-page thumbnail, linked to the linearized PDF, so the page never embeds
+    the full documents. Attestations whose derivatives are not stored yet link the original PDF.
     """
 
     model = Compliance
@@ -83,6 +106,20 @@ class ComplianceProfileDetailView(DetailView):
         """
         return Compliance.objects.get(employee=self.request.user)
 
+    def get_context_data(self, **kwargs) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        employee = self.request.user
+        signed = {label: getattr(employee, field) for field, label in Employee.ATTESTATIONS.items() if getattr(employee, field).name not in (None, "", "NONE")}
+        ready = cache.get_many([get_derivatives_cache_key(file.name) for file in signed.values()])
+        context["attestations"] = []
+        for label, file in signed.items():
+            if get_derivatives_cache_key(file.name) in ready:
+                derivatives = get_derivative_names(file.name)
+                context["attestations"].append(AttestationPreview(label, file.storage.url(derivatives.linearized), file.storage.url(derivatives.thumbnail)))
+            else:
+                context["attestations"].append(AttestationPreview(label, file.url, None))
+        return context
+
 
 class ComplianceProfileFormView(UpdateView, FileUploadMixin):
     """
@@ -103,6 +140,70 @@ class ComplianceProfileFormView(UpdateView, FileUploadMixin):
     success_url = reverse_lazy("compliance:form-updated")
 
 
+@require_POST
+@login_required
+@user_passes_test(lambda user: user.is_staff)
+def presign_verification_upload(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    Issue a presigned POST for uploading a compliance verification file straight to object storage.
+
+    Args:
+        request (HttpRequest): A JSON body with the verification `field` and the file's `content_type`.
+        pk (int): The primary key of the compliance profile.
+
+    Returns:
+        JsonResponse(status code: 200): The `url` and `fields` to POST the file with, and the `token` to confirm it with.
+        JsonResponse(status code: 400): If the request is malformed, or the field or file type is not allowed.
+        HttpResponse(status code: 404): If the compliance profile does not exist.
+
+    """
+    try:
+        payload = json.loads(request.body)
+        field_name, content_type = payload["field"], payload["content_type"]
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Malformed Verification Upload Request: {e}")
+        return JsonResponse({"error": "Malformed Request"}, status=400)
+    if field_name not in Compliance.VERIFICATION_FIELDS or content_type not in settings.ALLOWED_UPLOAD_MIME_TYPES:
+        return JsonResponse({"error": "Invalid field or file type"}, status=400)
+    compliance = get_object_or_404(Compliance.objects.select_related("employee"), pk=pk)
+    handler = UploadHandler(Compliance._meta.get_field(field_name).upload_to)
+    upload = handler.presign_upload(compliance.employee, content_type, settings.S3_DIRECT_UPLOAD_MAX_SIZE, scope=f"compliance:{pk}:{field_name}")
+    return JsonResponse(upload._asdict())
+
+
+@require_POST
+@login_required
+@user_passes_test(lambda user: user.is_staff)
+def confirm_verification_upload(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    Record a compliance verification file uploaded straight to object storage on its compliance profile.
+
+    Args:
+        request (HttpRequest): A JSON body with the verification `field` and the `token` issued by `presign_verification_upload`.
+        pk (int): The primary key of the compliance profile.
+
+    Returns:
+        JsonResponse(status code: 200): The upload was verified and recorded.
+        JsonResponse(status code: 400): If the request is malformed or the upload could not be verified.
+        HttpResponse(status code: 404): If the compliance profile does not exist.
+
+    """
+    try:
+        payload = json.loads(request.body)
+        field_name = payload["field"]
+        name = S3HANDLER.confirm_direct_upload(payload["token"], scope=f"compliance:{pk}:{field_name}")
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Malformed Verification Upload Confirmation: {e}")
+        return JsonResponse({"error": "Malformed Request"}, status=400)
+    except FileValidationError as e:
+        logger.warning(f"Verification Upload Rejected: {e}")
+        return JsonResponse({"error": str(e)}, status=400)
+    compliance = get_object_or_404(Compliance, pk=pk)
+    setattr(compliance, field_name, name)
+    compliance.save(update_fields=[field_name, "modified"])
+    return JsonResponse({"name": name})
+
+
 #!SECTION
 # SECTION - Attestation Forms
 
@@ -110,69 +211,48 @@ class ComplianceProfileFormView(UpdateView, FileUploadMixin):
 @require_POST
 def signed_attestations(request: HttpRequest) -> HttpResponse:
     """
-    Process signed document requests and assign file paths to employee attestations.
+    Accept a signed document webhook from DocuSeal and queue its ingestion.
+
+    Downloading the signed copy, storing it in S3 and recording it on the employee happen in
+    `applications.compliance.tasks.ingest_signed_documents`. Deliveries already received are acknowledged without being
+    queued again, so DocuSeal retries never duplicate work.
 
     Args:
         request (HttpRequest): The HTTP request object containing the document payload.
 
     Returns:
-        HttpResponse(status code: 201): A response indicating the status of the file path assignment process.
+        HttpResponse(status code: 202): The submission was queued for ingestion.
+        HttpResponse(status code: 200): The submission was already received.
 
     Raises:
-        HttpResponse(status_code: 422): If an invalid document type is encountered during processing.
+        HttpResponse(status_code: 400): If the payload is malformed.
+        HttpResponse(status_code: 406): If the payload is for an unknown document type.
+        HttpResponse(status_code: 503): If the submission could not be queued.
 
     """
     logger.info("Signed Document Request Recieved From AWS")
     try:
-        logger.debug(request.body)
         docuseal_payload = json.loads(request.body)
-        employee_id = docuseal_payload["data"]["external_id"]
-        document_type = docuseal_payload["data"]["template"]["name"]
-        uploading_employee = Employee.objects.get(employee_id=employee_id)
-        document_id = docuseal_payload["data"]["template"]["id"]
-        doc_type_prefix = S3HANDLER.get_doc_type(document_id)
-        employee_upload_suffix = f"{uploading_employee.last_name.lower()}_{uploading_employee.first_name.lower()}.pdf"
-        filepath = os.path.join("attestations", doc_type_prefix, f"{doc_type_prefix}_{employee_upload_suffix}")
-
-        # fmt: off
-
-        match document_type:
-            case "Nett Hands - Do Not Drive Agreement - 2024":
-                uploading_employee.do_not_drive_agreement_attestation = filepath
-                uploading_employee.save()
-            case "State of Illinois - Department of Revenue - Withholding Worksheet (W4)":
-                uploading_employee.state_w4_attestation = filepath
-                uploading_employee.save()
-            case "US Internal Revenue Services - Withholding Certificate (W4) - 2024":
-                uploading_employee.state_w4_attestation = filepath
-                uploading_employee.save()
-            case "US Department of Homeland Security - Employment Eligibility Verification (I-9)":
-                uploading_employee.dha_i9 = filepath
-                uploading_employee.save()
-            case "Nett Hands HCA Policy - 2024":
-                uploading_employee.hca_policy_attestation = filepath
-                uploading_employee.save()
-            case "Nett Hands & Illinois Department of Aging General Policies":
-                uploading_employee.idoa_agency_policies_attestation = filepath
-                uploading_employee.save()
-            case "Nett Hands Homehealth Care Aide (HCA)  Job Desc - 2024":
-                uploading_employee.job_duties_attestation = filepath
-                uploading_employee.save()
-            case "IDPH - Health Care Worker Background Check Authorization":
-                uploading_employee.idph_background_check_authorization = filepath
-                uploading_employee.save()
-            case _:
-                logger.error(f'Invaild Document Type: {document_type} - {document_id}')
-                return HttpResponse(content='Invaild Document Type', status=status.HTTP_406_NOT_ACCEPTABLE)
-        # fmt: on
-
-        if S3HANDLER.download_pdf_file(docuseal_payload):
-            return HttpResponse(content="Processed File Path", status=status.HTTP_201_CREATED)
-        else:
-            return HttpResponse(content="Failed to Process File", status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        template = docuseal_payload["data"]["template"]
+        document_type = get_document_type(template)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.error(f"Malformed DocuSeal Payload: {e}")
+        return HttpResponse(content="Malformed Payload", status=status.HTTP_400_BAD_REQUEST)
+    if document_type is None:
+        logger.error(f"Invaild Document Type: {template.get('name')} - {template.get('id')}")
+        return HttpResponse(content="Invaild Document Type", status=status.HTTP_406_NOT_ACCEPTABLE)
+
+    idempotency_key = get_docuseal_idempotency_key(docuseal_payload, request.body)
+    if not cache.add(idempotency_key, "queued", timeout=settings.DOCUSEAL_IDEMPOTENCY_TTL):
+        logger.info(f"Duplicate DocuSeal Delivery {idempotency_key} - Already Received")
+        return HttpResponse(content="Already Received", status=status.HTTP_200_OK)
+    try:
+        ingest_signed_documents.delay(docuseal_payload, idempotency_key)
     except Exception as e:
-        logger.error(f"Unable to Assign FilePath: {e}")
-        return HttpResponse(content="Unable to Assign FilePath", status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        cache.delete(idempotency_key)
+        logger.error(f"Unable to Queue DocuSeal Submission {idempotency_key}: {e}")
+        return HttpResponse(content="Unable to Queue Submission", status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return HttpResponse(content="Accepted", status=status.HTTP_202_ACCEPTED)
 
 
 class DocusealComplianceDocsSigning_IDOA(TemplateView):
@@ -188,10 +268,11 @@ class DocusealComplianceDocsSigning_IDOA(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/r5UbQeVsQgkwUp"
         context["title"] = "Nett Hands & Illinois Department of Aging General Policies"
         return context
@@ -215,10 +296,11 @@ class DocusealComplianceDocsSigning_HCA(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/3KA4PP4CEjpy4r"
         context["title"] = "US Department of Homeland Security - Employment Eligibility Verification"
         return context
@@ -242,10 +324,11 @@ class DocusealComplianceDocsSigning_DoNotDrive(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/v1FPgz9xgBJVgH"
         context["title"] = "Nett Hands - Do Not Drive Agreement"
         return context
@@ -269,10 +352,11 @@ class DocusealComplianceDocsSigning_JobDesc(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/KQUEkomQZr1ddD"
         context["title"] = "Nett Hands Homehealth Care Aide (HCA) Job Desc"
         return context
@@ -296,10 +380,11 @@ class DocusealComplianceDocsSigning_i9(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/ovQk6ACHqajQvC"
         context["title"] = "US Department of Homeland Security - Employment Eligibility Verification"
         return context
@@ -323,10 +408,11 @@ class DocusealComplianceDocsSigning_irs_w4(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/wmJGUH3wU2GrUJ"
         context["title"] = "US Internal Revenue Services - Withholding Certificate"
         return context
@@ -350,10 +436,11 @@ class DocusealComplianceDocsSigning_il_w4(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/M6o9cZ4528yk4L"
         context["title"] = "State of Illinois - Department of Revenue - Withholding Worksheet"
         return context
@@ -377,10 +464,11 @@ class DocusealComplianceDocsSigning_idph_bg_auth(TemplateView):
     """
 
     template_name = "docuseal.html"
+    query_budget = 2
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["employee"] = Employee.objects.get(employee_id=self.request.user.employee_id)
+        context["employee"] = self.request.user
         context["doc_url"] = "https://docuseal.co/d/RiVYseBYUpvrxD"
         context["title"] = "Health Care Worker Background Check Authorization"
         return context
@@ -5,6 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 
 from applications.employee.api.serializers import EmployeeSerializer
 from applications.employee.models import Employee
+from common.pagination import KeysetPagination
 
 # Serializers define the API representation.
 
@@ -25,13 +26,17 @@ class EmployeeRosterAPIView(ListCreateAPIView):
     permission_classes (list): A list of permission classes required for accessing this view.
     filter_backends (list): A list of filter backends used for filtering Employee objects.
     filterset_fields (list): A list of fields that can be used for filtering Employee objects.
+    pagination_class (type): Keyset pagination over `keyset_ordering`, selected with the `cursor` query parameter.
+    keyset_ordering (tuple): The indexed columns the roster is ordered and paginated by.
 
     """
 
     queryset = Employee.objects.all()
-    serializer_class = (EmployeeSerializer,)
+    serializer_class = EmployeeSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("last_name_sort_key", "employee_id")
     filterset_fields = [
         "is_active",
         "is_superuser",
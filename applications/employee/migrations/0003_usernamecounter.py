@@ -0,0 +1,38 @@
+import re
+
+from django.db import migrations, models
+
+USERNAME_PATTERN = re.compile(r"^(?P<base>.*?)(?P<suffix>\d*)(?:_TERMINATED)*$")
+
+
+def populate_username_counters(apps, schema_editor):
+    Employee = apps.get_model("nhhc_employee", "Employee")
+    UsernameCounter = apps.get_model("nhhc_employee", "UsernameCounter")
+    last_suffixes = {}
+    for username in Employee.objects.values_list("username", flat=True).iterator(chunk_size=2000):
+        match = USERNAME_PATTERN.match(username.lower())
+        base_username, suffix = match["base"], int(match["suffix"] or 0)
+        last_suffixes[base_username] = max(suffix, last_suffixes.get(base_username, 0))
+    UsernameCounter.objects.bulk_create(
+        [UsernameCounter(base_username=base_username, last_suffix=last_suffix) for base_username, last_suffix in last_suffixes.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nhhc_employee", "0002_employee_last_name_sort_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UsernameCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("base_username", models.CharField(max_length=150, unique=True)),
+                ("last_suffix", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_username_counters, migrations.RunPython.noop),
+    ]
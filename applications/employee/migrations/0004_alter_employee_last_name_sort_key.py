@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+# NOTE: Only a short prefix of the encrypted last name is kept in plaintext; see Employee.get_last_name_sort_key.
+LAST_NAME_SORT_PREFIX_LENGTH = 2
+
+
+def truncate_last_name_sort_key(apps, schema_editor):
+    Employee = apps.get_model("nhhc_employee", "Employee")
+    employees = Employee.objects.only("employee_id", "last_name")
+    batch = []
+    for employee in employees.iterator(chunk_size=500):
+        employee.last_name_sort_key = (employee.last_name or "").strip().lower()[:LAST_NAME_SORT_PREFIX_LENGTH]
+        batch.append(employee)
+        if len(batch) >= 500:
+            Employee.objects.bulk_update(batch, ["last_name_sort_key"])
+            batch.clear()
+    if batch:
+        Employee.objects.bulk_update(batch, ["last_name_sort_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("nhhc_employee", "0003_usernamecounter"),
+    ]
+
+    operations = [
+        migrations.RunPython(truncate_last_name_sort_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="employee",
+            name="last_name_sort_key",
+            field=models.CharField(blank=True, default="", editable=False, max_length=LAST_NAME_SORT_PREFIX_LENGTH),
+        ),
+    ]
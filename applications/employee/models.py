@@ -1,8 +1,8 @@
+from collections import Counter
+
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AbstractUser, BaseUserManager, User
-from django.core.exceptions import ObjectDoesNotExist
-from django.db import models
+from django.db import connections, models, router
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.models import CreationDateTimeField, ModificationDateTimeField
 from django_prometheus.models import ExportModelOperationsMixin
@@ -18,11 +18,75 @@ from sage_encrypt.fields.asymmetric import (
 from common.upload import UploadHandler
 
 
+class UsernameCounter(models.Model):
+    """
+    The highest numeric suffix issued for each base username (`<last name>.<first name>`).
+
+    Suffix 0 stands for the bare base username, so the first "Jane Doe" is `doe.jane` and the next is `doe.jane1`.
+
+    Attributes:
+        base_username (str): The lowercased `<last name>.<first name>`.
+        last_suffix (int): The highest suffix issued for the base username.
+
+    """
+
+    base_username = models.CharField(max_length=150, unique=True)
+    last_suffix = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.base_username} ({self.last_suffix})"
+
+    @classmethod
+    def allocate(cls, base_usernames: list[str]) -> list[str]:
+        """
+        Reserve a unique username for each base username with a single upsert.
+
+        Every base username's counter is advanced by the number of times it is requested in one
+        `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` statement. The row lock taken by the upsert serializes concurrent
+        allocations of the same base username, so two hires can never be handed the same suffix.
+
+        Args:
+            base_usernames (list[str]): The base username of each new user; repeats get distinct suffixes.
+
+        Returns:
+            list[str]: The allocated usernames, in the same order.
+
+        """
+        if not base_usernames:
+            return []
+        requested = Counter(base_usernames)
+        connection = connections[router.db_for_write(cls)]
+        table = connection.ops.quote_name(cls._meta.db_table)
+        # NOTE: Only the quoted table name and parameter placeholders are interpolated into the statement.
+        sql = (
+            f"INSERT INTO {table} (base_username, last_suffix) VALUES {', '.join(['(%s, %s)'] * len(requested))} "  # noqa: S608
+            f"ON CONFLICT (base_username) DO UPDATE SET last_suffix = {table}.last_suffix + EXCLUDED.last_suffix + 1 "
+            "RETURNING base_username, last_suffix"
+        )
+        # NOTE: A new row starts at count - 1 and an existing row advances by count, so either way the returned value is
+        # the last suffix of this allocation's range. The rows are listed in sorted order so concurrent allocations lock
+        # them in the same order and cannot deadlock.
+        params = [value for base_username, count in sorted(requested.items()) for value in (base_username, count - 1)]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            next_suffix = {base_username: last_suffix - requested[base_username] + 1 for base_username, last_suffix in cursor.fetchall()}
+        usernames = []
+        for base_username in base_usernames:
+            suffix = next_suffix[base_username]
+            next_suffix[base_username] += 1
+            usernames.append(f"{base_username}{suffix}" if suffix else base_username)
+        return usernames
+
+
 class EmployeeMethodUtility:
+    @staticmethod
+    def get_base_username(first_name: str, last_name: str) -> str:
+        return f"{last_name.lower()}.{first_name.lower()}"
+
     @staticmethod
     def create_unique_username(first_name: str, last_name: str) -> str:
         """
-        Create a unique username by adding a number to the end of the username if it's already taken.
+        Create a unique username, adding a number to the end of the username if it's already taken.
 
         Args:
             first_name (str): The first name of the user.
@@ -31,35 +95,24 @@ class EmployeeMethodUtility:
         Returns:
             str: The unique username for the user.
 
-        Raises:
-            IntegrityError: If the username is already taken and no available unique username can be generated.
-
         """
-        last_name = last_name.lower()
-        first_name = first_name.lower()
-        username = f"{last_name}.{first_name}"
-        logger.debug(f"Initial Username: {username}")
+        username = UsernameCounter.allocate([EmployeeMethodUtility.get_base_username(first_name, last_name)])[0]
+        logger.debug(f"Allocated Username: {username}")
+        return username
 
-        try:
-            # Try to create a new user with the given username
-            get_user_model().objects.get(username=username)
-            max_num = get_user_model().objects.filter(username__startswith=username).count()
-
-            # If no number is currently appended, set the max_num to 0
-            if max_num == 1:
-                max_num = 0
+    @staticmethod
+    def create_unique_usernames(names: list[tuple[str, str]]) -> list[str]:
+        """
+        Create unique usernames for several new users with a single query.
 
-            # Append the next number to the username and try to create a new user again
-            next_username = username + str(max_num)
+        Args:
+            names (list[tuple[str, str]]): The (first name, last name) of each new user; duplicate names get distinct usernames.
 
-            # Return the next available username
-            logger.debug(f"Inital Username Unavailable. Next Available Username: {next_username}")
-            return next_username
+        Returns:
+            list[str]: The unique username for each name, in the same order.
 
-        except ObjectDoesNotExist:
-            # If no IntegrityError is raised, return the original username
-            logger.debug("Inital Username Available")
-            return username
+        """
+        return UsernameCounter.allocate([EmployeeMethodUtility.get_base_username(first_name, last_name) for first_name, last_name in names])
 
 
 class EmployeeManager(EmployeeMethodUtility, BaseUserManager, ExportModelOperationsMixin("employee-manager")):
@@ -128,6 +181,7 @@ class EmployeeManager(EmployeeMethodUtility, BaseUserManager, ExportModelOperati
         return user
 
 
+LAST_NAME_SORT_PREFIX_LENGTH = 2  # plaintext letters of the encrypted last name kept for roster ordering
 employee_resume_uploads = UploadHandler("resume")
 employee_cpr_card_uploads = UploadHandler("cpr_verification")
 
@@ -144,6 +198,9 @@ class Employee(EmployeeMethodUtility, AbstractUser, ExportModelOperationsMixin("
         social_security (str): The encrypted social security number of the employee.
         date_of_birth (date): The date of birth of the employee.
         marital_status (str): The marital status of the employee.
+        last_name_sort_key (str): The first `LAST_NAME_SORT_PREFIX_LENGTH` letters of the last name, lowercased, which the
+            roster is ordered and paginated by. Only this prefix is stored in plaintext; the full last name stays encrypted,
+            so employees sharing a prefix are ordered by employee_id rather than by their full last name.
         ...
 
     Methods:
@@ -164,6 +221,19 @@ class Employee(EmployeeMethodUtility, AbstractUser, ExportModelOperationsMixin("
 
     objects = EmployeeManager()
 
+    # NOTE: Unsigned attestations keep the FileField default of "NONE".
+    ATTESTATIONS: dict[str, str] = {
+        "idoa_agency_policies_attestation": "IL Dept of Aging & Agency Policies",
+        "idph_background_check_authorization": "IDPH Background Check Authorization",
+        "marketing_recruiting_limitations_attestation": "Marketing and Recruiting Limitation Policy",
+        "do_not_drive_agreement_attestation": "Do Not Drive Agreement",
+        "job_duties_attestation": "Job Duties",
+        "dhs_i9": "Dept of Homeland Security - I9 Form",
+        "hca_policy_attestation": "HCA Policy",
+        "irs_w4_attestation": "Federal W4 Form",
+        "state_w4_attestation": "State W4 Form",
+    }
+
     class GENDER(models.TextChoices):
         """
         Enum values representing different gender options.
@@ -312,6 +382,8 @@ class Employee(EmployeeMethodUtility, AbstractUser, ExportModelOperationsMixin("
     first_name = EncryptedCharField(max_length=10485760, null=True, blank=True)
     middle_name = EncryptedCharField(max_length=10485760, null=True, blank=True)
     last_name = EncryptedCharField(max_length=10485760, null=True, blank=True)
+    # NOTE: last_name is decrypted inside SQL, so it cannot be indexed; roster ordering is backed by a short plaintext prefix instead.
+    last_name_sort_key = models.CharField(max_length=LAST_NAME_SORT_PREFIX_LENGTH, blank=True, default="", editable=False)
     street_address1 = EncryptedCharField(max_length=10485760, null=True, blank=True)
     street_address2 = EncryptedCharField(max_length=10485760, null=True, blank=True)
     marital_status = models.CharField(
@@ -408,6 +480,16 @@ class Employee(EmployeeMethodUtility, AbstractUser, ExportModelOperationsMixin("
     def __str__(self) -> str:
         return f"(Employee Id:{self.pk}), Name: {self.last_name}, {self.first_name} | Username: {self.username}"
 
+    def save(self, *args, **kwargs) -> None:
+        self.last_name_sort_key = self.get_last_name_sort_key(self.last_name)
+        if (update_fields := kwargs.get("update_fields")) is not None and "last_name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "last_name_sort_key"}
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def get_last_name_sort_key(last_name: str | None) -> str:
+        return (last_name or "").strip().lower()[:LAST_NAME_SORT_PREFIX_LENGTH]
+
     def terminate_employment(self) -> None:
         self.termination_date = settings.NOW
         self.username = f"{self.username}_TERMINATED"
@@ -433,6 +515,27 @@ class Employee(EmployeeMethodUtility, AbstractUser, ExportModelOperationsMixin("
         self.is_superuser = False
         self.save()
 
+    @property
+    def missing_attestations(self) -> str:
+        """
+        The unsigned attestations of the employee, one "- <name>" line each.
+        """
+        return "\n".join(f"- {label}" for field, label in self.ATTESTATIONS.items() if getattr(self, field).name in (None, "", "NONE"))
+
+    @classmethod
+    def missing_attestations_filter(cls) -> models.Q:
+        """
+        Build a filter matching employees with at least one unsigned attestation.
+
+        Returns:
+            models.Q: The filter.
+
+        """
+        condition = models.Q()
+        for field in cls.ATTESTATIONS:
+            condition |= models.Q(**{f"{field}__in": ["", "NONE"]}) | models.Q(**{f"{field}__isnull": True})
+        return condition
+
     class Meta:
         db_table = "employee"
         ordering = ["last_name", "first_name", "-hire_date"]
@@ -442,4 +545,5 @@ class Employee(EmployeeMethodUtility, AbstractUser, ExportModelOperationsMixin("
         indexes = [
             models.Index(fields=["username"], name="username_idx"),
             models.Index(fields=["first_name"], name="first_name_idx"),
+            models.Index(fields=["last_name_sort_key", "employee_id"], name="roster_keyset_idx"),
         ]
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
-from employee.models import Employee
+from employee.models import Employee, UsernameCounter
+
+from common.pagination import KeysetPaginator
 
 User = get_user_model()
 
@@ -70,3 +72,43 @@ class EmployeeModelTests(TestCase):
         self.assertIsNotNone(user.termination_date)
         self.assertEqual(user.username, "doe.johnX")
         self.assertFalse(user.is_active)
+
+
+class UsernameCounterTests(TestCase):
+    def test_batch_allocation_assigns_distinct_suffixes(self):
+        self.assertEqual(UsernameCounter.allocate(["doe.jane", "roe.rick", "doe.jane"]), ["doe.jane", "roe.rick", "doe.jane1"])
+        self.assertEqual(Employee.create_unique_usernames([("Jane", "Doe"), ("Jane", "Doe")]), ["doe.jane2", "doe.jane3"])
+        self.assertEqual(UsernameCounter.objects.get(base_username="doe.jane").last_suffix, 3)
+
+    def test_allocation_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            Employee.create_unique_usernames([("Jane", "Doe"), ("John", "Doe"), ("Jane", "Doe")])
+
+
+class EmployeeRosterKeysetTests(TestCase):
+    def setUp(self):
+        for first_name, last_name in [("Ana", "Zimmer"), ("Ben", "adams"), ("Cal", "Baker"), ("Dee", "Adams"), ("Eve", "Cole")]:
+            User.objects.create_user(password="testpassword", first_name=first_name, last_name=last_name)
+
+    def test_save_maintains_last_name_sort_key(self):
+        employee = Employee.objects.get(first_name="Cal")
+        self.assertEqual(employee.last_name_sort_key, "ba")
+        employee.last_name = "Young"
+        employee.save(update_fields=["last_name"])
+        employee.refresh_from_db()
+        self.assertEqual(employee.last_name_sort_key, "yo")
+
+    def test_keyset_pages_cover_roster_in_order(self):
+        paginator = KeysetPaginator(ordering=("last_name_sort_key", "employee_id"), page_size=2)
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginator.paginate(Employee.objects.all(), cursor)
+            seen.extend(employee.first_name for employee in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["Ben", "Dee", "Cal", "Eve", "Ana"])
+
+    def test_invalid_cursor_is_rejected(self):
+        paginator = KeysetPaginator(ordering=("last_name_sort_key", "employee_id"), page_size=2)
+        with self.assertRaises(ValueError):
+            paginator.paginate(Employee.objects.all(), "not-a-cursor")
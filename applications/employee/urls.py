@@ -8,6 +8,7 @@ The URL patterns include:
 - reject-application: Allows for the rejection of an application with CSRF exemption
 - employee_roster: Displays the roster of employees
 - hire-employee: Handles the hiring of new employees
+- bulk-hire: Hires several applicants in one request
 
 These URL patterns are used to define the routing for the views in the application.
 
@@ -35,6 +36,7 @@ urlpatterns = [
     path("applicant/reject/", csrf_exempt(views.reject), name="reject"),
     path("roster/", login_required(views.EmployeeRoster.as_view()), name="roster"),
     path("applicant/hire/", views.Hire.hire, name="hire"),
+    path("applicant/hire/bulk/", views.Hire.bulk_hire, name="bulk_hire"),
     # re_path(r"^accounts/login/$", views.force_pwd_login),
     path("employee/promote/", csrf_exempt(views.promote), name="promote_employee"),
     path("employee/demote/", csrf_exempt(views.demote), name="promote_employee"),
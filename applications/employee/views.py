@@ -18,7 +18,7 @@ from typing import Any
 
 from django.contrib.auth import authenticate
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_POST
@@ -36,6 +36,7 @@ from common.helpers import (
     get_status_code_for_unauthorized_or_forbidden,
 )
 from common.mailer import PostOffice
+from common.pagination import KeysetPaginator
 
 # from  employee.tasks import send_async_onboarding_email, send_async_rejection_email
 # SECTION - Template - Rendering & API Class-Based Views
@@ -47,20 +48,39 @@ class EmployeeRoster(ListView):
     """
     A class-based template view that displays a list of employees in a paginated format.
 
+    Pages are selected by keyset over (last_name_sort_key, employee_id) using the `after` query parameter,
+    so every page is a single index range scan regardless of headcount.
+
     Attributes:
     - model: The model used for retrieving the list of employees.
-    - queryset: The query set used to fetch all employees ordered by last name.
+    - queryset: The query set used to fetch all employees.
     - template_name: The HTML template used for rendering the employee listing.
     - context_object_name: The name used to refer to the list of employees in the template.
     - paginate_by: The number of employees to display per page.
+    - keyset_ordering: The indexed columns the roster is ordered and paginated by.
 
     """
 
     model = Employee
-    queryset = Employee.objects.all().order_by("last_name")
+    queryset = Employee.objects.all()
     template_name = "employee-listing.html"
     context_object_name = "employees"
-    # paginate_by = 25
+    paginate_by = 25
+    keyset_ordering = ("last_name_sort_key", "employee_id")
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(ordering=self.keyset_ordering, page_size=page_size)
+        try:
+            employees, self.next_cursor = paginator.paginate(queryset, self.request.GET.get("after"))
+        except ValueError as e:
+            raise Http404("Invalid roster cursor") from e
+        return paginator, None, employees, self.next_cursor is not None
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context["cursor"] = self.request.GET.get("after")
+        context["next_cursor"] = self.next_cursor
+        return context
 
 
 @method_decorator(never_cache, name="dispatch")
@@ -80,10 +100,11 @@ class EmployeeDetail(DetailView):
     model = Employee
     template_name = "employee-detail.html"
     context_object_name = "employee"
+    query_budget = 4
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        context["compliance"] = Compliance.objects.get(employee=self.get_object())
+        context["compliance"] = Compliance.objects.get(employee=self.object)
         return context
 
 
@@ -163,6 +184,36 @@ class Hire:
         except Exception as e:
             return Hire.handle_general_exception(e)
 
+    @staticmethod
+    @require_POST
+    @login_required
+    @user_passes_test(lambda user: user.is_superuser)
+    def bulk_hire(request: HttpRequest) -> HttpResponse:
+        """
+        Hire every applicant whose PK is posted as `pk`, in one transaction.
+
+        Returns:
+            HttpResponse: 201 with the username and employee_id of each new employee, 400 if no valid PKs were posted,
+                or 404 if none of them is an unhired application.
+
+        """
+        try:
+            pks = [int(pk) for pk in request.POST.getlist("pk")]
+        except ValueError:
+            return Hire.invalid_pk_response()
+        if not pks:
+            return Hire.invalid_pk_response()
+        applicants = list(EmploymentApplicationModel.objects.filter(pk__in=pks).exclude(hired=True).order_by("pk"))
+        if not applicants:
+            return Hire.applicant_not_found_response()
+        try:
+            new_hires = EmploymentApplicationModel.bulk_hire_applicants(applicants, hired_by=request.user)
+        except Exception as e:
+            logger.exception(f"Failed to bulk hire applicants. Error: {e}")
+            return HttpResponse(status=422, content=f"Failed to hire applicants. Error: {e}.")
+        HR_MAILROOM.send_external_applicant_new_hire_onboarding_emails(new_hires)
+        return JsonResponse([{"username": new_hire["username"], "employee_id": new_hire["employee_id"]} for new_hire in new_hires], safe=False, status=201)
+
     # Helper functions
     @staticmethod
     def parse_pk_from_request(request: HttpRequest) -> int:
@@ -184,8 +235,8 @@ class Hire:
     @staticmethod
     def send_hiring_notification(hired_user) -> None:
         credentials = {
-            "new_user_email": hired_user["email"],
-            "new_user_first_name": hired_user["first_name"],
+            "email": hired_user["email"],
+            "first_name": hired_user["first_name"],
             "plaintext_temp_password": hired_user["plain_text_password"],
             "username": hired_user["username"],
         }
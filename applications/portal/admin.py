@@ -1,6 +1,7 @@
 from datetime import datetime
 
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Q
 
 from applications.announcements.models import Announcements
 from applications.authentication.models import UserProfile
@@ -10,16 +11,64 @@ from applications.portal.models import (
     PayrollException,  # Assessment, InServiceTraining,
 )
 from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
+from common.encryption import compute_blind_index
+from common.mailer import PostOffice
 
 now = datetime.now()
+HR_MAILROOM = PostOffice("HR@netthandshome.care")
 # Register your models here.
-all_models = [Contract, PayrollException, Announcements, ClientInterestSubmission, EmploymentApplicationModel, UserProfile, Compliance]
+all_models = [Contract, PayrollException, Announcements, UserProfile, Compliance]
 
 
 for model in all_models:
     admin.site.register(model)
 
 
+class BlindIndexSearchAdmin(admin.ModelAdmin):
+    """
+    Admin interface whose search box matches encrypted fields exactly through their blind index columns.
+
+    Each whitespace-separated search term must equal (case-insensitively) at least one of the model's `BLIND_INDEXES` fields,
+    so a search is a handful of indexed lookups instead of decrypting the whole table.
+    """
+
+    # NOTE: Only enables the admin search box; get_search_results matches through the blind indexes instead.
+    search_fields = ["first_name", "last_name", "email"]
+    search_help_text = "Search by exact first name, last name or email address"
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        for term in search_term.split():
+            matches = Q()
+            for field, index_field in self.model.BLIND_INDEXES.items():
+                matches |= Q(**{index_field: compute_blind_index(term, field)})
+            queryset = queryset.filter(matches)
+        return queryset, False
+
+
+class EmploymentApplicationAdmin(BlindIndexSearchAdmin):
+    """
+    Admin interface for employment applications, with an action that hires the selected applicants in one transaction.
+    """
+
+    actions = ["hire_selected_applicants"]
+
+    @admin.action(description="Hire selected applicants")
+    def hire_selected_applicants(self, request, queryset):
+        applicants = list(queryset.exclude(hired=True).order_by("pk"))
+        if not applicants:
+            self.message_user(request, "None of the selected applicants can be hired.", messages.WARNING)
+            return
+        new_hires = EmploymentApplicationModel.bulk_hire_applicants(applicants, hired_by=request.user)
+        HR_MAILROOM.send_external_applicant_new_hire_onboarding_emails(new_hires)
+        self.message_user(request, f"Hired {len(new_hires)} applicants: {', '.join(new_hire['username'] for new_hire in new_hires)}", messages.SUCCESS)
+
+
+admin.site.register(ClientInterestSubmission, BlindIndexSearchAdmin)
+admin.site.register(EmploymentApplicationModel, EmploymentApplicationAdmin)
+
+
 class EmployeeAdmin(admin.ModelAdmin):
     """
     This class represents the admin interface for managing employee data.
@@ -34,9 +83,18 @@ class EmployeeAdmin(admin.ModelAdmin):
 
     search_fields = ["username", "first_name", "last_name", "social_security", "phone"]
     list_display = ["first_name", "last_name", "username", "hire_date"]
-    actions = []
+    actions = ["remind_missing_attestations"]
     date_hierarchy = "hire_date"
     readonly_fields = ["employee_id"]
 
+    @admin.action(description="Remind selected employees of unsigned attestations")
+    def remind_missing_attestations(self, request, queryset):
+        recipients = queryset.filter(Employee.missing_attestations_filter(), is_active=True)
+        if not recipients.exists():
+            self.message_user(request, "None of the selected active employees have unsigned attestations.", messages.WARNING)
+            return
+        campaign_id = HR_MAILROOM.send_bulk("missing_attestations_reminder", recipients)
+        self.message_user(request, f"Queued attestation reminders for {recipients.count()} employees (campaign {campaign_id}).", messages.SUCCESS)
+
 
 admin.site.register(Employee, EmployeeAdmin)
@@ -2,7 +2,6 @@ import json
 
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.serializers.json import DjangoJSONEncoder
 from django.http import HttpRequest, HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from loguru import logger
@@ -13,13 +12,14 @@ from applications.employee.models import Employee
 from applications.portal.api.serializers import ClientInquiriesSerializer
 from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
 from common.cache import CachedResponseMixin
+from common.exports import stream_queryset_export
 
 
 class EmploymentApplicationModelAPIListView(CachedResponseMixin, mixins.DestroyModelMixin, generics.ListCreateAPIView):
     queryset = EmploymentApplicationModel.objects.all()
     serializer_class = [EmploymentApplicationModel]
     primary_model = EmploymentApplicationModel
-    cache_model = [Employee, EmploymentApplicationModel]
+    cache_models = [Employee]
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = [
@@ -57,15 +57,15 @@ class EmploymentApplicationModelAPIListView(CachedResponseMixin, mixins.DestroyM
 
 def all_client_inquiries(request: HttpRequest) -> HttpResponse:
     """
-    Retrieves all client inquiries and returns them as JSON.
+    Streams all client inquiries as JSON.
+
+    Supports the `format` (json or ndjson), `after` and `limit` query parameters described in `common.exports`.
 
     Returns:
-    - HttpResponse: JSON response containing all client inquiries
+    - HttpResponse: Streaming JSON response containing all client inquiries
 
     """
-    inquiries = ClientInterestSubmission.objects.all().values()
-    inquiries_json = json.dumps(list(inquiries), cls=DjangoJSONEncoder)
-    return HttpResponse(content=inquiries_json, status=status.HTTP_200_OK)
+    return stream_queryset_export(request, ClientInterestSubmission.objects.all())
 
 
 class ClientInquiriesAPIListView(CachedResponseMixin, generics.ListCreateAPIView):
@@ -83,17 +83,15 @@ class ClientInquiriesAPIListView(CachedResponseMixin, generics.ListCreateAPIView
 @login_required(login_url="/login/")
 def all_applicants(request: HttpRequest) -> HttpResponse:
     """
-    Retrieves all employment applications and returns them as JSON.
+    Streams all employment applications as JSON.
+
+    Supports the `format` (json or ndjson), `after` and `limit` query parameters described in `common.exports`.
 
     Returns:
-    - HttpResponse: JSON response containing all employment applications
+    - HttpResponse: Streaming JSON response containing all employment applications
 
     """
-    inquiries = EmploymentApplicationModel.objects.all().values()
-    for inquiry in inquiries:
-        inquiry["contact_number"] = str(inquiry["contact_number"])
-    applicant_json = json.dumps(list(inquiries), cls=DjangoJSONEncoder)
-    return HttpResponse(content=applicant_json, status=200)
+    return stream_queryset_export(request, EmploymentApplicationModel.objects.all())
 
 
 def marked_reviewed(request):
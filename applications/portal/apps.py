@@ -7,3 +7,7 @@ class PortalConfig(AppConfig):
 
     def ready(self):
         super().ready()
+        # NOTE: Importing the cached views registers their cache dependencies in every process (web and celery workers),
+        # so model saves made outside of a request still invalidate the responses that depend on them.
+        import applications.portal.api.endpoints
+        import applications.portal.views  # noqa: F401
@@ -0,0 +1,245 @@
+import pickle
+import time
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from applications.announcements.models import Announcements
+from applications.employee.models import Employee
+from applications.portal.views import get_dashboard_feed
+from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
+from common.cache import (
+    CACHE_DEPENDENTS,
+    CachedEnvelope,
+    CachedResponseMixin,
+    RecomputeLock,
+    bump_model_generation,
+    get_generation_key,
+    get_model_generation,
+    invalidate_cache,
+)
+from common.local_cache import MISSING, LocalLRUCache
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class DummyCachedView(CachedResponseMixin):
+    primary_model = EmploymentApplicationModel
+    cache_models = [Employee]
+
+    def __init__(self):
+        self.request = MagicMock()
+        self.request.user.is_authenticated = False
+        self.request.GET.urlencode.return_value = ""
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ModelGenerationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_generation_is_seeded_from_the_clock(self):
+        with patch("common.cache.time.time_ns", return_value=1000):
+            self.assertEqual(get_model_generation("EmploymentApplicationModel"), 1000)
+
+    def test_bump_increments_generation(self):
+        generation = get_model_generation("EmploymentApplicationModel")
+        self.assertEqual(bump_model_generation("EmploymentApplicationModel"), generation + 1)
+        self.assertEqual(get_model_generation("EmploymentApplicationModel"), generation + 1)
+
+    def test_bump_without_existing_counter(self):
+        with patch("common.cache.time.time_ns", return_value=1000):
+            self.assertEqual(bump_model_generation("EmploymentApplicationModel"), 1000)
+
+    def test_evicted_generation_does_not_return_to_an_earlier_value(self):
+        with patch("common.cache.time.time_ns", side_effect=[1000, 2000]):
+            get_model_generation("EmploymentApplicationModel")
+            orphaned_generation = bump_model_generation("EmploymentApplicationModel")
+            cache.delete(get_generation_key("EmploymentApplicationModel"))
+            self.assertGreater(get_model_generation("EmploymentApplicationModel"), orphaned_generation)
+
+    def test_invalidate_cache_changes_cache_key(self):
+        view = DummyCachedView()
+        with patch("common.cache.time.time_ns", return_value=1):
+            original_key = view.get_cache_key()
+        invalidate_cache(sender=EmploymentApplicationModel)
+        self.assertNotEqual(original_key, view.get_cache_key())
+        self.assertIn("EmploymentApplicationModel-g2_Employee-g1", view.get_cache_key())
+
+    def test_dependent_model_changes_cache_key(self):
+        view = DummyCachedView()
+        original_key = view.get_cache_key()
+        invalidate_cache(sender=Employee)
+        self.assertNotEqual(original_key, view.get_cache_key())
+
+    def test_unrelated_model_does_not_change_cache_key(self):
+        view = DummyCachedView()
+        original_key = view.get_cache_key()
+        invalidate_cache(sender=ClientInterestSubmission)
+        self.assertEqual(original_key, view.get_cache_key())
+
+
+class CacheDependencyRegistryTestCase(TestCase):
+    def test_subclass_registers_dependencies(self):
+        self.assertIn("DummyCachedView", CACHE_DEPENDENTS["EmploymentApplicationModel"])
+        self.assertIn("DummyCachedView", CACHE_DEPENDENTS["Employee"])
+
+    def test_dependencies_skip_none_and_duplicates(self):
+        class StaticView(CachedResponseMixin):
+            primary_model = None
+            cache_models = [None]
+
+        self.assertEqual(StaticView.get_cache_dependencies(), ["NoModel"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, VIEW_CACHE_TTL=60, VIEW_CACHE_STALE_GRACE=60, VIEW_CACHE_LOCK_TIMEOUT=30, VIEW_CACHE_LOCK_WAIT=0.1, VIEW_CACHE_EARLY_REFRESH_BETA=0)
+class StaleWhileRevalidateTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = DummyCachedView()
+        self.cache_key = self.view.get_cache_key()
+
+    def store_stale_entry(self, data):
+        cache.set(self.cache_key, CachedEnvelope(data=data, soft_expires_at=time.time() - 1), timeout=60)
+
+    def test_miss_recomputes_and_caches(self):
+        compute = MagicMock(return_value={"rows": 1})
+        response = self.view.get_or_recompute_response(self.cache_key, compute)
+        self.assertEqual(response.data, {"rows": 1})
+        compute.assert_called_once()
+        self.assertEqual(self.view.get_cached_response(self.cache_key).data, {"rows": 1})
+
+    def test_fresh_entry_is_served_without_recompute(self):
+        self.view.cache_response(self.cache_key, {"rows": 1})
+        compute = MagicMock()
+        self.assertEqual(self.view.get_or_recompute_response(self.cache_key, compute).data, {"rows": 1})
+        compute.assert_not_called()
+
+    def test_stale_entry_is_recomputed_by_lock_holder(self):
+        self.store_stale_entry({"rows": 1})
+        compute = MagicMock(return_value={"rows": 2})
+        self.assertEqual(self.view.get_or_recompute_response(self.cache_key, compute).data, {"rows": 2})
+        compute.assert_called_once()
+
+    def test_stale_entry_is_served_while_another_worker_recomputes(self):
+        self.store_stale_entry({"rows": 1})
+        compute = MagicMock(return_value={"rows": 2})
+        with RecomputeLock(self.cache_key) as acquired:
+            self.assertTrue(acquired)
+            self.assertEqual(self.view.get_or_recompute_response(self.cache_key, compute).data, {"rows": 1})
+        compute.assert_not_called()
+
+    def test_early_refresh_disabled_without_compute_time(self):
+        entry = CachedEnvelope(data={}, soft_expires_at=time.time() + 60, compute_time=0.0)
+        self.assertFalse(entry.should_refresh(beta=1.0))
+
+
+class LocalLRUCacheTestCase(TestCase):
+    def setUp(self):
+        self.local_cache = LocalLRUCache(max_entries=3, max_bytes=10_000, ttl=60)
+
+    def test_get_returns_missing_for_unknown_key(self):
+        self.assertIs(self.local_cache.get("unknown"), MISSING)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for key in ["a", "b", "c"]:
+            self.local_cache.set(key, key)
+        self.local_cache.get("a")
+        self.local_cache.set("d", "d")
+        self.assertIs(self.local_cache.get("b"), MISSING)
+        self.assertEqual(self.local_cache.get("a"), "a")
+
+    def test_memory_cap_evicts_entries(self):
+        self.local_cache = LocalLRUCache(max_entries=100, max_bytes=10_000, ttl=60)
+        for index in range(20):
+            self.local_cache.set(f"key-{index}", "x" * 900)
+        self.assertLessEqual(self.local_cache.current_bytes, 10_000)
+        self.assertIs(self.local_cache.get("key-0"), MISSING)
+
+    def test_oversized_entry_is_not_stored(self):
+        self.assertFalse(self.local_cache.set("large", "x" * 5_000))
+        self.assertIs(self.local_cache.get("large"), MISSING)
+
+    def test_expired_entry_is_missing(self):
+        self.local_cache.ttl = 0
+        self.local_cache.set("a", "a")
+        self.assertIs(self.local_cache.get("a"), MISSING)
+
+    def test_evict_tag_removes_only_tagged_entries(self):
+        self.local_cache.set("application", 1, tags=["EmploymentApplicationModel", "Employee"])
+        self.local_cache.set("inquiry", 2, tags=["ClientInterestSubmission"])
+        self.assertEqual(self.local_cache.evict_tag("Employee"), 1)
+        self.assertIs(self.local_cache.get("application"), MISSING)
+        self.assertEqual(self.local_cache.get("inquiry"), 2)
+        self.assertEqual(self.local_cache.current_bytes, len(pickle.dumps(2, protocol=pickle.HIGHEST_PROTOCOL)))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TwoTierCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.local_cache = LocalLRUCache(max_entries=100, max_bytes=1_000_000, ttl=60)
+        patcher = patch("common.cache.get_local_cache", return_value=self.local_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.view = DummyCachedView()
+
+    def test_redis_hit_backfills_local_tier(self):
+        cache.set("key", CachedEnvelope(data={"source": "redis"}, soft_expires_at=time.time() + 60))
+        self.assertEqual(self.view.get_cache_entry("key").data, {"source": "redis"})
+        cache.delete("key")
+        self.assertEqual(self.view.get_cache_entry("key").data, {"source": "redis"})
+
+    def test_stale_local_entry_falls_through_to_redis(self):
+        self.local_cache.set("key", CachedEnvelope(data={"source": "local"}, soft_expires_at=time.time() - 1))
+        cache.set("key", CachedEnvelope(data={"source": "redis"}, soft_expires_at=time.time() + 60))
+        self.assertEqual(self.view.get_cache_entry("key").data, {"source": "redis"})
+
+    def test_invalidation_evicts_local_generation_and_entries(self):
+        original_key = self.view.get_cache_key()
+        self.view.cache_response(original_key, {"cached": True})
+        with patch("common.cache.broadcast_invalidation", side_effect=self.local_cache.evict_tag):
+            invalidate_cache(sender=Employee)
+        self.assertIs(self.local_cache.get(original_key), MISSING)
+        self.assertNotEqual(self.view.get_cache_key(), original_key)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, LOCAL_CACHE_ENABLED=False)
+class DashboardFeedTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employee = Employee.objects.create_user(password="testpassword", first_name="Jane", last_name="Doe", email="jane.doe@example.com")
+        for index in range(3):
+            Announcements.objects.create(
+                announcement_title=f"Announcement {index}",
+                message="Message",
+                message_type=Announcements.IMPORTANCE.choices[0][0],
+                status=Announcements.STATUS.ACTIVE,
+                posted_by=self.employee,
+            )
+        Announcements.objects.create(announcement_title="Draft", message="Message", status=Announcements.STATUS.DRAFT, posted_by=self.employee)
+
+    def test_feed_is_built_with_one_query_and_served_from_cache(self):
+        with self.assertNumQueries(1):
+            feed = get_dashboard_feed()
+        self.assertEqual(len(feed), 3)
+        self.assertTrue(all(announcement["posted_by"] == "Jane" for announcement in feed))
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_feed(), feed)
+
+    def test_status_change_invalidates_feed(self):
+        get_dashboard_feed()
+        draft = Announcements.objects.get(announcement_title="Draft")
+        draft.status = Announcements.STATUS.ACTIVE
+        draft.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_dashboard_feed()), 4)
+
+    def test_employee_save_keeps_feed(self):
+        get_dashboard_feed()
+        self.employee.last_login = timezone.now()
+        self.employee.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            get_dashboard_feed()
@@ -0,0 +1,55 @@
+import json
+
+from django.test import RequestFactory, TestCase
+
+from applications.web.models import ClientInterestSubmission
+from common.exports import NEXT_CURSOR_HEADER, stream_queryset_export
+
+
+class StreamingExportTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.submissions = [
+            ClientInterestSubmission.objects.create(
+                first_name=f"Client{index}",
+                last_name="Doe",
+                email=f"client{index}@example.com",
+                contact_number="+13125550100",
+                zipcode="60601",
+                insurance_carrier="ABC Insurance",
+                desired_service="Service A",
+            )
+            for index in range(5)
+        ]
+
+    def export(self, **params):
+        request = self.factory.get("/portal/all_client_inquiries", params)
+        return stream_queryset_export(request, ClientInterestSubmission.objects.all(), fields=["id", "first_name", "contact_number"])
+
+    def test_json_array_export(self):
+        response = self.export()
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([row["first_name"] for row in rows], [f"Client{index}" for index in range(5)])
+        self.assertEqual(rows[0]["contact_number"], "+13125550100")
+        self.assertNotIn(NEXT_CURSOR_HEADER, response)
+
+    def test_ndjson_export(self):
+        response = self.export(format="ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])["first_name"], "Client0")
+
+    def test_keyset_pagination(self):
+        first_page = self.export(limit=2)
+        first_rows = json.loads(b"".join(first_page.streaming_content))
+        self.assertEqual(first_page[NEXT_CURSOR_HEADER], str(first_rows[-1]["id"]))
+
+        last_page = self.export(after=self.submissions[2].pk, limit=2)
+        last_rows = json.loads(b"".join(last_page.streaming_content))
+        self.assertEqual([row["first_name"] for row in last_rows], ["Client3", "Client4"])
+        self.assertNotIn(NEXT_CURSOR_HEADER, last_page)
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.export(format="xml").status_code, 400)
+        self.assertEqual(self.export(limit="zero").status_code, 400)
@@ -0,0 +1,136 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from applications.authentication.models import UserProfile
+from applications.employee.models import Employee
+from common.middleware.password_change import (
+    PasswordChangeMiddleware,
+    clear_force_password_change,
+)
+from common.query_instrumentation import (
+    QueryBudgetExceeded,
+    QueryBudgetTestMixin,
+    QueryInstrumentationMiddleware,
+    fingerprint_sql,
+    get_request_query_stats,
+    get_view_query_budget,
+    query_budget,
+)
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PasswordChangeMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = PasswordChangeMiddleware(lambda request: None)
+        self.employee = Employee.objects.create_user(password="testpassword", first_name="Jane", last_name="Doe", email="jane.doe@example.com")
+        self.profile, _ = UserProfile.objects.update_or_create(user=self.employee, defaults={"force_password_change": False})
+
+    def get_request(self, path="/portal/dashboard/"):
+        request = self.factory.get(path)
+        request.user = self.employee
+        return request
+
+    def test_flag_is_read_from_database_once(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.middleware.process_request(self.get_request()))
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.middleware.process_request(self.get_request()))
+
+    def test_anonymous_and_exempt_requests_run_no_queries(self):
+        request = self.factory.get("/")
+        request.user = AnonymousUser()
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.middleware.process_request(request))
+            self.assertIsNone(self.middleware.process_request(self.get_request("/password/change/")))
+
+    def test_clearing_the_flag_rereads_the_profile(self):
+        self.middleware.process_request(self.get_request())
+        self.profile.force_password_change = True
+        self.profile.save()
+        clear_force_password_change(self.employee.pk)
+        with self.assertNumQueries(1):
+            response = self.middleware.process_request(self.get_request())
+        self.assertEqual(response.status_code, 302)
+
+
+class QueryInstrumentationTestCase(QueryBudgetTestMixin, TestCase):
+    def test_fingerprint_ignores_literals_and_batch_size(self):
+        first, _ = fingerprint_sql("SELECT * FROM employee WHERE id IN (%s, %s) AND name = 'Jane'")
+        second, normalized = fingerprint_sql("SELECT  *  FROM employee WHERE id IN (%s, %s, %s) AND name = 'O''Brien'")
+        self.assertEqual(first, second)
+        self.assertEqual(normalized, "SELECT * FROM employee WHERE id IN (?+) AND name = ?")
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=False)
+    def test_disabled_middleware_is_not_used(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(lambda request: None)
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_SLOW_THRESHOLD_MS=60_000)
+    def test_request_queries_are_counted(self):
+        counted = {}
+
+        def get_response(request):
+            Employee.objects.count()
+            Employee.objects.exists()
+            counted["count"] = get_request_query_stats().count
+
+        QueryInstrumentationMiddleware(get_response)(RequestFactory().get("/"))
+        self.assertEqual(counted["count"], 2)
+        self.assertIsNone(get_request_query_stats())
+
+    def test_repeated_queries_are_grouped_by_fingerprint(self):
+        employee_ids = [Employee.objects.create_user(password="testpassword", first_name="Jane", last_name=f"Doe{index}", email=f"jane{index}@example.com").pk for index in range(5)]
+        with self.assertRaises(AssertionError), self.assertQueryBudget(max_queries=10) as stats:
+            for employee_id in employee_ids:
+                Employee.objects.get(pk=employee_id)
+        self.assertEqual(list(stats.fingerprints.values()), [5])
+        with self.assertQueryBudget(max_queries=1):
+            list(Employee.objects.filter(pk__in=employee_ids))
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_BUDGET_RAISE=True)
+    def test_view_query_budget_is_enforced(self):
+        @query_budget(1)
+        def view(request):
+            Employee.objects.count()
+            Employee.objects.exists()
+
+        middleware = QueryInstrumentationMiddleware(lambda request: middleware.process_view(request, view, (), {}) or view(request))
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(RequestFactory().get("/"))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ViewQueryBudgetTestCase(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.employee = Employee.objects.create_user(password="testpassword", first_name="Jane", last_name="Doe", email="jane.doe@example.com", is_staff=True)
+
+    def assertViewWithinBudget(self, path: str) -> None:
+        match = resolve(path)
+        budget = get_view_query_budget(match.func)
+        self.assertIsNotNone(budget, f"{match.view_name} declares no query budget")
+        request = self.factory.get(path)
+        request.user = self.employee
+        with self.assertQueryBudget(max_queries=budget):
+            response = match.func(request, *match.args, **match.kwargs)
+            response.render()
+        self.assertEqual(response.status_code, 200)
+
+    def test_dashboard_is_within_budget(self):
+        self.assertViewWithinBudget(reverse("portal:dashboard"))
+
+    def test_employee_detail_is_within_budget(self):
+        self.assertViewWithinBudget(reverse("employee:employee", kwargs={"pk": self.employee.pk}))
+
+    def test_docuseal_signing_views_are_within_budget(self):
+        for name in ("hca_sign", "idoa_sign", "dnd_sign", "jobdesc_sign", "i9_sign", "w4_sign", "il_w4_sign", "bg_sign"):
+            with self.subTest(view=name):
+                self.assertViewWithinBudget(reverse(f"compliance:{name}"))
@@ -1,3 +1,5 @@
+from authentication.models import UserProfile
+from compliance.models import Compliance
 from django.test import TestCase
 from employee.models import Employee
 from faker import Faker
@@ -43,6 +45,51 @@ class TestEmploymentApplicationModel(TestCase):
         self.assertTrue(new_employee.hired)
         self.assertEqual(new_employee.reviewed_by, hiring_manager)
 
+    def test_bulk_hire_applicants(self):
+        applicants = [
+            baker.make(
+                EmploymentApplicationModel,
+                last_name="Doe",
+                first_name="Jane",
+                contact_number=generate_mock_PhoneNumberField(),
+                email=f"jane.doe{index}@netthandshome.care",
+                zipcode=generate_mock_ZipCodeField(),
+                state="IL",
+            )
+            for index in range(3)
+        ]
+        hiring_manager = Employee.objects.create_user(password="testpassword", first_name="Jane", last_name="Doe")
+
+        new_hires = EmploymentApplicationModel.bulk_hire_applicants(applicants, hired_by=hiring_manager)
+
+        self.assertEqual([new_hire["username"] for new_hire in new_hires], ["doe.jane1", "doe.jane2", "doe.jane3"])
+        employee_ids = [new_hire["employee_id"] for new_hire in new_hires]
+        self.assertEqual(UserProfile.objects.filter(user_id__in=employee_ids).count(), 3)
+        self.assertEqual(Compliance.objects.filter(employee_id__in=employee_ids).count(), 3)
+        self.assertEqual(Employee.objects.get(pk=employee_ids[0]).last_name_sort_key, "do")
+        self.assertEqual(EmploymentApplicationModel.objects.filter(hired=True, reviewed_by=hiring_manager).count(), 3)
+
+    def test_bulk_hire_skips_applicants_hired_in_the_meantime(self):
+        applicants = [
+            baker.make(
+                EmploymentApplicationModel,
+                last_name="Roe",
+                first_name="Jane",
+                contact_number=generate_mock_PhoneNumberField(),
+                email=f"jane.roe{index}@netthandshome.care",
+                zipcode=generate_mock_ZipCodeField(),
+                state="IL",
+            )
+            for index in range(2)
+        ]
+        hiring_manager = Employee.objects.create_user(password="testpassword", first_name="Jane", last_name="Doe")
+        EmploymentApplicationModel.objects.filter(pk=applicants[0].pk).update(hired=True)
+
+        new_hires = EmploymentApplicationModel.bulk_hire_applicants(applicants, hired_by=hiring_manager)
+
+        self.assertEqual([new_hire["email"] for new_hire in new_hires], ["jane.roe1@netthandshome.care"])
+        self.assertFalse(Employee.objects.filter(application_id=applicants[0].pk).exists())
+
     # def test_reject_applicant(self):
     #     rejected_applicant = baker.make(
     #         EmploymentApplicationModel,
@@ -18,6 +18,7 @@ Classes:
 from typing import Any
 
 from django.contrib.auth.decorators import login_required
+from django.db.models import F
 from django.forms.models import model_to_dict
 from django.http import HttpResponse
 from django.shortcuts import render
@@ -36,21 +37,47 @@ from applications.employee.models import Employee
 from applications.portal.forms import PayrollExceptionForm
 from applications.portal.models import PayrollException
 from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
-from common.cache import CachedResponseMixin, NeverCacheMixin
+from common.cache import (
+    CachedResponseMixin,
+    NeverCacheMixin,
+    get_cached_fragment,
+    register_cache_dependents,
+)
+
+DASHBOARD_FEED: str = "DashboardFeed"
+register_cache_dependents(DASHBOARD_FEED, [Announcements])
+
+
+def get_dashboard_feed() -> list[dict[str, Any]]:
+    """
+    Build the five most recent active announcements shown on the dashboard, with each poster's first name.
+
+    The feed is read with a single joined query and cached until an announcement is saved. It does not depend on
+    Employee, whose every login updates `last_login`; a renamed poster shows up with the next announcement change.
+
+    Returns:
+        list[dict]: The announcements, newest first.
+
+    """
+
+    def compute() -> list[dict[str, Any]]:
+        announcements = (
+            Announcements.objects.filter(status=Announcements.STATUS.ACTIVE)
+            .order_by("-date_posted")
+            .values("id", "announcement_title", "message", "message_type", "status", "date_posted", poster_first_name=F("posted_by__first_name"))[:5]
+        )
+        return [{**announcement, "posted_by": announcement.pop("poster_first_name")} for announcement in announcements]
+
+    return get_cached_fragment(DASHBOARD_FEED, [Announcements], compute)
 
 
 class Dashboard(CalendarResponseMixin, TemplateView):
     template_name = "dashboard.html"
+    query_budget = 4
 
     def get_context_data(self, **kwargs) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
-        recent_announcements = list(Announcements.objects.all().filter(status="A").order_by("-date_posted")[:5])
-        listed_announcements = []
-        for announcement in list(recent_announcements):
-            announcement = model_to_dict(announcement)
-            announcement["posted_by"] = Employee.objects.get(employee_id=announcement["posted_by"]).first_name
-            listed_announcements.append(announcement)
-        context["recent_announcements"] = listed_announcements
+        context["recent_announcements"] = get_dashboard_feed()
         context["ExceptionForm"] = PayrollExceptionForm()
         return context
 
@@ -117,7 +144,7 @@ class ClientInquiriesListView(CachedResponseMixin, ListView):
     model = ClientInterestSubmission
     primary_model = model
     cache_models = []
-    queryset = ClientInterestSubmission.objects.all().order_by("-date_submitted")
+    queryset = ClientInterestSubmission.objects.decrypt_only("first_name", "last_name", "desired_service").order_by("-date_submitted")
     context_object_name = "submissions"
     paginate_by = 25
 
@@ -155,8 +182,8 @@ class EmploymentApplicationListView(CachedResponseMixin, ListView):
     template_name = "submitted-applications.html"
     model = EmploymentApplicationModel
     primary_model = model
-    cache_model = []
-    queryset = EmploymentApplicationModel.objects.all().order_by("-date_submitted")
+    cache_models = []
+    queryset = EmploymentApplicationModel.objects.decrypt_only("first_name", "last_name").order_by("-date_submitted")
     context_object_name = "submissions"
     paginate_by = 25
 
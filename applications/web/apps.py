@@ -17,3 +17,6 @@ class WebConfig(AppConfig):
         plugin_dir.register(CloudObjectStorageBackend)
         plugin_dir.register(DocSealSigningServiceHealthCheck)
         plugin_dir.register(SMTPEmailBackend)
+
+        # NOTE: Registers the cache dependencies of the public cached views (see PortalConfig.ready).
+        import applications.web.views  # noqa: F401
@@ -19,6 +19,7 @@ from crispy_forms.helper import FormHelper
 from crispy_forms.layout import HTML, Column, Field, Layout, Row, Submit
 from django import forms
 from django.forms import ModelForm, fields
+from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from formset.fields import Activator
 from formset.renderers import ButtonVariant
@@ -26,6 +27,13 @@ from formset.widgets import Button, UploadedFileInput
 
 from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
 
+RESUME_MAX_SIZE = 2 * 1024 * 1024  # 2 MB
+RESUME_MIME_TYPES = [
+    "application/msword",
+    "application/pdf",
+    "text/plain",
+]
+
 
 class ClientInterestForm(ModelForm):
     """Form definition for ClientInterestSubmission."""
@@ -120,6 +128,9 @@ class EmploymentApplicationForm(ModelForm):
             attrs={
                 "max-size": 1024 * 1024,
                 "accept": "application/msword, application/pdf, text/plain",
+                "data-presign-url": reverse_lazy("web:presign_resume_upload"),
+                "data-confirm-url": reverse_lazy("web:confirm_resume_upload"),
+                "data-presign-from": "first_name,last_name",
             }
         ),
         help_text="Optional - Upload a copy of your resume or work history. Only .doc, .pdf OR .txt up to 1MB",
@@ -225,8 +236,7 @@ class EmploymentApplicationForm(ModelForm):
 
         if resume_cv := self.cleaned_data.get("resume_cv"):
             # Validate file size
-            max_size = 2 * 1024 * 1024  # 2 MB
-            if resume_cv.size > max_size:
+            if resume_cv.size > RESUME_MAX_SIZE:
                 self.add_error(
                     "resume_cv",
                     forms.ValidationError(
@@ -236,12 +246,7 @@ class EmploymentApplicationForm(ModelForm):
                 )
 
             # Validate MIME type
-            allowed_mime_types = [
-                "application/msword",
-                "application/pdf",
-                "text/plain",
-            ]
-            if resume_cv.content_type not in allowed_mime_types:
+            if resume_cv.content_type not in RESUME_MIME_TYPES:
                 self.add_error(
                     "resume_cv",
                     forms.ValidationError(
@@ -0,0 +1,38 @@
+"""
+Management command: backfill_blind_indexes
+
+Recomputes the HMAC blind index columns of `ClientInterestSubmission` and `EmploymentApplicationModel`.
+Run it once after the blind index migration, and again whenever `BLIND_INDEX_KEY` changes.
+
+Usage:
+    python run/manage.py backfill_blind_indexes [--batch-size 500]
+
+"""
+
+from django.core.management.base import BaseCommand
+
+from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
+
+
+class Command(BaseCommand):
+    help = "Recompute the blind index columns of applicant and client submissions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows decrypted and updated per query")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        for model in (ClientInterestSubmission, EmploymentApplicationModel):
+            updated = 0
+            last_pk = 0
+            while True:
+                # NOTE: Pages by primary key so each batch decrypts only its own rows and only the indexed fields.
+                batch = list(model.objects.decrypt_only(*model.BLIND_INDEXES).filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+                if not batch:
+                    break
+                for instance in batch:
+                    instance.refresh_blind_indexes()
+                model.objects.bulk_update(batch, list(model.BLIND_INDEXES.values()))
+                updated += len(batch)
+                last_pk = batch[-1].pk
+            self.stdout.write(self.style.SUCCESS(f"Backfilled blind indexes for {updated} {model._meta.verbose_name_plural}"))
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("web", "0002_alter_employmentapplicationmodel_resume_cv"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clientinterestsubmission",
+            name="first_name_bidx",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="clientinterestsubmission",
+            name="last_name_bidx",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="clientinterestsubmission",
+            name="email_bidx",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="employmentapplicationmodel",
+            name="first_name_bidx",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="employmentapplicationmodel",
+            name="last_name_bidx",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="employmentapplicationmodel",
+            name="email_bidx",
+            field=models.CharField(blank=True, db_index=True, default="", editable=False, max_length=64),
+        ),
+    ]
@@ -22,7 +22,7 @@ from typing import Any
 
 from arrow import Arrow, now
 from django.contrib.auth.hashers import make_password
-from django.db import models
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django_extensions.db.fields import CreationDateTimeField, ModificationDateTimeField
 from django_prometheus.models import ExportModelOperationsMixin
@@ -33,6 +33,7 @@ from phonenumber_field.modelfields import PhoneNumberField
 from sage_encrypt.fields.asymmetric import EncryptedCharField, EncryptedEmailField
 
 from applications.employee.models import Employee
+from common.encryption import BatchDecryptMixin, BatchDecryptQuerySet, BlindIndexMixin
 from common.upload import UploadHandler
 
 now: Arrow = now(tz="US/Central")
@@ -47,7 +48,7 @@ pwo.minnumbers = 1  # (Optional)
 pwo.minschars = 1  # (Optional)
 
 
-class ClientInterestSubmission(models.Model, ExportModelOperationsMixin("client_inquiries")):
+class ClientInterestSubmission(BlindIndexMixin, BatchDecryptMixin, models.Model, ExportModelOperationsMixin("client_inquiries")):
     """
     Model representing client interest submissions.
 
@@ -103,6 +104,9 @@ class ClientInterestSubmission(models.Model, ExportModelOperationsMixin("client_
         PHYS_THERAPY = "PT", _("Physical Therapy")
         OTHER = "NA", _("Other")
 
+    BLIND_INDEXES = {"first_name": "first_name_bidx", "last_name": "last_name_bidx", "email": "email_bidx"}
+
+    objects = BatchDecryptQuerySet.as_manager()
     first_name = EncryptedCharField(max_length=10485760)
     last_name = EncryptedCharField(max_length=10485760)
     email = EncryptedEmailField(null=True)
@@ -117,6 +121,10 @@ class ClientInterestSubmission(models.Model, ExportModelOperationsMixin("client_
     date_submitted = CreationDateTimeField(auto_now_add=True)
     reviewed = models.BooleanField(null=True, blank=True, default=False, db_index=True)
     last_modified = ModificationDateTimeField()
+    # NOTE: Keyed HMAC blind indexes of first_name, last_name and email for exact-match lookups (see common.encryption).
+    first_name_bidx = models.CharField(max_length=64, blank=True, default="", editable=False, db_index=True)
+    last_name_bidx = models.CharField(max_length=64, blank=True, default="", editable=False, db_index=True)
+    email_bidx = models.CharField(max_length=64, blank=True, default="", editable=False, db_index=True)
     reviewed_by = models.ForeignKey(
         Employee,
         on_delete=models.DO_NOTHING,
@@ -153,7 +161,7 @@ applicant_resume_uploads = UploadHandler("applicant/resume")
 applicant_cpr_card_uploads = UploadHandler("applicant/cpr_card")
 
 
-class EmploymentApplicationModel(models.Model, ExportModelOperationsMixin("applications")):
+class EmploymentApplicationModel(BlindIndexMixin, BatchDecryptMixin, models.Model, ExportModelOperationsMixin("applications")):
     """
     Model representing an employment application.
 
@@ -232,6 +240,9 @@ class EmploymentApplicationModel(models.Model, ExportModelOperationsMixin("appli
         JUNIOR = "J", _("3+ Months")
         NEW = "N", _("No Prior Experience")
 
+    BLIND_INDEXES = {"first_name": "first_name_bidx", "last_name": "last_name_bidx", "email": "email_bidx"}
+
+    objects = BatchDecryptQuerySet.as_manager()
     first_name = EncryptedCharField(max_length=10485760)
     last_name = EncryptedCharField(max_length=10485760)
     contact_number = PhoneNumberField(region="US")
@@ -263,6 +274,10 @@ class EmploymentApplicationModel(models.Model, ExportModelOperationsMixin("appli
     )
     date_submitted = CreationDateTimeField()
     last_modified = ModificationDateTimeField()
+    # NOTE: Keyed HMAC blind indexes of first_name, last_name and email for exact-match lookups (see common.encryption).
+    first_name_bidx = models.CharField(max_length=64, blank=True, default="", editable=False, db_index=True)
+    last_name_bidx = models.CharField(max_length=64, blank=True, default="", editable=False, db_index=True)
+    email_bidx = models.CharField(max_length=64, blank=True, default="", editable=False, db_index=True)
     employee_id = models.BigIntegerField(blank=True, null=True)
     resume_cv = models.FileField(upload_to=applicant_resume_uploads.generate_randomized_file_name, null=True, blank=True)
 
@@ -328,6 +343,80 @@ class EmploymentApplicationModel(models.Model, ExportModelOperationsMixin("appli
             "last_name": new_employee.last_name,
         }
 
+    @classmethod
+    def bulk_hire_applicants(cls, applicants: list["EmploymentApplicationModel"], hired_by: Employee) -> list[dict[str, Any]]:
+        """
+        Hire several applicants in one transaction.
+
+        Usernames are allocated with a single query, and the Employee, UserProfile and Compliance rows are each written with
+        one `bulk_create`. Bulk writes bypass model signals, so the ancillary profiles are created here and the affected
+        cached responses are invalidated explicitly once the transaction commits.
+
+        Args:
+            applicants (list[EmploymentApplicationModel]): The applicants to hire; any already hired are skipped.
+            hired_by (Employee): The employee hiring the applicants.
+
+        Returns:
+            list[dict]: The onboarding credentials of each new employee (email, first_name, plaintext_temp_password,
+                username and employee_id), in applicant primary key order.
+
+        """
+        from applications.authentication.models import UserProfile
+        from applications.compliance.models import Compliance
+        from common.cache import invalidate_cache
+
+        with transaction.atomic():
+            # NOTE: The applicants are locked in primary key order and re-read as still unhired, so overlapping bulk hires
+            # wait for each other and an applicant hired in the meantime is skipped rather than hired twice.
+            applicants = list(cls.objects.select_for_update().filter(pk__in=[applicant.pk for applicant in applicants], hired=False).order_by("pk"))
+            if not applicants:
+                return []
+            usernames = Employee.create_unique_usernames([(applicant.first_name, applicant.last_name) for applicant in applicants])
+            passwords = [pwo.generate() for _ in applicants]
+            new_employees = [
+                Employee(
+                    is_superuser=False,
+                    username=username,
+                    is_active=True,
+                    first_name=applicant.first_name,
+                    last_name=applicant.last_name,
+                    # NOTE: bulk_create skips Employee.save(), which normally derives the roster sort key.
+                    last_name_sort_key=Employee.get_last_name_sort_key(applicant.last_name),
+                    email=applicant.email,
+                    street_address1=applicant.home_address1,
+                    street_address2=applicant.home_address2,
+                    state=applicant.state,
+                    city=applicant.city,
+                    zipcode=applicant.zipcode,
+                    application_id=applicant.pk,
+                    qualifications_verification=applicant.resume_cv,
+                    password=make_password(password),
+                )
+                for applicant, username, password in zip(applicants, usernames, passwords, strict=True)
+            ]
+            Employee.objects.bulk_create(new_employees)
+            UserProfile.objects.bulk_create([UserProfile(user=employee) for employee in new_employees])
+            Compliance.objects.bulk_create([Compliance(employee=employee) for employee in new_employees])
+            for applicant, employee in zip(applicants, new_employees, strict=True):
+                applicant.hired = True
+                applicant.reviewed = True
+                applicant.reviewed_by = hired_by
+                applicant.employee_id = employee.employee_id
+            cls.objects.bulk_update(applicants, ["hired", "reviewed", "reviewed_by", "employee_id"])
+            for model in (Employee, UserProfile, Compliance, cls):
+                transaction.on_commit(lambda model=model: invalidate_cache(sender=model))
+        logger.success(f"Hired {len(new_employees)} Applicants")
+        return [
+            {
+                "email": employee.email,
+                "first_name": employee.first_name,
+                "plaintext_temp_password": password,
+                "username": employee.username,
+                "employee_id": employee.employee_id,
+            }
+            for employee, password in zip(new_employees, passwords, strict=True)
+        ]
+
     def reject_applicant(self, rejected_by: Employee) -> None:
         """
         Rejects an applicant.
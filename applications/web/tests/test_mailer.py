@@ -1,3 +1,21 @@
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from applications.employee.models import Employee
+from common.email_rendering import CompiledTemplate, get_compiled_email, render_email
+from common.email_templates import PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE
+from common.mail_queue import (
+    BulkMailCheckpoint,
+    deserialize_message,
+    send_bulk_emails,
+    send_queued_emails,
+    serialize_message,
+)
+from common.mailer import PostOffice
+
 # from django.conf import settings
 # from django.core import mail
 # from django.test import TestCase
@@ -30,3 +48,74 @@
 #         mail.send_mail("Subject here", "Here is the message.", "from@example.com", ["to@example.com"], fail_silently=False)
 #         self.assertEqual(len(mail.outbox), 1)
 #         self.assertEqual(mail.outbox[0].subject, "Subject here")
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}, MAIL_RATE_LIMIT_PER_SECOND=100)
+class MailQueueTestCase(TestCase):
+    def compose(self, index: int) -> EmailMultiAlternatives:
+        message = EmailMultiAlternatives(subject=f"Subject {index}", body="Plain", from_email="hr@netthandshome.care", to=[f"recipient{index}@example.com"], reply_to=["hr@netthandshome.care"])
+        message.attach_alternative("<p>HTML</p>", "text/html")
+        return message
+
+    def test_message_survives_serialization(self):
+        message = deserialize_message(serialize_message(self.compose(0)))
+        self.assertEqual(message.to, ["recipient0@example.com"])
+        self.assertEqual(message.reply_to, ["hr@netthandshome.care"])
+        self.assertEqual(message.alternatives[0][1], "text/html")
+
+    def test_batch_is_delivered(self):
+        result = send_queued_emails.apply(args=[[serialize_message(self.compose(index)) for index in range(3)]])
+        self.assertEqual(result.get(), 3)
+        self.assertEqual([message.subject for message in mail.outbox], ["Subject 0", "Subject 1", "Subject 2"])
+
+    def send_bulk(self, campaign_id: str, recipient_ids: list[int]) -> int:
+        kwargs = {
+            "campaign_id": campaign_id,
+            "template_name": "announcement",
+            "model_label": "nhhc_employee.Employee",
+            "recipient_ids": recipient_ids,
+            "context": {"announcement_title": "Office Closed", "message": "The office is closed on Monday."},
+            "from_email": "hr@netthandshome.care",
+            "reply_to": "hr@netthandshome.care",
+        }
+        return send_bulk_emails.apply(kwargs=kwargs).get()
+
+    @override_settings(MAIL_BATCH_SIZE=2)
+    def test_bulk_send_renders_each_recipient_and_resumes_from_checkpoint(self):
+        employees = [Employee.objects.create_user(password="testpassword", first_name=f"Jane{index}", last_name="Doe", email=f"jane{index}@example.com") for index in range(3)]
+        recipient_ids = [employee.pk for employee in employees]
+        BulkMailCheckpoint("resumed").save(recipient_ids[0])
+        self.assertEqual(self.send_bulk("resumed", recipient_ids), 2)
+        self.assertEqual([message.to for message in mail.outbox], [["jane1@example.com"], ["jane2@example.com"]])
+        self.assertTrue(mail.outbox[0].body.startswith("\nDear Jane1,"))
+        self.assertEqual(mail.outbox[0].subject, "New Announcement: Office Closed")
+        self.assertEqual(self.send_bulk("resumed", recipient_ids), 0)
+        self.assertEqual(len(mail.outbox), 2)
+
+    @override_settings(MAIL_BATCH_SIZE=2)
+    def test_bulk_send_queues_one_task_per_batch(self):
+        recipient_ids = [Employee.objects.create_user(password="testpassword", first_name=f"Jane{index}", last_name="Doe", email=f"jane{index}@example.com").pk for index in range(3)]
+        with patch("common.mailer.send_bulk_emails.apply_async") as apply_async:
+            campaign_id = PostOffice("hr@netthandshome.care").send_bulk("announcement", Employee.objects.filter(pk__in=recipient_ids), campaign_id="batched")
+        self.assertEqual(campaign_id, "batched")
+        self.assertEqual([call.kwargs["kwargs"]["recipient_ids"] for call in apply_async.call_args_list], [recipient_ids[:2], recipient_ids[2:]])
+
+
+class EmailRenderingTestCase(SimpleTestCase):
+    def test_compiled_template_matches_string_template(self):
+        compiled = CompiledTemplate("Dear $first_name, you owe $$5 to ${username}.")
+        self.assertEqual(compiled.render({"first_name": "Jane", "username": "doe.jane"}), "Dear Jane, you owe $5 to doe.jane.")
+        with self.assertRaises(KeyError):
+            compiled.render({"first_name": "Jane"})
+
+    def test_onboarding_email_is_rendered_in_one_pass(self):
+        context = {"first_name": "Jane", "username": "doe.jane", "plaintext_password": "<b>secret</b>"}
+        email = render_email("new_hire_onboarding", context, locale="en-us")
+        self.assertEqual(email.subject, "Welcome to Nett Hands, Jane!")
+        self.assertEqual(email.text, PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE.substitute(context))
+        self.assertIn("&lt;b&gt;secret&lt;/b&gt;", email.html)
+        self.assertNotIn("<b>secret</b>", email.html)
+
+    def test_unlocalized_emails_fall_back_to_the_default_locale(self):
+        self.assertIs(get_compiled_email("rejection", "es-mx"), get_compiled_email("rejection", "en"))
+        self.assertIsNone(render_email("termination", {"first_name": "Jane"}, locale="en").html)
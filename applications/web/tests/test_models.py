@@ -0,0 +1,84 @@
+from django.core.exceptions import FieldError
+from django.test import TestCase
+
+from applications.web.models import ClientInterestSubmission
+from common.encryption import (
+    DecryptedValueCache,
+    _decrypted_value_cache,
+    compute_blind_index,
+    get_encrypted_field_names,
+)
+
+
+class BatchDecryptTestCase(TestCase):
+    def setUp(self):
+        for index in range(3):
+            ClientInterestSubmission.objects.create(
+                first_name=f"First{index}",
+                last_name=f"Last{index}",
+                email=f"client{index}@example.com",
+                contact_number="+13125550100",
+                zipcode="60601",
+                insurance_carrier="ABC Insurance",
+                desired_service="NM",
+            )
+
+    def test_encrypted_fields_are_detected(self):
+        encrypted_fields = get_encrypted_field_names(ClientInterestSubmission)
+        self.assertIn("first_name", encrypted_fields)
+        self.assertIn("email", encrypted_fields)
+        self.assertNotIn("contact_number", encrypted_fields)
+
+    def test_decrypt_only_defers_other_encrypted_fields(self):
+        submission = ClientInterestSubmission.objects.decrypt_only("first_name").first()
+        self.assertEqual(submission.get_deferred_fields() & {"first_name", "email"}, {"email"})
+
+    def test_deferred_field_is_loaded_for_whole_batch_in_one_query(self):
+        submissions = list(ClientInterestSubmission.objects.decrypt_only("first_name").order_by("pk"))
+        with self.assertNumQueries(1):
+            emails = [submission.email for submission in submissions]
+        self.assertEqual(emails, [f"client{index}@example.com" for index in range(3)])
+
+    def test_request_cache_serves_repeated_deferred_reads(self):
+        token = _decrypted_value_cache.set(DecryptedValueCache())
+        try:
+            first_read = [submission.email for submission in ClientInterestSubmission.objects.decrypt_only("first_name")]
+            submissions = list(ClientInterestSubmission.objects.decrypt_only("first_name"))
+            with self.assertNumQueries(0):
+                second_read = [submission.email for submission in submissions]
+            self.assertCountEqual(first_read, second_read)
+        finally:
+            _decrypted_value_cache.reset(token)
+
+
+class BlindIndexTestCase(TestCase):
+    def setUp(self):
+        self.submission = ClientInterestSubmission.objects.create(
+            first_name="Jane",
+            last_name="Doe",
+            email="Jane.Doe@example.com",
+            contact_number="+13125550100",
+            zipcode="60601",
+            insurance_carrier="ABC Insurance",
+            desired_service="NM",
+        )
+
+    def test_blind_index_is_normalized_and_field_scoped(self):
+        self.assertEqual(compute_blind_index(" JANE ", "first_name"), compute_blind_index("jane", "first_name"))
+        self.assertNotEqual(compute_blind_index("jane", "first_name"), compute_blind_index("jane", "last_name"))
+        self.assertEqual(compute_blind_index("", "first_name"), "")
+
+    def test_blind_indexes_are_maintained_on_save(self):
+        self.assertEqual(self.submission.email_bidx, compute_blind_index("jane.doe@example.com", "email"))
+        self.submission.last_name = "Smith"
+        self.submission.save(update_fields=["last_name"])
+        self.submission.refresh_from_db()
+        self.assertEqual(self.submission.last_name_bidx, compute_blind_index("smith", "last_name"))
+
+    def test_filter_blind_matches_exactly(self):
+        self.assertEqual(list(ClientInterestSubmission.objects.filter_blind(email="jane.doe@EXAMPLE.com")), [self.submission])
+        self.assertFalse(ClientInterestSubmission.objects.filter_blind(first_name="Janet").exists())
+
+    def test_filter_blind_rejects_unindexed_fields(self):
+        with self.assertRaises(FieldError):
+            ClientInterestSubmission.objects.filter_blind(city="Chicago")
@@ -1,8 +1,14 @@
-from django.test import Client, RequestFactory, TestCase
+from django.core.cache import cache
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
 from faker import Faker
 
-from applications.web.views import AboutUsView, HomePageView, SuccessfulSubmission
+from applications.web.views import (
+    AboutUsView,
+    HomePageView,
+    SuccessfulSubmission,
+    presign_resume_upload,
+)
 
 test_data = Faker()
 
@@ -47,3 +53,17 @@ class RobotsTxtTests(TestCase):
     def test_post_disallowed(self):
         response = self.client.post("/robots.txt")
         self.assertEqual(302, response.status_code)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}, RESUME_PRESIGN_RATE_LIMIT=2)
+class PresignResumeUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def presign(self, address="203.0.113.7"):
+        return presign_resume_upload(self.factory.post("/", data="{}", content_type="application/json", REMOTE_ADDR=address))
+
+    def test_presigns_are_limited_per_client_address(self):
+        self.assertEqual([self.presign().status_code for _ in range(3)], [400, 400, 429])
+        self.assertEqual(self.presign(address="203.0.113.8").status_code, 400)
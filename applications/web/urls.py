@@ -15,5 +15,7 @@ urlpatterns = [
     path("about/", views.AboutUsView.as_view(), name="about_us"),
     path("client-interest/", views.ClientInterestFormView.as_view(), name="client_interest_form"),
     path("employment-application/", csrf_protect(views.EmploymentApplicationFormView.as_view()), name="employment_application_form"),
+    path("employment-application/resume/presign/", views.presign_resume_upload, name="presign_resume_upload"),
+    path("employment-application/resume/confirm/", views.confirm_resume_upload, name="confirm_resume_upload"),
     path("submission-confirmation/", views.SuccessfulSubmission.as_view(), name="form_submission_success"),
 ]
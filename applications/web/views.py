@@ -3,33 +3,51 @@ Module: web_views.py
 Description: This module contains views for rendering web pages, processing form data, and sending email notifications.
 """
 
+import json
+import time
 from functools import cached_property
+from types import SimpleNamespace
 
+from defender.utils import get_ip
 from django.conf import settings
+from django.core.cache import cache
 from django.http import (
     FileResponse,
     HttpRequest,
     HttpResponse,
     HttpResponsePermanentRedirect,
     HttpResponseRedirect,
+    JsonResponse,
 )
 from django.shortcuts import render
 from django.templatetags.static import static
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
+from django.utils.text import slugify
 from django.views.decorators.cache import cache_page
-from django.views.decorators.http import require_safe
+from django.views.decorators.http import require_POST, require_safe
 from django_require_login.mixins import PublicViewMixin, public
 from formset.views import FormView
 from loguru import logger
 
-from applications.web.forms import ClientInterestForm, EmploymentApplicationForm
-from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
+from applications.web.forms import (
+    RESUME_MAX_SIZE,
+    RESUME_MIME_TYPES,
+    ClientInterestForm,
+    EmploymentApplicationForm,
+)
+from applications.web.models import (
+    ClientInterestSubmission,
+    EmploymentApplicationModel,
+    applicant_resume_uploads,
+)
 from applications.web.tasks import process_new_application, process_new_client_interest
 from common.cache import CachedResponseMixin, CachedTemplateView
 from common.metrics import metrics
+from common.upload import S3HANDLER, FileValidationError
 
 CACHE_TTL: int = settings.CACHE_TTL
+RESUME_UPLOAD_SESSION_KEY = "direct_upload:resume_cv"
 
 
 # SECTION - Page Rendering Views
@@ -178,6 +196,10 @@ class EmploymentApplicationFormView(CachedResponseMixin, PublicViewMixin, FormVi
             if resume := request.FILES.get("resume_cv"):
                 logger.debug(f"Resume file uploaded: {resume.name}")
                 return self.form_valid(form, resume)
+            if resume_name := request.session.pop(RESUME_UPLOAD_SESSION_KEY, None):
+                logger.debug(f"Resume file uploaded directly to object storage: {resume_name}")
+                form.instance.resume_cv = resume_name
+                return self.form_valid(form, form.instance.resume_cv)
             return self.form_valid(form)
 
         metrics.increment_failed_submissions("employment-application")
@@ -185,6 +207,93 @@ class EmploymentApplicationFormView(CachedResponseMixin, PublicViewMixin, FormVi
         return render(request, self.template_name, {"form": form, "form_errors": form.errors})
 
 
+def get_resume_upload_scope(request: HttpRequest) -> str:
+    # NOTE: Tokens are bound to the applicant's session, so a confirmed upload can only be attached to their application.
+    if request.session.session_key is None:
+        request.session.save()
+    return f"resume_cv:{request.session.session_key}"
+
+
+def is_presign_rate_limited(request: HttpRequest) -> bool:
+    """
+    Count a presign request against its client address and report whether the address is over its limit.
+
+    The endpoint is public, so requests are counted per address (resolved behind the proxy as defender does) rather than
+    per session, in a fixed window shared through the default cache.
+
+    Args:
+        request (HttpRequest): The presign request.
+
+    Returns:
+        bool: True if the address has requested more than `RESUME_PRESIGN_RATE_LIMIT` presigns in the current window.
+
+    """
+    window = int(time.time()) // settings.RESUME_PRESIGN_RATE_WINDOW
+    key = f"resume-presign:{get_ip(request)}:{window}"
+    cache.add(key, 0, timeout=settings.RESUME_PRESIGN_RATE_WINDOW)
+    try:
+        return cache.incr(key) > settings.RESUME_PRESIGN_RATE_LIMIT
+    except ValueError:
+        # NOTE: The window expired between add() and incr(); the request is the first of the next one.
+        return False
+
+
+@public
+@require_POST
+def presign_resume_upload(request: HttpRequest) -> JsonResponse:
+    """
+    Issue a presigned POST for uploading an applicant's resume straight to object storage.
+
+    Args:
+        request (HttpRequest): A JSON body with the applicant's `first_name` and `last_name` and the file's `content_type`.
+
+    Returns:
+        JsonResponse(status code: 200): The `url` and `fields` to POST the file with, and the `token` to confirm it with.
+        JsonResponse(status code: 400): If the request is malformed or the file type is not allowed.
+        JsonResponse(status code: 429): If the client has requested too many uploads recently.
+
+    """
+    if is_presign_rate_limited(request):
+        logger.warning(f"Resume Upload Presign Rate Limit Exceeded for {get_ip(request)}")
+        return JsonResponse({"error": "Too many uploads. Please try again later."}, status=429)
+    try:
+        payload = json.loads(request.body)
+        applicant = SimpleNamespace(first_name=slugify(payload["first_name"]), last_name=slugify(payload["last_name"]))
+        content_type = payload["content_type"]
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Malformed Resume Upload Request: {e}")
+        return JsonResponse({"error": "Malformed Request"}, status=400)
+    if content_type not in RESUME_MIME_TYPES or not (applicant.first_name and applicant.last_name):
+        return JsonResponse({"error": "Invalid file type. Allowed types are .doc, .pdf, and .txt."}, status=400)
+    return JsonResponse(applicant_resume_uploads.presign_upload(applicant, content_type, RESUME_MAX_SIZE, scope=get_resume_upload_scope(request))._asdict())
+
+
+@public
+@require_POST
+def confirm_resume_upload(request: HttpRequest) -> JsonResponse:
+    """
+    Confirm a resume uploaded straight to object storage, attaching it to the applicant's pending application.
+
+    Args:
+        request (HttpRequest): A JSON body with the `token` issued by `presign_resume_upload`.
+
+    Returns:
+        JsonResponse(status code: 200): The upload was verified and will be saved with the application.
+        JsonResponse(status code: 400): If the request is malformed or the upload could not be verified.
+
+    """
+    try:
+        name = S3HANDLER.confirm_direct_upload(json.loads(request.body)["token"], scope=get_resume_upload_scope(request))
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Malformed Resume Upload Confirmation: {e}")
+        return JsonResponse({"error": "Malformed Request"}, status=400)
+    except FileValidationError as e:
+        logger.warning(f"Resume Upload Rejected: {e}")
+        return JsonResponse({"error": str(e)}, status=400)
+    request.session[RESUME_UPLOAD_SESSION_KEY] = name
+    return JsonResponse({"name": name})
+
+
 @public
 @cache_page(CACHE_TTL)
 def favicon(request: HttpRequest) -> HttpResponse:
@@ -0,0 +1,12 @@
+import os
+
+
+def setup_django() -> None:
+    """
+    Configure Django for benchmarks that exercise the ORM, the same way `common.celery` does for workers.
+    """
+    import configurations
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    os.environ.setdefault("DJANGO_CONFIGURATION", "Development")
+    configurations.setup()
@@ -0,0 +1,95 @@
+"""
+Module: benchmarks.cache_invalidation
+
+Compares the latency of the two cache invalidation strategies used by `common.cache.invalidate_cache`:
+
+- KEYS scan: `KEYS <model>:*` followed by `DEL` of every match (the previous implementation).
+- Generation bump: a single `INCR` of the model's generation counter (the current implementation).
+
+The benchmark talks to Redis directly so it can be run without a configured Django environment.
+
+Usage:
+    BENCHMARK_REDIS_URL=redis://localhost:6379/15 python -m benchmarks.cache_invalidation --sizes 10000 100000
+
+Note: The target database is flushed before each run. Never point this at a shared Redis database.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import redis
+
+MODEL_NAME = "EmploymentApplicationModel"
+PAYLOAD = b"x" * 512
+
+
+def populate(client: redis.Redis, size: int) -> None:
+    """
+    Fill the benchmark database with `size` cached responses namespaced under the benchmark model.
+
+    Args:
+        client (redis.Redis): The Redis client to populate.
+        size (int): The number of cached keys to create.
+
+    """
+    client.flushdb()
+    pipeline = client.pipeline(transaction=False)
+    for index in range(size):
+        pipeline.set(f"{MODEL_NAME}:g1:EmploymentApplicationModelAPIListView_{index}_cache_key", PAYLOAD, ex=3600)
+        if index % 5000 == 0:
+            pipeline.execute()
+    pipeline.execute()
+
+
+def time_keys_scan(client: redis.Redis) -> float:
+    start = time.perf_counter()
+    if cache_keys := client.keys(f"{MODEL_NAME}:*"):
+        client.delete(*cache_keys)
+    return time.perf_counter() - start
+
+
+def time_generation_bump(client: redis.Redis) -> float:
+    start = time.perf_counter()
+    client.incr(f"cache-generation:{MODEL_NAME}")
+    return time.perf_counter() - start
+
+
+def run(client: redis.Redis, size: int, rounds: int) -> dict[str, float]:
+    """
+    Measure both invalidation strategies against a database holding `size` cached keys.
+
+    Args:
+        client (redis.Redis): The Redis client used for the benchmark.
+        size (int): The number of cached keys present before each invalidation.
+        rounds (int): The number of invalidations to measure per strategy.
+
+    Returns:
+        dict: The median latency in milliseconds of each strategy.
+
+    """
+    keys_scan, generation_bump = [], []
+    for _ in range(rounds):
+        populate(client, size)
+        generation_bump.append(time_generation_bump(client))
+        keys_scan.append(time_keys_scan(client))
+    return {"keys_scan_ms": statistics.median(keys_scan) * 1000, "generation_bump_ms": statistics.median(generation_bump) * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    client = redis.Redis.from_url(os.environ.get("BENCHMARK_REDIS_URL", "redis://localhost:6379/15"))
+    print(f"{'cached keys':>12} | {'KEYS + DEL (ms)':>16} | {'INCR (ms)':>10}")
+    for size in args.sizes:
+        result = run(client, size, args.rounds)
+        print(f"{size:>12} | {result['keys_scan_ms']:>16.3f} | {result['generation_bump_ms']:>10.3f}")
+    client.flushdb()
+
+
+if __name__ == "__main__":
+    main()
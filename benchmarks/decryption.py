@@ -0,0 +1,106 @@
+"""
+Module: benchmarks.decryption
+
+Measures list-page latency for `ClientInterestSubmission`, whose PII is stored in `sage_encrypt` fields, comparing:
+
+- full: `objects.all()`, which decrypts every encrypted column of every row.
+- decrypt_only: `objects.decrypt_only(...)`, which decrypts only the columns the list page renders.
+- decrypt_only + late field: as above, then reads one deferred encrypted field on every row (batched into one query).
+- 2nd render, cached: the extra cost of rendering the decrypt_only + late field page a second time within the same
+  request, where the late field is served from the request's decrypted value cache.
+
+Rows are inserted inside a transaction that is rolled back, so the benchmark leaves the database unchanged.
+
+Usage:
+    task benchmark -- decryption --sizes 100 1000 10000
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from benchmarks import setup_django
+
+LIST_FIELDS = ("first_name", "last_name", "desired_service")
+
+
+def render_page(queryset, fields) -> None:
+    for submission in queryset:
+        for field in fields:
+            getattr(submission, field)
+
+
+def measure(func: Callable[[], None], rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def run(size: int, rounds: int) -> dict[str, float]:
+    """
+    Measure every strategy against a table holding `size` submissions.
+
+    Args:
+        size (int): The number of rows listed per page.
+        rounds (int): The number of measured renders per strategy.
+
+    Returns:
+        dict: The median latency in milliseconds of each strategy.
+
+    """
+    from django.db import transaction
+
+    from applications.web.models import ClientInterestSubmission
+    from common.encryption import DecryptedValueCache, _decrypted_value_cache
+
+    with transaction.atomic():
+        ClientInterestSubmission.objects.bulk_create(
+            ClientInterestSubmission(
+                first_name=f"First{index}",
+                last_name=f"Last{index}",
+                email=f"client{index}@example.com",
+                contact_number="+13125550100",
+                zipcode="60601",
+                insurance_carrier="Benchmark Insurance",
+                desired_service="NM",
+            )
+            for index in range(size)
+        )
+        results = {
+            "full": measure(lambda: render_page(ClientInterestSubmission.objects.order_by("-date_submitted")[:size], LIST_FIELDS), rounds),
+            "decrypt_only": measure(lambda: render_page(ClientInterestSubmission.objects.decrypt_only(*LIST_FIELDS).order_by("-date_submitted")[:size], LIST_FIELDS), rounds),
+            "late_field": measure(lambda: render_page(ClientInterestSubmission.objects.decrypt_only(*LIST_FIELDS).order_by("-date_submitted")[:size], (*LIST_FIELDS, "email")), rounds),
+        }
+
+        def render_twice_in_request():
+            token = _decrypted_value_cache.set(DecryptedValueCache())
+            try:
+                for _ in range(2):
+                    render_page(ClientInterestSubmission.objects.decrypt_only(*LIST_FIELDS).order_by("-date_submitted")[:size], (*LIST_FIELDS, "email"))
+            finally:
+                _decrypted_value_cache.reset(token)
+
+        results["request_cache"] = measure(render_twice_in_request, rounds) - results["late_field"]
+        transaction.set_rollback(True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1_000, 10_000])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    print(f"{'rows':>8} | {'full (ms)':>10} | {'decrypt_only (ms)':>18} | {'+ late field (ms)':>18} | {'2nd render, cached (ms)':>24}")
+    for size in args.sizes:
+        result = run(size, args.rounds)
+        print(f"{size:>8} | {result['full']:>10.1f} | {result['decrypt_only']:>18.1f} | {result['late_field']:>18.1f} | {result['request_cache']:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
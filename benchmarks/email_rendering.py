@@ -0,0 +1,80 @@
+"""
+Module: benchmarks.email_rendering
+
+Measures how fast new hire onboarding emails are rendered, comparing:
+
+- string.Template: the previous rendering, a `substitute()` of the full HTML and plain-text templates per message.
+- compiled: `common.email_rendering.render_email`, which joins the precompiled, minified segments of both parts.
+
+Each recipient gets a distinct name, username and password so nothing is shared between messages. The benchmark only
+renders; it does not build or send MIME messages, so it can be run without a configured Django environment.
+
+Usage:
+    task benchmark -- email_rendering --messages 10000 --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from common.email_rendering import DEFAULT_EMAIL_LOCALE, render_email
+from common.email_templates import (
+    NEW_HIRE_ONBOARDING_TEMPLATE_BODY,
+    PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE,
+)
+
+
+def build_contexts(count: int) -> list[dict]:
+    return [{"first_name": f"Jane{index}", "username": f"doe.jane{index}", "plaintext_password": f"Temp-{index:08d}!"} for index in range(count)]
+
+
+def render_legacy(context: dict) -> int:
+    subject = f"Welcome to Nett Hands, {context['first_name']}!"
+    html_content = NEW_HIRE_ONBOARDING_TEMPLATE_BODY.substitute(context)
+    text_content = PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE.substitute(context)
+    return len(subject) + len(html_content) + len(text_content)
+
+
+def render_compiled(context: dict) -> int:
+    email = render_email("new_hire_onboarding", context, locale=DEFAULT_EMAIL_LOCALE)
+    return len(email.subject) + len(email.html) + len(email.text)
+
+
+def run(render: Callable[[dict], int], contexts: list[dict], repeat: int) -> tuple[float, float]:
+    """
+    Render one onboarding email per context, `repeat` times.
+
+    Args:
+        render (Callable): Renders one email and returns its total size in characters.
+        contexts (list[dict]): The placeholder values of every recipient.
+        repeat (int): The number of timed runs.
+
+    Returns:
+        tuple[float, float]: The median messages per second and the mean rendered size in characters.
+
+    """
+    rates = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = sum(render(context) for context in contexts)
+        rates.append(len(contexts) / (time.perf_counter() - start))
+    return statistics.median(rates), size / len(contexts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    contexts = build_contexts(args.messages)
+    strategies = {"string.Template": render_legacy, "compiled": render_compiled}
+    print(f"{'strategy':>16} | {'messages/s':>12} | {'chars/message':>14}")
+    for name, render in strategies.items():
+        throughput, size = run(render, contexts, args.repeat)
+        print(f"{name:>16} | {throughput:>12.0f} | {size:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
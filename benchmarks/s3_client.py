@@ -0,0 +1,135 @@
+"""
+Module: benchmarks.s3_client
+
+Measures the per-upload overhead of the S3 client, comparing:
+
+- client per upload: a new `boto3` client for every upload (the previous behaviour of every upload path).
+- shared client: `common.s3.get_s3_client`, one thread-safe client per process.
+
+By default the benchmark runs offline: HTTP requests are answered in-process before they reach the network, so the
+numbers isolate the client-side cost of building a client (credential resolution, service model loading, request
+signing) from S3 latency. With `--live`, small objects are uploaded to the configured bucket under `benchmarks/` and
+deleted afterwards, which adds the connection and TLS setup the shared client also avoids.
+
+Usage:
+    task benchmark -- s3_client --uploads 200 --threads 1 8
+    task benchmark -- s3_client --live --uploads 50 --threads 1 8
+"""
+
+import argparse
+import threading
+import time
+from collections.abc import Callable
+
+from botocore.awsrequest import AWSResponse
+
+PAYLOAD = b"x" * 1024
+KEY_PREFIX = "benchmarks/s3-client"
+
+
+class EmptyBody:
+    def stream(self, **kwargs):
+        return iter(())
+
+
+def answer_offline(request, **kwargs) -> AWSResponse:
+    return AWSResponse(request.url, 200, {"ETag": '"benchmark"'}, EmptyBody())
+
+
+def configure_offline() -> None:
+    from django.conf import settings
+
+    settings.configure(
+        AWS_S3_REGION_NAME="nyc3",
+        AWS_S3_ENDPOINT_URL="https://nyc3.digitaloceanspaces.com",
+        AWS_ACCESS_KEY_ID="benchmark",
+        AWS_SECRET_ACCESS_KEY="benchmark",  # noqa: S106
+        AWS_STORAGE_BUCKET_NAME="benchmark",
+        AWS_S3_MAX_POOL_CONNECTIONS=25,
+    )
+
+
+def prepare(client, live: bool):
+    if not live:
+        client.meta.events.register("before-send.s3", answer_offline)
+    return client
+
+
+def run(get_client: Callable[[], object], threads: int, uploads: int) -> tuple[float, float]:
+    """
+    Upload `uploads` small objects spread across `threads` threads.
+
+    Args:
+        get_client (Callable): Returns the client to use for one upload.
+        threads (int): The number of concurrent uploading threads.
+        uploads (int): The total number of uploads.
+
+    Returns:
+        tuple[float, float]: The uploads per second and the mean milliseconds per upload.
+
+    """
+    from django.conf import settings
+
+    barrier = threading.Barrier(threads + 1)
+    per_thread = uploads // threads
+    latencies: list[float] = []
+    latencies_lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        for upload in range(per_thread):
+            start = time.perf_counter()
+            get_client().put_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=f"{KEY_PREFIX}/{index}-{upload}", Body=PAYLOAD)
+            with latencies_lock:
+                latencies.append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return per_thread * threads / elapsed, sum(latencies) / len(latencies) * 1000
+
+
+def cleanup(threads: int, uploads: int) -> None:
+    from django.conf import settings
+
+    from common.s3 import get_s3_client
+
+    keys = [{"Key": f"{KEY_PREFIX}/{index}-{upload}"} for index in range(threads) for upload in range(uploads // threads)]
+    for start in range(0, len(keys), 1000):
+        get_s3_client().delete_objects(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Delete={"Objects": keys[start : start + 1000]})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=200)
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 8])
+    parser.add_argument("--live", action="store_true", help="Upload to the configured bucket instead of answering requests in-process")
+    args = parser.parse_args()
+
+    if args.live:
+        from benchmarks import setup_django
+
+        setup_django()
+    else:
+        configure_offline()
+
+    from common.s3 import create_s3_client, get_s3_client
+
+    shared_client = prepare(get_s3_client(), args.live)
+    strategies = {"client per upload": lambda: prepare(create_s3_client(), args.live), "shared client": lambda: shared_client}
+    print(f"{'threads':>8} | {'strategy':>18} | {'uploads/s':>10} | {'ms/upload':>10}")
+    for threads in args.threads:
+        for name, get_client in strategies.items():
+            throughput, latency = run(get_client, threads, args.uploads)
+            print(f"{threads:>8} | {name:>18} | {throughput:>10.1f} | {latency:>10.2f}")
+            if args.live:
+                cleanup(threads, args.uploads)
+
+
+if __name__ == "__main__":
+    main()
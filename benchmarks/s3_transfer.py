@@ -0,0 +1,166 @@
+"""
+Module: benchmarks.s3_transfer
+
+Measures file upload throughput to S3 for files of 1 MB to 100 MB, comparing:
+
+- single request: one PutObject per file over one connection.
+- boto3 defaults: the default `TransferConfig` (8 MiB threshold and parts, 10 threads), the previous behaviour of
+  `S3HANDLER.upload_file_to_s3`.
+- tuned: `common.s3.create_transfer_config`, the S3 upload settings (8 MiB threshold and parts, 16 threads).
+
+Every strategy uploads through the shared client and reports progress through the Prometheus callback.
+
+By default the benchmark runs offline: requests are answered in-process after a delay of `--latency` milliseconds
+plus the time the body takes at `--bandwidth` MB/s, per connection, which is how S3 throughput behaves from a single
+host. With `--endpoint-url`, files are uploaded to a local MinIO or moto server (for example `minio server /data` or
+`moto_server -p 9000`) and deleted afterwards.
+
+Usage:
+    task benchmark -- s3_transfer --sizes 1 10 100 --repeat 3
+    task benchmark -- s3_transfer --endpoint-url http://localhost:9000 --access-key minioadmin --secret-key minioadmin
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from boto3.s3.transfer import TransferConfig
+from botocore.awsrequest import AWSResponse
+from prometheus_client import REGISTRY
+
+MB = 1024 * 1024
+BUCKET = "benchmarks"
+KEY_PREFIX = "benchmarks/s3-transfer"
+
+
+class StaticBody:
+    def __init__(self, content: bytes = b""):
+        self.content = content
+
+    def stream(self, **kwargs):
+        yield self.content
+
+
+def simulate_s3(latency: float, bandwidth: float):
+    """
+    Build a `before-send` handler answering S3 upload requests in-process, as a connection of the given speed would.
+
+    Args:
+        latency (float): The round trip time of every request, in seconds.
+        bandwidth (float): The upload speed of one connection, in bytes per second.
+
+    Returns:
+        Callable: The event handler.
+
+    """
+
+    def answer(request, **kwargs) -> AWSResponse:
+        size = 0
+        if hasattr(request.body, "read"):
+            while chunk := request.body.read(MB):
+                size += len(chunk)
+        elif request.body:
+            size = len(request.body)
+        time.sleep(latency + size / bandwidth)
+        if request.method == "POST" and request.url.endswith("?uploads"):
+            body = f"<InitiateMultipartUploadResult><Bucket>{BUCKET}</Bucket><Key>key</Key><UploadId>benchmark</UploadId></InitiateMultipartUploadResult>"
+            return AWSResponse(request.url, 200, {}, StaticBody(body.encode()))
+        if request.method == "POST":
+            body = f'<CompleteMultipartUploadResult><Bucket>{BUCKET}</Bucket><Key>key</Key><ETag>"benchmark"</ETag></CompleteMultipartUploadResult>'
+            return AWSResponse(request.url, 200, {}, StaticBody(body.encode()))
+        return AWSResponse(request.url, 200, {"ETag": '"benchmark"'}, StaticBody())
+
+    return answer
+
+
+def configure(args: argparse.Namespace) -> None:
+    from django.conf import settings
+
+    settings.configure(
+        AWS_S3_REGION_NAME="us-east-1",
+        AWS_S3_ENDPOINT_URL=args.endpoint_url or "https://nyc3.digitaloceanspaces.com",
+        AWS_ACCESS_KEY_ID=args.access_key,
+        AWS_SECRET_ACCESS_KEY=args.secret_key,
+        AWS_STORAGE_BUCKET_NAME=BUCKET,
+        AWS_S3_MAX_POOL_CONNECTIONS=25,
+        S3_MULTIPART_THRESHOLD=8 * MB,
+        S3_MULTIPART_PART_SIZE=8 * MB,
+        S3_MAX_CONCURRENCY=16,
+    )
+
+
+def run(file_name: str, transfer_config: TransferConfig, repeat: int) -> float:
+    """
+    Upload one file `repeat` times.
+
+    Args:
+        file_name (str): The file to upload.
+        transfer_config (TransferConfig): The transfer configuration to upload it with.
+        repeat (int): The number of timed uploads.
+
+    Returns:
+        float: The median throughput in MB per second.
+
+    """
+    from common.upload import S3HANDLER
+
+    rates = []
+    for attempt in range(repeat):
+        start = time.perf_counter()
+        if not S3HANDLER.upload_file_to_s3(file_name, bucket=BUCKET, object_name=f"{KEY_PREFIX}/{os.path.basename(file_name)}-{attempt}", transfer_config=transfer_config):
+            raise RuntimeError(f"Uploading {file_name} failed")
+        rates.append(os.path.getsize(file_name) / MB / (time.perf_counter() - start))
+    return statistics.median(rates)
+
+
+def cleanup(file_names: list[str], repeat: int) -> None:
+    from common.s3 import get_s3_client
+
+    keys = [{"Key": f"{KEY_PREFIX}/{os.path.basename(file_name)}-{attempt}"} for file_name in file_names for attempt in range(repeat)]
+    get_s3_client().delete_objects(Bucket=BUCKET, Delete={"Objects": keys})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 10, 100], help="File sizes in MB")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=20, help="Offline round trip time per request, in milliseconds")
+    parser.add_argument("--bandwidth", type=float, default=25, help="Offline upload speed per connection, in MB/s")
+    parser.add_argument("--endpoint-url", help="A local MinIO or moto server to upload to instead of answering requests in-process")
+    parser.add_argument("--access-key", default="benchmark")
+    parser.add_argument("--secret-key", default="benchmark")
+    args = parser.parse_args()
+
+    configure(args)
+
+    from common.s3 import create_transfer_config, get_s3_client
+
+    if args.endpoint_url:
+        try:
+            get_s3_client().create_bucket(Bucket=BUCKET)
+        except get_s3_client().exceptions.BucketAlreadyOwnedByYou:
+            pass
+    else:
+        get_s3_client().meta.events.register("before-send.s3", simulate_s3(args.latency / 1000, args.bandwidth * MB))
+
+    strategies = {"single request": TransferConfig(multipart_threshold=max(args.sizes) * MB + 1), "boto3 defaults": TransferConfig(), "tuned": create_transfer_config()}
+    with tempfile.TemporaryDirectory() as directory:
+        file_names = []
+        for size in args.sizes:
+            file_names.append(os.path.join(directory, f"{size}mb.bin"))
+            with open(file_names[-1], "wb") as file:
+                file.write(os.urandom(size * MB))
+
+        print(f"{'size':>8} | {'strategy':>16} | {'MB/s':>8}")
+        for size, file_name in zip(args.sizes, file_names, strict=True):
+            for name, transfer_config in strategies.items():
+                print(f"{size:>6}MB | {name:>16} | {run(file_name, transfer_config, args.repeat):>8.1f}")
+        print(f"{REGISTRY.get_sample_value('s3_upload_bytes_total') / MB:.0f} MB counted by the progress callback")
+        if args.endpoint_url:
+            cleanup(file_names, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
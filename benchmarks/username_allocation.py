@@ -0,0 +1,126 @@
+"""
+Module: benchmarks.username_allocation
+
+Measures username allocation throughput under parallel hiring workers, comparing:
+
+- legacy: the previous `create_unique_username`, a `get()` then a `username__startswith` COUNT per hire.
+- counter: `UsernameCounter.allocate`, one upsert per hire.
+- counter, batched: `UsernameCounter.allocate` for a whole batch of hires, as used by bulk hiring.
+
+Every worker thread hires the same applicant name, the worst case for collisions, and inserts an Employee row with the
+allocated username. The number of duplicate usernames created is reported alongside throughput. Benchmark rows are
+deleted afterwards.
+
+Usage:
+    task benchmark -- username_allocation --workers 1 4 16 --hires 200
+"""
+
+import argparse
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+
+from benchmarks import setup_django
+
+FIRST_NAME = "Alloc"
+LAST_NAME = "Benchmark"
+BATCH_SIZE = 25
+
+
+def legacy_create_unique_username(first_name: str, last_name: str) -> str:
+    from applications.employee.models import Employee
+
+    username = f"{last_name.lower()}.{first_name.lower()}"
+    if not Employee.objects.filter(username=username).exists():
+        return username
+    max_num = Employee.objects.filter(username__startswith=username).count()
+    return username + str(0 if max_num == 1 else max_num)
+
+
+def allocate_legacy(count: int) -> list[str]:
+    return [legacy_create_unique_username(FIRST_NAME, LAST_NAME) for _ in range(count)]
+
+
+def allocate_counter(count: int) -> list[str]:
+    from applications.employee.models import Employee
+
+    return [Employee.create_unique_username(FIRST_NAME, LAST_NAME) for _ in range(count)]
+
+
+def allocate_counter_batched(count: int) -> list[str]:
+    from applications.employee.models import Employee
+
+    usernames = []
+    for start in range(0, count, BATCH_SIZE):
+        usernames.extend(Employee.create_unique_usernames([(FIRST_NAME, LAST_NAME)] * min(BATCH_SIZE, count - start)))
+    return usernames
+
+
+def cleanup() -> None:
+    from applications.employee.models import Employee, UsernameCounter
+
+    base_username = f"{LAST_NAME.lower()}.{FIRST_NAME.lower()}"
+    Employee.objects.filter(username__startswith=base_username).delete()
+    UsernameCounter.objects.filter(base_username=base_username).delete()
+
+
+def run(allocate: Callable[[int], list[str]], workers: int, hires: int) -> tuple[float, int]:
+    """
+    Allocate and insert `hires` usernames spread across `workers` threads.
+
+    Args:
+        allocate (Callable): Allocates the provided number of usernames.
+        workers (int): The number of concurrent hiring threads, each with its own database connection.
+        hires (int): The total number of hires.
+
+    Returns:
+        tuple[float, int]: The allocations per second and the number of duplicate usernames created.
+
+    """
+    from django.db import connection
+
+    from applications.employee.models import Employee
+
+    cleanup()
+    barrier = threading.Barrier(workers + 1)
+    per_worker = hires // workers
+
+    def worker() -> None:
+        try:
+            barrier.wait()
+            for username in allocate(per_worker):
+                Employee.objects.create(username=username, first_name=FIRST_NAME, last_name=LAST_NAME, password="!")  # noqa: S106
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    usernames = Counter(Employee.objects.filter(username__startswith=f"{LAST_NAME.lower()}.{FIRST_NAME.lower()}").values_list("username", flat=True))
+    cleanup()
+    return per_worker * workers / elapsed, sum(count - 1 for count in usernames.values())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--hires", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    strategies = {"legacy": allocate_legacy, "counter": allocate_counter, "counter, batched": allocate_counter_batched}
+    print(f"{'workers':>8} | {'strategy':>16} | {'hires/s':>10} | {'duplicates':>10}")
+    for workers in args.workers:
+        for name, allocate in strategies.items():
+            throughput, duplicates = run(allocate, workers, args.hires)
+            print(f"{workers:>8} | {name:>16} | {throughput:>10.1f} | {duplicates:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 import hashlib
+import math
+import random
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any, NamedTuple
 
 from django.conf import settings
 from django.core.cache import cache
+from django.db.models import QuerySet
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.http.response import JsonResponse
@@ -13,8 +21,236 @@ from loguru import logger
 from rest_framework import status
 from rest_framework.response import Response
 
+from common.local_cache import MISSING, broadcast_invalidation, get_local_cache
+from common.managers import CachedQuerySet
 from common.metrics import metrics
 
+CACHE_GENERATION_KEY_PREFIX: str = "cache-generation"
+
+# Reverse index of model name -> names of the cached views whose payload depends on that model.
+# Populated as CachedResponseMixin subclasses are declared and consulted by `invalidate_cache`.
+CACHE_DEPENDENTS: defaultdict[str, set[str]] = defaultdict(set)
+
+
+def get_generation_key(model_name: str) -> str:
+    """
+    Build the cache key that stores the generation counter for a model namespace.
+
+    Args:
+        model_name (str): The name of the model whose namespace is being versioned.
+
+    Returns:
+        str: The cache key holding the model's generation counter.
+
+    """
+    return f"{CACHE_GENERATION_KEY_PREFIX}:{model_name}"
+
+
+def get_model_generation(model_name: str) -> int:
+    """
+    Retrieve the current generation of a model's cache namespace.
+
+    The generation is folded into every cache key built for the model, so bumping it
+    orphans all existing entries at once. Orphaned entries are never read again and age out via their TTL.
+    A missing counter is seeded from the clock rather than 1, so a counter evicted by Redis (LRU) comes back
+    above every generation it previously reached and never serves entries orphaned before the eviction.
+
+    Args:
+        model_name (str): The name of the model whose namespace is being versioned.
+
+    Returns:
+        int: The current generation counter for the model, seeded from `time.time_ns()` on first use.
+
+    """
+    return int(cache.get_or_set(get_generation_key(model_name), time.time_ns, timeout=None))
+
+
+def get_model_generations(model_names: list[str]) -> dict[str, int]:
+    """
+    Retrieve the current generations of several model namespaces in a single round trip.
+
+    Args:
+        model_names (list[str]): The names of the models whose namespaces are being versioned.
+
+    Returns:
+        dict[str, int]: The current generation counter of each model, seeded from `time.time_ns()` on first use.
+
+    """
+    generation_keys = {get_generation_key(model_name): model_name for model_name in model_names}
+    local_cache = get_local_cache()
+    generations = {}
+    if local_cache is not None:
+        for generation_key, model_name in generation_keys.items():
+            if (generation := local_cache.get(generation_key)) is not MISSING:
+                generations[model_name] = generation
+    if len(generations) == len(generation_keys):
+        return generations
+
+    missing_keys = [generation_key for generation_key, model_name in generation_keys.items() if model_name not in generations]
+    cached_generations = cache.get_many(missing_keys)
+    for generation_key in missing_keys:
+        model_name = generation_keys[generation_key]
+        if generation_key not in cached_generations:
+            seed = time.time_ns()
+            cache.add(generation_key, seed, timeout=None)
+            cached_generations[generation_key] = cache.get(generation_key, seed)
+        generations[model_name] = int(cached_generations[generation_key])
+        if local_cache is not None:
+            local_cache.set(generation_key, generations[model_name], tags=[model_name])
+    return {model_name: generations[model_name] for model_name in model_names}
+
+
+def bump_model_generation(model_name: str) -> int:
+    """
+    Advance the generation of a model's cache namespace with a single atomic INCR.
+
+    Args:
+        model_name (str): The name of the model whose namespace should be invalidated.
+
+    Returns:
+        int: The new generation counter for the model.
+
+    """
+    generation_key = get_generation_key(model_name)
+    try:
+        return cache.incr(generation_key)
+    except ValueError:
+        # NOTE: The counter has never been read (or was evicted); a clock seed is above every generation it reached before.
+        seed = time.time_ns()
+        cache.add(generation_key, seed, timeout=None)
+        return int(cache.get(generation_key, seed))
+
+
+def register_cache_dependents(dependent: str, models: list) -> None:
+    """
+    Record that a cached fragment is built from the provided models, so saving any of them invalidates it.
+
+    Args:
+        dependent (str): The name of the cached fragment.
+        models (list): The model classes the fragment is built from.
+
+    """
+    for model in models:
+        CACHE_DEPENDENTS[model.__name__].add(dependent)
+
+
+def get_cached_fragment(name: str, models: list, compute: Callable[[], Any], timeout: int | None = None) -> Any:
+    """
+    Return a precomputed fragment of page data, building and caching it on a miss.
+
+    The generation of every model the fragment is built from is folded into its key, so `invalidate_cache`
+    evicts the fragment whenever one of them is saved or deleted. Register the fragment with `register_cache_dependents`.
+
+    Args:
+        name (str): The name of the cached fragment.
+        models (list): The model classes the fragment is built from.
+        compute (Callable): Builds the fragment on a miss; must return a picklable value.
+        timeout (int, optional): Seconds to keep the fragment; defaults to `VIEW_CACHE_TTL`.
+
+    Returns:
+        Any: The cached or newly built fragment.
+
+    """
+    generations = get_model_generations([model.__name__ for model in models])
+    cache_key = f"fragment:{name}:" + "_".join(f"{model_name}-g{generation}" for model_name, generation in generations.items())
+    local_cache = get_local_cache()
+    if local_cache is not None and (fragment := local_cache.get(cache_key)) is not MISSING:
+        metrics.increment_cache_tier(model=name, tier="local")
+        metrics.increment_cache(model=name, type="hit")
+        return fragment
+    if (fragment := cache.get(cache_key)) is not None:
+        metrics.increment_cache_tier(model=name, tier="redis")
+        metrics.increment_cache(model=name, type="hit")
+    else:
+        logger.debug(f"Cache Miss for Fragment {name} - Cache Key: {cache_key}")
+        metrics.increment_cache(model=name, type="miss")
+        fragment = compute()
+        cache.set(cache_key, fragment, timeout=timeout or settings.VIEW_CACHE_TTL)
+    if local_cache is not None:
+        local_cache.set(cache_key, fragment, tags=list(generations))
+    return fragment
+
+
+class CachedEnvelope(NamedTuple):
+    """
+    Wrapper stored in the cache around a response payload.
+
+    Attributes:
+        data: The cached response payload.
+        soft_expires_at (float): Epoch timestamp after which the payload is stale and should be recomputed.
+        compute_time (float): How long in seconds the payload took to build.
+
+    """
+
+    data: Any
+    soft_expires_at: float
+    compute_time: float = 0.0
+
+    def is_stale(self) -> bool:
+        return time.time() >= self.soft_expires_at
+
+    def should_refresh(self, beta: float = 0.0) -> bool:
+        """
+        Decide whether the payload should be recomputed now.
+
+        Stale payloads are always refreshed. When `beta` is positive, fresh payloads are also refreshed early with a
+        probability that grows as the soft expiry approaches and with how expensive the payload is to build (XFetch),
+        so hot keys are usually rebuilt before they ever go stale.
+
+        Args:
+            beta (float): Early refresh aggressiveness; 0 disables early refresh.
+
+        Returns:
+            bool: True if the payload should be recomputed.
+
+        """
+        if beta <= 0 or self.compute_time <= 0:
+            return self.is_stale()
+        return time.time() - self.compute_time * beta * math.log(random.random() or 1e-12) >= self.soft_expires_at  # noqa: S311
+
+
+class RecomputeLock:
+    """
+    Short-lived cache lock that lets a single worker recompute an expired cache key.
+
+    The lock is taken with an atomic `add` (SET NX in Redis) and expires on its own after `VIEW_CACHE_LOCK_TIMEOUT`
+    seconds, so a worker that dies mid-recompute never blocks the key for long.
+    """
+
+    POLL_INTERVAL: float = 0.05
+
+    def __init__(self, cache_key: str):
+        self.lock_key = f"{cache_key}:recompute-lock"
+        self.token = uuid.uuid4().hex
+        self.acquired = False
+
+    def __enter__(self) -> bool:
+        self.acquired = cache.add(self.lock_key, self.token, timeout=settings.VIEW_CACHE_LOCK_TIMEOUT)
+        return self.acquired
+
+    def __exit__(self, *exc_info) -> None:
+        if self.acquired and cache.get(self.lock_key) == self.token:
+            cache.delete(self.lock_key)
+
+    @classmethod
+    def wait_for_entry(cls, cache_key: str) -> CachedEnvelope | None:
+        """
+        Poll the cache for an entry being recomputed by another worker.
+
+        Args:
+            cache_key (str): The cache key being recomputed.
+
+        Returns:
+            CachedEnvelope or None: The recomputed entry, or None if it did not appear within `VIEW_CACHE_LOCK_WAIT` seconds.
+
+        """
+        deadline = time.monotonic() + settings.VIEW_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(cls.POLL_INTERVAL)
+            if (entry := cache.get(cache_key)) is not None:
+                return entry
+        return None
+
 
 class CachedTemplateView(TemplateView):
     @classmethod
@@ -34,52 +270,93 @@ class CachedResponseMixin:
 
     This mixin allows views to cache their responses based on user identity and query parameters,
     improving performance by reducing the need for repeated database queries.
+
+    Views declare the models their payload depends on through `primary_model` and `cache_models`.
+    Each subclass is registered in `CACHE_DEPENDENTS` when it is declared, and the generation of every
+    declared model is folded into its cache keys, so saving any one of them evicts exactly the responses built from it.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for model_name in cls.get_cache_dependencies():
+            CACHE_DEPENDENTS[model_name].add(cls.__name__)
+
+    @classmethod
+    def get_cache_dependencies(cls) -> list[str]:
+        """
+        Resolve the names of the models the view's cached payload depends on.
+
+        Returns:
+            list[str]: The primary model name (or "NoModel" for static views) followed by the names of any `cache_models`.
+
+        """
+        primary_model = getattr(cls, "primary_model", None)
+        # Handle cases where primary_model is None (e.g., static template views)
+        model_names = [primary_model.__name__ if primary_model is not None else "NoModel"]
+        for model in getattr(cls, "cache_models", []):
+            if model is not None and model.__name__ not in model_names:
+                model_names.append(model.__name__)
+        return model_names
+
     def get_cache_key(self) -> str:
         """
         Generate a unique cache key based on the request and model information.
 
         This method constructs a cache key that incorporates the user ID, query parameters,
-        and model names associated with the view.
+        and the current generation of every model the view depends on.
 
         Returns:
             str: A unique cache key for the current request.
 
-        Raises:
-            AttributeError: If the view does not have a 'primary_model' attribute.
-
         """
         user_id = self.request.user.id if self.request.user.is_authenticated else "anon"
         query_params = self.request.GET.urlencode()
         query_params_hash = hashlib.md5(query_params.encode("utf-8"), usedforsecurity=False).hexdigest()
 
-        # Get the model name(s) associated with the view
-        model_names = []
+        model_names = self.get_cache_dependencies()
+        primary_model_name = model_names[0]
+        generations = get_model_generations(model_names)
+        generations_str = "_".join(f"{model_name}-g{generation}" for model_name, generation in generations.items())
 
-        # Add the primary model name
+        return f"{primary_model_name}:{self.__class__.__name__}_{generations_str}_{user_id}_{query_params_hash}_cache_key"
+
+    def get_cache_model_name(self) -> str:
         primary_model = getattr(self, "primary_model", None)
-        if primary_model is not None:
-            model_names.append(primary_model.__name__)
-            primary_model_name = primary_model.__name__
-        else:
-            # Handle cases where primary_model is None (e.g., static template views)
-            primary_model_name = "NoModel"
-            model_names.append(primary_model_name)
+        return primary_model.__name__ if primary_model is not None else "NoModel"
+
+    def get_cache_entry(self, cache_key) -> CachedEnvelope | None:
+        """
+        Retrieve the raw cache envelope stored under the provided cache key.
+
+        When the local tier is enabled, it is consulted before Redis and back-filled from Redis on a local miss.
+        Stale local envelopes are skipped, since another worker may already have stored a fresh one in Redis.
 
-        # Add the cache_models names
-        cache_models = getattr(self, "cache_models", [])
-        model_names.extend(model.__name__ for model in cache_models if model is not None)
-        # Combine the model names into a string
-        model_names_str = "_".join(model_names)
+        Args:
+            cache_key (str): The cache key to look up.
+
+        Returns:
+            CachedEnvelope or None: The cached envelope if found, otherwise None.
 
-        return f"{primary_model_name}:{self.__class__.__name__}_{model_names_str}_{user_id}_{query_params_hash}_cache_key"
+        """
+        model_name = self.get_cache_model_name()
+        local_cache = get_local_cache()
+        if local_cache is not None and (entry := local_cache.get(cache_key)) is not MISSING and not entry.is_stale():
+            metrics.increment_cache_tier(model=model_name, tier="local")
+            return entry
+
+        entry = cache.get(cache_key)
+        if entry is not None:
+            metrics.increment_cache_tier(model=model_name, tier="redis")
+            if local_cache is not None:
+                local_cache.set(cache_key, entry, tags=self.get_cache_dependencies())
+        return entry
 
     def get_cached_response(self, cache_key) -> Response | None:
         """
         Retrieve cached data using the provided cache key.
 
-        This method checks if there is cached data for the given cache key and returns it if available.
+        This method checks if there is fresh cached data for the given cache key and returns it if available.
+        Entries that are past their soft expiry (but still inside the stale grace window) are treated as a miss.
 
         Args:
             cache_key (str): The cache key to look up.
@@ -88,34 +365,87 @@ class CachedResponseMixin:
             Response or None: The cached response if found, otherwise None.
 
         """
-        cached_data = cache.get(cache_key)
-        primary_model = getattr(self, "primary_model", None)
-        model_name = primary_model.__name__ if primary_model is not None else "NoModel"
+        entry = self.get_cache_entry(cache_key)
+        model_name = self.get_cache_model_name()
 
-        if cached_data is not None:
+        if entry is not None and not entry.is_stale():
             logger.debug(f"Cache Hit for {model_name} - Cache Key: {cache_key}")
             metrics.increment_cache(model=model_name, type="hit")
-            return Response(cached_data, status=status.HTTP_200_OK)
+            return Response(entry.data, status=status.HTTP_200_OK)
         else:
             logger.debug(f"Cache Miss for {model_name}  - Cache Key: {cache_key}")
             metrics.increment_cache(model=model_name, type="miss")
             return None
 
-    def cache_response(self, cache_key, data):
+    def cache_response(self, cache_key, data, compute_time: float = 0.0):
         """
         Store data in the cache with the specified cache key.
 
-        This method saves the provided data in the cache for a duration of one hour.
+        The data is wrapped in a `CachedEnvelope` that is fresh for `VIEW_CACHE_TTL` seconds.
+        The entry itself is kept for an additional `VIEW_CACHE_STALE_GRACE` seconds so it can be served stale while it is recomputed.
 
         Args:
             cache_key (str): The cache key under which to store the data.
             data: The data to be cached.
+            compute_time (float): How long in seconds the data took to build, used for early probabilistic refresh.
 
         """
         if type(data) in [JsonResponse, TemplateResponse]:
             data = data.render()
         logger.debug(f"New Cache Set {cache_key}: {data}")
-        cache.set(cache_key, data, timeout=settings.VIEW_CACHE_TTL)
+        entry = CachedEnvelope(data=data, soft_expires_at=time.time() + settings.VIEW_CACHE_TTL, compute_time=compute_time)
+        cache.set(cache_key, entry, timeout=settings.VIEW_CACHE_TTL + settings.VIEW_CACHE_STALE_GRACE)
+        if (local_cache := get_local_cache()) is not None:
+            local_cache.set(cache_key, entry, tags=self.get_cache_dependencies())
+
+    def get_or_recompute_response(self, cache_key: str, compute: Callable[[], Any]) -> Response:
+        """
+        Serve a cached response, recomputing it under a short lock so concurrent requests do not stampede.
+
+        - A fresh entry is served as a hit.
+        - A stale entry (or one selected for early probabilistic refresh) is recomputed by the single worker holding the lock,
+          while every other worker keeps serving the stale value.
+        - On a complete miss, the worker holding the lock recomputes while the others briefly wait for its result.
+
+        Args:
+            cache_key (str): The cache key for the current request.
+            compute (Callable): Builds the response data on a miss.
+
+        Returns:
+            Response: The cached, stale or newly generated response.
+
+        """
+        model_name = self.get_cache_model_name()
+        entry = self.get_cache_entry(cache_key)
+
+        if entry is not None and not entry.should_refresh(settings.VIEW_CACHE_EARLY_REFRESH_BETA):
+            logger.debug(f"Cache Hit for {model_name} - Cache Key: {cache_key}")
+            metrics.increment_cache(model=model_name, type="hit")
+            return Response(entry.data, status=status.HTTP_200_OK)
+
+        with RecomputeLock(cache_key) as acquired:
+            if acquired:
+                return Response(self._recompute(cache_key, compute, model_name))
+
+            if entry is not None:
+                logger.debug(f"Serving Stale Cache for {model_name} While Recomputing - Cache Key: {cache_key}")
+                metrics.increment_cache(model=model_name, type="stale")
+                return Response(entry.data, status=status.HTTP_200_OK)
+
+            if (entry := RecomputeLock.wait_for_entry(cache_key)) is not None:
+                metrics.increment_cache(model=model_name, type="hit")
+                return Response(entry.data, status=status.HTTP_200_OK)
+
+        # NOTE: The lock holder did not finish in time - fall back to computing the response directly.
+        return Response(self._recompute(cache_key, compute, model_name))
+
+    def _recompute(self, cache_key: str, compute: Callable[[], Any], model_name: str) -> Any:
+        logger.debug(f"Cache Miss for {model_name}  - Recomputing Cache Key: {cache_key}")
+        metrics.increment_cache(model=model_name, type="recompute")
+        started = time.perf_counter()
+        data = compute()
+        self.cache_response(cache_key, data, compute_time=time.perf_counter() - started)
+        return data
 
     def list(self, request, *args, **kwargs) -> Response:
         """
@@ -133,25 +463,20 @@ class CachedResponseMixin:
             Response: The cached or newly generated response.
 
         """
-        cache_key = self.get_cache_key()
-        if cached_response := self.get_cached_response(cache_key):
-            return cached_response
 
-        # If cache miss, proceed as usual
-        queryset = self.filter_queryset(self.get_queryset())
+        def compute():
+            queryset = self.filter_queryset(self.get_queryset())
+
+            # Apply pagination if needed
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data).data
 
-        # Apply pagination if needed
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            data = serializer.data
-            self.cache_response(cache_key, data)
-            return self.get_paginated_response(data)
+            serializer = self.get_serializer(queryset, many=True)
+            return serializer.data
 
-        serializer = self.get_serializer(queryset, many=True)
-        data = serializer.data
-        self.cache_response(cache_key, data)
-        return Response(data)
+        return self.get_or_recompute_response(self.get_cache_key(), compute)
 
     def retrieve(self, request, *args, **kwargs) -> Response:
         """
@@ -169,28 +494,38 @@ class CachedResponseMixin:
             Response: The cached or newly generated response.
 
         """
-        cache_key = self.get_cache_key()
-        if cached_response := self.get_cached_response(cache_key):
-            return cached_response
 
-        # If cache miss, proceed as usual
-        instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        data = serializer.data
-        self.cache_response(cache_key, data)
-        return Response(data)
+        def compute():
+            instance = self.get_object()
+            serializer = self.get_serializer(instance)
+            return serializer.data
+
+        return self.get_or_recompute_response(self.get_cache_key(), compute)
 
 
 @receiver([post_save, post_delete])
 def invalidate_cache(sender, **kwargs):
+    """
+    Invalidate every cached response that depends on the saved or deleted model.
+
+    Rather than scanning Redis for matching keys, the model's generation counter is incremented.
+    Keys built before the bump are never looked up again and expire on their own TTL.
+    Models that neither a cached view nor a `CachedQuerySet` manager depends on are skipped without touching the cache.
+    When the local tier is enabled, every invalidation is broadcast so each process drops its local copies.
+
+    Args:
+        sender: The model class that sent the signal.
+        **kwargs: Additional keyword arguments.
+
+    """
     model_name = sender.__name__
+    dependents = set(CACHE_DEPENDENTS.get(model_name, ()))
+    if issubclass(getattr(sender._default_manager, "_queryset_class", QuerySet), CachedQuerySet):
+        dependents.add(CachedQuerySet.__name__)
+    if not dependents:
+        return
     logger.debug(f"Signal Received For {model_name}")
-    # Pattern to match cache keys that include the model name as namespace
-    cache_key_pattern = f"{model_name}:*"
-    logger.debug(f'Searching For Cache Key Pattern" {cache_key_pattern}')
-    if cache_keys := cache.keys(cache_key_pattern):
-        cache.delete_many(cache_keys)
-        metrics.increment_cache(model=model_name, type="eviction")
-        logger.info(f"Cache invalidated for model: {model_name}")
-    else:
-        logger.debug(f"No cache keys found for model: {model_name} using {cache_key_pattern}")
+    generation = bump_model_generation(model_name)
+    broadcast_invalidation(model_name)
+    metrics.increment_cache(model=model_name, type="eviction")
+    logger.info(f"Cache invalidated for model: {model_name} - Now At Generation {generation} - Affected Views: {', '.join(sorted(dependents))}")
@@ -22,6 +22,7 @@ configurations.setup()
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+app.autodiscover_tasks(["common"], related_name="mail_queue")
 
 
 @app.task(bind=True, ignore_result=True)
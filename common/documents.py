@@ -0,0 +1,134 @@
+"""
+Module: common.documents
+
+This module is the single registry of the DocuSeal documents employees sign.
+
+Every entry of the `DOCUSEAL_DOCUMENT_TYPES` setting maps a DocuSeal template to the document type it produces, the
+Employee FileField that records the signed copy, and the S3 prefix the copy is stored under. The registry is built and
+validated once per process, then looked up by template id (or, for templates whose id is not configured, by template
+name) with a dict access. Adding a template is a settings change rather than a new branch in every handler.
+
+Every signed document also gets derivatives (a linearized PDF, a first-page thumbnail and its extracted text), stored
+next to it under names derived from its own, so pages can show a thumbnail and link the fast-loading PDF.
+
+Classes:
+- DocumentType: One registered DocuSeal template.
+- DocumentDerivatives: The object names of the derivatives of one document.
+
+Functions:
+- get_document_registry: Returns the registry indexes, building them on first use.
+- get_document_type: Returns the registered document type of a DocuSeal template.
+- get_derivative_names: Returns the object names of the derivatives of a document.
+- get_derivatives_cache_key: Returns the cache key marking that a document's derivatives are stored.
+
+Settings:
+- DOCUSEAL_DOCUMENT_TYPES (list[dict]): One dict per template, with the keys `template_id` (int or None), `template_name`,
+  `doc_type`, `employee_field` and optionally `s3_prefix` (defaults to "restricted/attestations/<doc_type>").
+
+"""
+
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+
+
+class DocumentType(NamedTuple):
+    template_id: int | None
+    template_name: str
+    doc_type: str
+    employee_field: str
+    s3_prefix: str
+
+
+class DocumentRegistry(NamedTuple):
+    by_template_id: dict[int, DocumentType]
+    by_template_name: dict[str, DocumentType]
+
+
+@lru_cache(maxsize=1)
+def get_document_registry() -> DocumentRegistry:
+    """
+    Build the registry indexes from `DOCUSEAL_DOCUMENT_TYPES`, once per process.
+
+    Returns:
+        DocumentRegistry: The document types indexed by template id and by template name.
+
+    Raises:
+        ImproperlyConfigured: If an entry names a field the Employee model does not have, or a template is registered twice.
+
+    """
+    employee_model = apps.get_model(settings.AUTH_USER_MODEL)
+    by_template_id: dict[int, DocumentType] = {}
+    by_template_name: dict[str, DocumentType] = {}
+    for entry in settings.DOCUSEAL_DOCUMENT_TYPES:
+        document_type = DocumentType(
+            template_id=entry.get("template_id"),
+            template_name=entry["template_name"],
+            doc_type=entry["doc_type"],
+            employee_field=entry["employee_field"],
+            s3_prefix=entry.get("s3_prefix") or os.path.join("restricted", "attestations", entry["doc_type"]),
+        )
+        try:
+            employee_model._meta.get_field(document_type.employee_field)
+        except FieldDoesNotExist as e:
+            raise ImproperlyConfigured(f"DOCUSEAL_DOCUMENT_TYPES: {employee_model.__name__} has no field {document_type.employee_field}") from e
+        if document_type.template_id in by_template_id or document_type.template_name in by_template_name:
+            raise ImproperlyConfigured(f"DOCUSEAL_DOCUMENT_TYPES: {document_type.template_name} is registered twice")
+        if document_type.template_id is not None:
+            by_template_id[document_type.template_id] = document_type
+        by_template_name[document_type.template_name] = document_type
+    return DocumentRegistry(by_template_id, by_template_name)
+
+
+def get_document_type(template: dict) -> DocumentType | None:
+    """
+    Return the registered document type of a DocuSeal template.
+
+    Args:
+        template (dict): The `template` object of a DocuSeal payload, with its `id` and `name`.
+
+    Returns:
+        DocumentType | None: The document type registered for the template id, else for the template name, else None.
+
+    """
+    registry = get_document_registry()
+    return registry.by_template_id.get(template.get("id")) or registry.by_template_name.get(template.get("name"))
+
+
+class DocumentDerivatives(NamedTuple):
+    linearized: str
+    thumbnail: str
+    text: str
+
+
+def get_derivative_names(name: str) -> DocumentDerivatives:
+    """
+    Return the object names of the derivatives of a document, next to the document itself.
+
+    Args:
+        name (str): The object name of the document, with or without its storage location prefix.
+
+    Returns:
+        DocumentDerivatives: The names of the linearized PDF, the first-page PNG thumbnail and the extracted text.
+
+    """
+    stem = os.path.splitext(name)[0]
+    return DocumentDerivatives(f"{stem}.linearized.pdf", f"{stem}.thumbnail.png", f"{stem}.txt")
+
+
+def get_derivatives_cache_key(name: str) -> str:
+    """
+    Return the cache key set once the derivatives of a document are stored.
+
+    Args:
+        name (str): The FileField name of the document, relative to the private storage location.
+
+    Returns:
+        str: The cache key.
+
+    """
+    return f"document-derivatives:{name}"
@@ -0,0 +1,252 @@
+"""
+Module: common.email_rendering
+
+This module renders the application's email templates without re-parsing them for every message.
+
+Each email in `EMAIL_TEMPLATES` pairs a subject with its plain-text and HTML bodies from `common.email_templates`. The
+templates are compiled once, when this module is imported: the `<style>` blocks of the HTML bodies are minified, the
+source indentation is stripped, and every body is split into its static segments and the placeholder slots between
+them. Rendering an email then only joins the static segments with the recipient's values, converting each value once for
+the text parts and HTML-escaping it once for the HTML part, so both alternatives of a multipart message are produced in
+a single pass over the context.
+
+Compiled emails are looked up per (template, locale). A localized variant is registered under its own locale; emails
+without one fall back to the language of the locale, then to `DEFAULT_EMAIL_LOCALE`.
+
+Classes:
+- EmailTemplate: The sources of one email.
+- CompiledTemplate: A `string.Template` source split into static segments and placeholder slots.
+- CompiledEmail: The compiled subject, text and HTML of one email.
+- RenderedEmail: The rendered subject, text and HTML of one message.
+
+Functions:
+- prepare_html: Minifies an HTML email body ahead of compilation.
+- get_compiled_email: Returns the compiled email for a template and locale.
+- render_email: Renders an email for one recipient.
+
+"""
+
+import html
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import cache
+from string import Template
+from typing import NamedTuple
+
+from django.utils.translation import get_language
+from rcssmin import cssmin
+
+from common.email_templates import (
+    APPLICATION_BODY,
+    CLIENT_BODY,
+    INTERNAL_APPLICATION_NOTIFICATION,
+    INTERNAL_CLIENT_SERVICE_REQUEST_NOTIFICATION,
+    NEW_HIRE_ONBOARDING_TEMPLATE_BODY,
+    PLAIN_TEXT_ANNOUNCEMENT_TEMPLATE,
+    PLAIN_TEXT_APPLICATION_BODY,
+    PLAIN_TEXT_CLIENT_BODY,
+    PLAIN_TEXT_MISSING_ATTESTATIONS_REMINDER_TEMPLATE,
+    PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE,
+    PLAIN_TEXT_REJECTION_EMAIL_TEMPLATE,
+    PLAIN_TEXT_TERMINATION_EMAIL_TEMPLATE,
+    REJECTION_TEMPLATE_BODY,
+)
+
+DEFAULT_EMAIL_LOCALE = "en"
+STYLE_BLOCK = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.IGNORECASE | re.DOTALL)
+LEADING_WHITESPACE = re.compile(r"^[ \t]+", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """
+    The sources of one email, in `string.Template` syntax.
+
+    Attributes:
+        subject (str): The subject line.
+        text (Template): The plain-text body.
+        html (Template | None): The HTML alternative, if the email has one.
+
+    """
+
+    subject: str
+    text: Template
+    html: Template | None = None
+
+
+EMAIL_TEMPLATES: dict[tuple[str, str], EmailTemplate] = {
+    ("application_confirmation", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="Thanks For Your Employment Interest, $first_name!", text=PLAIN_TEXT_APPLICATION_BODY, html=APPLICATION_BODY),
+    ("client_confirmation", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="We Are On It, $first_name!", text=PLAIN_TEXT_CLIENT_BODY, html=CLIENT_BODY),
+    ("rejection", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="Thank You So Much For Considering Nett Hands, $first_name!", text=PLAIN_TEXT_REJECTION_EMAIL_TEMPLATE, html=REJECTION_TEMPLATE_BODY),
+    ("termination", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="NOTICE: Termination of Employment from Nett Hands Home Care", text=PLAIN_TEXT_TERMINATION_EMAIL_TEMPLATE),
+    ("new_hire_onboarding", DEFAULT_EMAIL_LOCALE): EmailTemplate(
+        subject="Welcome to Nett Hands, $first_name!", text=PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE, html=NEW_HIRE_ONBOARDING_TEMPLATE_BODY
+    ),
+    ("announcement", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="New Announcement: $announcement_title", text=PLAIN_TEXT_ANNOUNCEMENT_TEMPLATE),
+    ("missing_attestations_reminder", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="Action Required: Unsigned Compliance Documents", text=PLAIN_TEXT_MISSING_ATTESTATIONS_REMINDER_TEMPLATE),
+    ("internal_application_notification", DEFAULT_EMAIL_LOCALE): EmailTemplate(subject="NOTICE: New Application For Employment - $last_name, $first_name!", text=INTERNAL_APPLICATION_NOTIFICATION),
+    ("internal_client_service_request_notification", DEFAULT_EMAIL_LOCALE): EmailTemplate(
+        subject="NOTICE: New Client Service Request - $last_name, $first_name!", text=INTERNAL_CLIENT_SERVICE_REQUEST_NOTIFICATION
+    ),
+}
+
+
+def prepare_html(source: str) -> str:
+    """
+    Minify an HTML email body ahead of compilation.
+
+    The CSS of every `<style>` block is minified and the indentation of the source is stripped; neither changes how the
+    email is displayed. Inline `style` attributes and Outlook conditional comments are left untouched.
+
+    Args:
+        source (str): The HTML body, in `string.Template` syntax.
+
+    Returns:
+        str: The minified body.
+
+    """
+    source = STYLE_BLOCK.sub(lambda match: match.group(1) + cssmin(match.group(2)) + match.group(3), source)
+    return LEADING_WHITESPACE.sub("", source).strip()
+
+
+class CompiledTemplate:
+    """
+    A `string.Template` source split into static segments and the placeholder slots between them.
+
+    Attributes:
+        segments (list[str]): The static segments, with an empty string at every slot.
+        slots (tuple[tuple[int, str], ...]): The index in `segments` and the placeholder name of every slot.
+        names (frozenset[str]): The placeholder names used by the template.
+
+    """
+
+    __slots__ = ("names", "segments", "slots")
+
+    def __init__(self, source: str):
+        segments: list[str] = []
+        slots: list[tuple[int, str]] = []
+        literal: list[str] = []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literal.append(source[position : match.start()])
+            position = match.end()
+            if match.group("escaped") is not None:
+                literal.append(Template.delimiter)
+                continue
+            if (name := match.group("named") or match.group("braced")) is None:
+                raise ValueError(f"Invalid placeholder in template at index {match.start()}")
+            segments.append("".join(literal))
+            literal = []
+            slots.append((len(segments), name))
+            segments.append("")
+        literal.append(source[position:])
+        segments.append("".join(literal))
+        self.segments = segments
+        self.slots = tuple(slots)
+        self.names = frozenset(name for _, name in slots)
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """
+        Join the static segments with the provided values.
+
+        Args:
+            values (Mapping[str, str]): The already converted value of every placeholder.
+
+        Returns:
+            str: The rendered template.
+
+        Raises:
+            KeyError: If a placeholder has no value, as `string.Template.substitute` would.
+
+        """
+        parts = self.segments.copy()
+        for index, name in self.slots:
+            parts[index] = values[name]
+        return "".join(parts)
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    text: str
+    html: str | None
+
+
+class CompiledEmail:
+    """
+    The compiled subject, text and HTML of one email.
+
+    Attributes:
+        subject (CompiledTemplate): The subject line.
+        text (CompiledTemplate): The plain-text body.
+        html (CompiledTemplate | None): The minified HTML alternative, if the email has one.
+        names (frozenset[str]): The placeholder names used by any part of the email.
+
+    """
+
+    __slots__ = ("html", "names", "subject", "text")
+
+    def __init__(self, template: EmailTemplate):
+        self.subject = CompiledTemplate(template.subject)
+        self.text = CompiledTemplate(template.text.template)
+        self.html = CompiledTemplate(prepare_html(template.html.template)) if template.html is not None else None
+        self.names = self.subject.names | self.text.names | (self.html.names if self.html is not None else frozenset())
+
+    def render(self, context: Mapping[str, object]) -> RenderedEmail:
+        """
+        Render every part of the email in a single pass over the context.
+
+        Args:
+            context (Mapping[str, object]): The value of every placeholder. Extra keys are ignored.
+
+        Returns:
+            RenderedEmail: The rendered subject, text and HTML. Values are HTML-escaped in the HTML part only.
+
+        """
+        text_values = {name: str(value) for name, value in context.items()}
+        if self.html is None:
+            return RenderedEmail(self.subject.render(text_values), self.text.render(text_values), None)
+        html_values = {name: html.escape(text_values[name]) for name in self.html.names if name in text_values}
+        return RenderedEmail(self.subject.render(text_values), self.text.render(text_values), self.html.render(html_values))
+
+
+COMPILED_EMAILS: dict[tuple[str, str], CompiledEmail] = {key: CompiledEmail(template) for key, template in EMAIL_TEMPLATES.items()}
+
+
+@cache
+def get_compiled_email(name: str, locale: str) -> CompiledEmail:
+    """
+    Return the compiled email for a template and locale.
+
+    Args:
+        name (str): The name of the email in `EMAIL_TEMPLATES`.
+        locale (str): The recipient's locale, e.g. "en-us".
+
+    Returns:
+        CompiledEmail: The variant registered for the locale, else for its language, else for `DEFAULT_EMAIL_LOCALE`.
+
+    Raises:
+        KeyError: If no email is registered under the name.
+
+    """
+    locale = locale.lower()
+    for candidate in (locale, locale.split("-")[0], DEFAULT_EMAIL_LOCALE):
+        if (compiled := COMPILED_EMAILS.get((name, candidate))) is not None:
+            return compiled
+    raise KeyError(f"No Email Template Registered Under {name}")
+
+
+def render_email(name: str, context: Mapping[str, object], locale: str | None = None) -> RenderedEmail:
+    """
+    Render an email for one recipient.
+
+    Args:
+        name (str): The name of the email in `EMAIL_TEMPLATES`.
+        context (Mapping[str, object]): The value of every placeholder.
+        locale (str | None): The recipient's locale. Defaults to the active language.
+
+    Returns:
+        RenderedEmail: The rendered subject, text and HTML.
+
+    """
+    return get_compiled_email(name, locale or get_language() or DEFAULT_EMAIL_LOCALE).render(context)
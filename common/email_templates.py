@@ -1512,6 +1512,40 @@ Sincerely,
 Nett Hands Homecare Human Resources
 	"""
 )
+
+PLAIN_TEXT_ANNOUNCEMENT_TEMPLATE: Template = Template(
+    """
+Dear $first_name,
+
+A new announcement has been posted to CareNett: $announcement_title
+
+$message
+
+You can review this and all other announcements in CareNett at https://www.netthandshome.care/login.
+
+Warm regards,
+
+Nett Hands Homecare HR Team
+"""
+)
+
+PLAIN_TEXT_MISSING_ATTESTATIONS_REMINDER_TEMPLATE: Template = Template(
+    """
+Dear $first_name,
+
+Our records show that the following compliance documents have not yet been signed in CareNett:
+
+$missing_attestations
+
+Please log in to CareNett at https://www.netthandshome.care/login and sign them under the "Personal Information" link in the side navigation as soon as possible. Keeping these documents current is required to remain eligible for client assignments.
+
+If you have any questions, please reach out to our office.
+
+Warm regards,
+
+Nett Hands Homecare HR Team
+"""
+)
 # !SECTION
 
 # SECTION - Internal Email Templates
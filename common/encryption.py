@@ -0,0 +1,297 @@
+"""
+Module: common.encryption
+
+This module provides batched, request-scoped decryption for models that store PII in `sage_encrypt` fields.
+
+`sage_encrypt` decrypts inside PostgreSQL, wrapping every encrypted column in its own `pgp_pub_decrypt(...)` call, so the
+cost of a query grows with rows x encrypted columns selected. List pages typically show two or three of a model's
+encrypted fields but decrypt all of them.
+
+`BatchDecryptQuerySet.decrypt_only()` selects only the encrypted fields a page needs. If a deferred encrypted field is
+accessed later, it is decrypted for every row in the same result batch with a single query instead of one query per row.
+Decrypted values are memoized in a per-request cache (installed by `DecryptedValueCacheMiddleware`), so rows read more
+than once while serving a request are decrypted only once.
+
+Classes:
+- DecryptedValueCache: Request-scoped store of decrypted values keyed by model, primary key and field.
+- DecryptedValueCacheMiddleware: Installs a fresh DecryptedValueCache for each request.
+- DecryptionBatch: The model instances materialized together by one `decrypt_only()` query.
+- BatchDecryptQuerySet: QuerySet providing `decrypt_only()`.
+- BatchDecryptMixin: Model mixin that loads deferred encrypted fields for a whole DecryptionBatch at once.
+- BlindIndexMixin: Model mixin that maintains HMAC blind index columns for exact-match lookups on encrypted fields.
+
+Functions:
+- compute_blind_index: Computes the keyed HMAC stored in a blind index column.
+
+"""
+
+import hashlib
+import hmac
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import FieldError
+from django.db import models
+from loguru import logger
+from sage_encrypt.mixins.encrypt import Encrypt
+
+_decrypted_value_cache: ContextVar["DecryptedValueCache | None"] = ContextVar("decrypted_value_cache", default=None)
+
+
+def get_encrypted_field_names(model: type[models.Model]) -> list[str]:
+    """
+    List the attribute names of a model's `sage_encrypt` fields.
+
+    Args:
+        model (type[models.Model]): The model to inspect.
+
+    Returns:
+        list[str]: The attribute names of the model's encrypted fields.
+
+    """
+    return [field.attname for field in model._meta.concrete_fields if isinstance(field, Encrypt)]
+
+
+def compute_blind_index(value: Any, field: str) -> str:
+    """
+    Compute the blind index of a plaintext value.
+
+    The value is trimmed and case-folded, then hashed with HMAC-SHA256 under `BLIND_INDEX_KEY`. The field name is mixed in,
+    so equal values in different fields (e.g. a first name that is also a last name) produce unrelated indexes.
+
+    Args:
+        value (Any): The plaintext value.
+        field (str): The name of the encrypted field the value belongs to.
+
+    Returns:
+        str: The hex digest, or an empty string for empty values.
+
+    """
+    if value is None or not (normalized := str(value).strip().casefold()):
+        return ""
+    return hmac.new(settings.BLIND_INDEX_KEY.encode("utf-8"), f"{field}:{normalized}".encode(), hashlib.sha256).hexdigest()
+
+
+class DecryptedValueCache:
+    """
+    Request-scoped store of decrypted values keyed by (model label, primary key, field attribute name).
+    """
+
+    def __init__(self):
+        self._values: dict[tuple[str, Any, str], Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, model: type[models.Model], pk: Any, field: str, default: Any = None) -> Any:
+        return self._values.get((model._meta.label, pk, field), default)
+
+    def has(self, model: type[models.Model], pk: Any, field: str) -> bool:
+        return (model._meta.label, pk, field) in self._values
+
+    def set(self, model: type[models.Model], pk: Any, field: str, value: Any) -> None:
+        self._values[(model._meta.label, pk, field)] = value
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+def get_decrypted_value_cache() -> DecryptedValueCache | None:
+    """
+    Return the decrypted value cache for the current request.
+
+    Returns:
+        DecryptedValueCache or None: The current request's cache, or None outside of a request (e.g. in Celery tasks).
+
+    """
+    return _decrypted_value_cache.get()
+
+
+class DecryptedValueCacheMiddleware:
+    """
+    Installs a fresh `DecryptedValueCache` for the duration of each request, so plaintext never outlives the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _decrypted_value_cache.set(DecryptedValueCache())
+        try:
+            return self.get_response(request)
+        finally:
+            _decrypted_value_cache.reset(token)
+
+
+class DecryptionBatch:
+    """
+    The model instances materialized together by one `decrypt_only()` query.
+
+    Attributes:
+        model (type[models.Model]): The model the instances belong to.
+        using (str): The database alias the instances were read from.
+        instances (list[models.Model]): The instances in the batch.
+
+    """
+
+    def __init__(self, model: type[models.Model], using: str, instances: list[models.Model]):
+        self.model = model
+        self.using = using
+        self.instances = instances
+
+    def load(self, fields: list[str]) -> None:
+        """
+        Decrypt the provided fields for every instance in the batch that has not loaded them yet, in a single query.
+
+        Args:
+            fields (list[str]): The attribute names of the encrypted fields to load.
+
+        """
+        request_cache = get_decrypted_value_cache()
+        pending = {}
+        for instance in self.instances:
+            missing = [field for field in fields if field not in instance.__dict__]
+            if not missing:
+                continue
+            if request_cache is not None and all(request_cache.has(self.model, instance.pk, field) for field in missing):
+                for field in missing:
+                    instance.__dict__[field] = request_cache.get(self.model, instance.pk, field)
+                continue
+            pending[instance.pk] = instance
+        if not pending:
+            return
+
+        logger.debug(f"Batch Decrypting {', '.join(fields)} For {len(pending)} {self.model.__name__} Rows")
+        rows = self.model._base_manager.using(self.using).filter(pk__in=list(pending)).values_list("pk", *fields)
+        for pk, *values in rows:
+            for field, value in zip(fields, values, strict=True):
+                pending[pk].__dict__[field] = value
+                if request_cache is not None:
+                    request_cache.set(self.model, pk, field, value)
+
+
+class BatchDecryptQuerySet(models.QuerySet):
+    """
+    QuerySet that decrypts only the encrypted fields a caller asks for, and batches any that are read later.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._batch_decrypt = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._batch_decrypt = self._batch_decrypt
+        return clone
+
+    def decrypt_only(self, *fields: str) -> "BatchDecryptQuerySet":
+        """
+        Defer every encrypted field except the provided ones.
+
+        Unencrypted fields are loaded as usual. A deferred encrypted field accessed on any row is decrypted
+        for the whole result batch in one query.
+
+        Args:
+            *fields (str): The encrypted fields to decrypt up front.
+
+        Returns:
+            BatchDecryptQuerySet: The restricted queryset.
+
+        """
+        deferred = [field for field in get_encrypted_field_names(self.model) if field not in fields]
+        clone = self.defer(*deferred) if deferred else self._chain()
+        clone._batch_decrypt = True
+        return clone
+
+    def filter_blind(self, **lookups: Any) -> "BatchDecryptQuerySet":
+        """
+        Filter by exact, case-insensitive match on encrypted fields through their blind index columns.
+
+        Args:
+            **lookups: Plaintext values keyed by encrypted field name, e.g. `email="jane@example.com"`.
+
+        Returns:
+            BatchDecryptQuerySet: The filtered queryset.
+
+        Raises:
+            FieldError: If a field has no blind index.
+
+        """
+        blind_indexes = getattr(self.model, "BLIND_INDEXES", {})
+        filters = {}
+        for field, value in lookups.items():
+            if field not in blind_indexes:
+                raise FieldError(f"{self.model.__name__}.{field} has no blind index")
+            filters[blind_indexes[field]] = compute_blind_index(value, field)
+        return self.filter(**filters)
+
+    def _fetch_all(self):
+        already_fetched = self._result_cache is not None
+        super()._fetch_all()
+        if not self._batch_decrypt or already_fetched or not self._result_cache or not isinstance(self._result_cache[0], BatchDecryptMixin):
+            return
+        batch = DecryptionBatch(self.model, self.db, self._result_cache)
+        request_cache = get_decrypted_value_cache()
+        encrypted_fields = get_encrypted_field_names(self.model)
+        for instance in self._result_cache:
+            instance._decryption_batch = batch
+            if request_cache is not None:
+                for field in encrypted_fields:
+                    if field in instance.__dict__:
+                        request_cache.set(self.model, instance.pk, field, instance.__dict__[field])
+
+
+class BatchDecryptMixin:
+    """
+    Model mixin that loads deferred encrypted fields for the instance's whole `DecryptionBatch` at once.
+    """
+
+    _decryption_batch: DecryptionBatch | None = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state.pop("_decryption_batch", None)
+        return state
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        batch = self._decryption_batch
+        if batch is not None and fields and from_queryset is None and set(fields) <= set(get_encrypted_field_names(type(self))):
+            batch.load(list(fields))
+            if all(field in self.__dict__ for field in fields):
+                return
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+
+class BlindIndexMixin:
+    """
+    Model mixin that keeps the blind index columns declared in `BLIND_INDEXES` in sync on every save.
+
+    Attributes:
+        BLIND_INDEXES (dict[str, str]): Maps each encrypted field name to the name of its blind index column.
+
+    """
+
+    BLIND_INDEXES: dict[str, str] = {}
+
+    def refresh_blind_indexes(self) -> list[str]:
+        """
+        Recompute the blind index columns from the instance's loaded plaintext values.
+
+        Returns:
+            list[str]: The names of the blind index columns that were recomputed.
+
+        """
+        refreshed = []
+        deferred = self.get_deferred_fields()
+        for field, index_field in self.BLIND_INDEXES.items():
+            if field not in deferred:
+                setattr(self, index_field, compute_blind_index(getattr(self, field), field))
+                refreshed.append(index_field)
+        return refreshed
+
+    def save(self, *args, **kwargs) -> None:
+        refreshed = self.refresh_blind_indexes()
+        if (update_fields := kwargs.get("update_fields")) is not None:
+            kwargs["update_fields"] = {*update_fields, *(self.BLIND_INDEXES[field] for field in update_fields if field in self.BLIND_INDEXES and self.BLIND_INDEXES[field] in refreshed)}
+        super().save(*args, **kwargs)
@@ -0,0 +1,142 @@
+"""
+Module: common.exports
+
+This module provides constant-memory JSON exports of whole tables.
+
+Rows are read with a chunked `iterator()` (a server-side cursor on PostgreSQL) and written to a `StreamingHttpResponse`
+as they are decrypted and encoded, so the first byte goes out immediately and memory stays flat regardless of table size.
+
+Query Parameters:
+- format: "json" (default) streams a JSON array; "ndjson" streams one JSON object per line.
+- after: Keyset cursor; only rows with a primary key greater than this value are exported.
+- limit: Maximum number of rows to export. When more rows remain, the cursor for the next page is returned in the `X-Next-Cursor` header.
+
+"""
+
+import json
+from collections.abc import Iterable, Iterator
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from rest_framework import status
+
+EXPORT_CONTENT_TYPES: dict[str, str] = {"json": "application/json", "ndjson": "application/x-ndjson"}
+NEXT_CURSOR_HEADER: str = "X-Next-Cursor"
+
+# Number of encoded rows buffered into each chunk written to the client.
+STREAM_FLUSH_ROWS: int = 100
+
+
+class ExportJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for exported rows that falls back to `str()` for values such as phone numbers.
+    """
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return str(o)
+
+
+def paginate_by_keyset(queryset: QuerySet, after: str | None, limit: str | None) -> tuple[QuerySet, str | None]:
+    """
+    Restrict a queryset to one keyset page ordered by primary key.
+
+    Args:
+        queryset (QuerySet): The rows being exported.
+        after (str or None): Only rows with a primary key greater than this value are included.
+        limit (str or None): The maximum number of rows in the page.
+
+    Returns:
+        tuple: The paginated queryset and the cursor for the next page, or None if this is the last page.
+
+    Raises:
+        ValueError: If `after` or `limit` is not a valid value.
+
+    """
+    queryset = queryset.order_by("pk")
+    if after:
+        queryset = queryset.filter(pk__gt=int(after))
+    if not limit:
+        return queryset, None
+
+    limit = int(limit)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    # NOTE: Reads only the primary keys straddling the page boundary, so detecting a next page is a single index scan.
+    boundary = list(queryset.values_list("pk", flat=True)[limit - 1 : limit + 1])
+    next_cursor = str(boundary[0]) if len(boundary) == 2 else None
+    return queryset[:limit], next_cursor
+
+
+def _buffered(lines: Iterable[str]) -> Iterator[str]:
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= STREAM_FLUSH_ROWS:
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
+
+
+def render_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encode rows as newline-delimited JSON.
+
+    Args:
+        rows (Iterable[dict]): The rows to encode.
+
+    Yields:
+        str: Chunks of the encoded output.
+
+    """
+    yield from _buffered(f"{json.dumps(row, cls=ExportJSONEncoder)}\n" for row in rows)
+
+
+def render_json_array(rows: Iterable[dict]) -> Iterator[str]:
+    """
+    Encode rows as a single JSON array, one element at a time.
+
+    Args:
+        rows (Iterable[dict]): The rows to encode.
+
+    Yields:
+        str: Chunks of the encoded output.
+
+    """
+    yield "["
+    yield from _buffered(f"{',' if index else ''}{json.dumps(row, cls=ExportJSONEncoder)}" for index, row in enumerate(rows))
+    yield "]"
+
+
+def stream_queryset_export(request: HttpRequest, queryset: QuerySet, fields: Iterable[str] = ()) -> HttpResponse:
+    """
+    Stream the rows of a queryset as JSON, honoring the `format`, `after` and `limit` query parameters.
+
+    Args:
+        request (HttpRequest): The export request.
+        queryset (QuerySet): The rows to export.
+        fields (Iterable[str]): The fields to include in each row; all concrete fields when empty.
+
+    Returns:
+        HttpResponse: A streaming JSON or NDJSON response, or a 400 response for invalid parameters.
+
+    """
+    export_format = request.GET.get("format", "json")
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return HttpResponse(content=f"Unsupported export format: {export_format}", status=status.HTTP_400_BAD_REQUEST)
+    try:
+        page, next_cursor = paginate_by_keyset(queryset.values(*fields), request.GET.get("after"), request.GET.get("limit"))
+    except ValueError:
+        return HttpResponse(content="after and limit must be positive integers", status=status.HTTP_400_BAD_REQUEST)
+
+    rows = page.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    renderer = render_ndjson if export_format == "ndjson" else render_json_array
+    response = StreamingHttpResponse(renderer(rows), content_type=EXPORT_CONTENT_TYPES[export_format], status=status.HTTP_200_OK)
+    if next_cursor is not None:
+        response[NEXT_CURSOR_HEADER] = next_cursor
+    return response
@@ -0,0 +1,236 @@
+"""
+Module: common.local_cache
+
+This module provides an optional per-process cache tier that sits in front of the shared Redis cache.
+
+Repeated reads of the same dashboard, roster or API payload within a worker are served from a bounded, in-memory LRU
+instead of paying a Redis round trip plus unpickling on every request. Entries are tagged with the names of the models
+they were built from, and `common.cache.invalidate_cache` broadcasts the saved model's name over Redis pub/sub so every
+process drops its affected entries.
+
+Classes:
+- LocalLRUCache: A thread-safe LRU bounded by entry count, approximate memory footprint and TTL.
+- InvalidationSubscriber: A daemon thread that listens for invalidation broadcasts and evicts matching local entries.
+
+Functions:
+- get_local_cache: Returns the process-wide local cache, or None when the local tier is disabled.
+- broadcast_invalidation: Evicts a model's entries locally and publishes the invalidation to every other process.
+
+Settings:
+- LOCAL_CACHE_ENABLED (bool): Turns the local tier on.
+- LOCAL_CACHE_MAX_ENTRIES (int): Maximum number of entries held per process.
+- LOCAL_CACHE_MAX_BYTES (int): Approximate memory cap per process, measured as the pickled size of each entry.
+- LOCAL_CACHE_TTL (int): Seconds an entry may be served locally; bounds staleness if a broadcast is ever missed.
+- LOCAL_CACHE_CHANNEL (str): The Redis pub/sub channel used for invalidation broadcasts.
+
+"""
+
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from typing import Any
+
+from django.conf import settings
+from loguru import logger
+
+from common.metrics import metrics
+
+MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Thread-safe, in-process LRU cache bounded by entry count, approximate memory and TTL.
+
+    Attributes:
+        max_entries (int): The maximum number of entries held.
+        max_bytes (int): The approximate memory cap, measured as the pickled size of each entry.
+        ttl (int): The number of seconds an entry is served before it is treated as a miss.
+
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self._entries: OrderedDict[str, tuple[float, int, frozenset[str], Any]] = OrderedDict()
+        self._tag_index: defaultdict[str, set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """
+        Retrieve a value, refreshing its position in the LRU order.
+
+        Args:
+            key (str): The cache key to look up.
+
+        Returns:
+            Any: The cached value, or `MISSING` if the key is absent or expired.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, _, _, value = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, tags: Iterable[str] = ()) -> bool:
+        """
+        Store a value tagged with the names of the models it was built from.
+
+        Values whose pickled size exceeds a tenth of the memory cap are not stored, so a single large payload cannot flush the tier.
+
+        Args:
+            key (str): The cache key under which to store the value.
+            value (Any): The value to store.
+            tags (Iterable[str]): The model names the value depends on.
+
+        Returns:
+            bool: True if the value was stored.
+
+        """
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        if size > self.max_bytes // 10:
+            return False
+
+        with self._lock:
+            self._remove(key)
+            tags = frozenset(tags)
+            self._entries[key] = (time.monotonic() + self.ttl, size, tags, value)
+            self.current_bytes += size
+            for tag in tags:
+                self._tag_index[tag].add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+            metrics.set_local_cache_size(entries=len(self._entries), size=self.current_bytes)
+        return True
+
+    def evict_tag(self, tag: str) -> int:
+        """
+        Remove every entry tagged with the provided model name.
+
+        Args:
+            tag (str): The model name whose entries should be removed.
+
+        Returns:
+            int: The number of entries removed.
+
+        """
+        with self._lock:
+            keys = self._tag_index.pop(tag, set())
+            for key in keys:
+                self._remove(key)
+            metrics.set_local_cache_size(entries=len(self._entries), size=self.current_bytes)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tag_index.clear()
+            self.current_bytes = 0
+            metrics.set_local_cache_size(entries=0, size=0)
+
+    def _remove(self, key: str) -> None:
+        if (entry := self._entries.pop(key, None)) is None:
+            return
+        _, size, tags, _ = entry
+        self.current_bytes -= size
+        for tag in tags:
+            if keys := self._tag_index.get(tag):
+                keys.discard(key)
+                if not keys:
+                    del self._tag_index[tag]
+
+
+class InvalidationSubscriber(threading.Thread):
+    """
+    Daemon thread that evicts local cache entries when another process broadcasts an invalidation.
+
+    If the subscription drops, the local cache is cleared before resubscribing, since broadcasts may have been missed in between.
+    """
+
+    RECONNECT_BACKOFF_SECONDS: float = 5.0
+
+    def __init__(self, local_cache: LocalLRUCache, channel: str):
+        super().__init__(name="local-cache-invalidation", daemon=True)
+        self.local_cache = local_cache
+        self.channel = channel
+
+    def run(self) -> None:
+        from django_redis import get_redis_connection
+
+        while True:
+            try:
+                pubsub = get_redis_connection("default").pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    model_name = message["data"].decode("utf-8") if isinstance(message["data"], bytes) else str(message["data"])
+                    evicted = self.local_cache.evict_tag(model_name)
+                    logger.debug(f"Local Cache Invalidation Received For {model_name} - {evicted} Entries Evicted")
+            except Exception as e:
+                logger.warning(f"Local Cache Invalidation Subscription Lost - Clearing Local Cache: {e}")
+                self.local_cache.clear()
+                time.sleep(self.RECONNECT_BACKOFF_SECONDS)
+
+
+_local_cache: LocalLRUCache | None = None
+_local_cache_pid: int | None = None
+_local_cache_lock = threading.Lock()
+
+
+def get_local_cache() -> LocalLRUCache | None:
+    """
+    Return the process-wide local cache tier, creating it (and its invalidation subscriber) on first use.
+
+    The tier is recreated after a fork, so Celery prefork and gunicorn workers never share a parent's stale entries or subscriber thread.
+
+    Returns:
+        LocalLRUCache or None: The local cache, or None when `LOCAL_CACHE_ENABLED` is off.
+
+    """
+    global _local_cache, _local_cache_pid
+    if not settings.LOCAL_CACHE_ENABLED:
+        return None
+    if _local_cache is not None and _local_cache_pid == os.getpid():
+        return _local_cache
+    with _local_cache_lock:
+        if _local_cache is None or _local_cache_pid != os.getpid():
+            _local_cache = LocalLRUCache(max_entries=settings.LOCAL_CACHE_MAX_ENTRIES, max_bytes=settings.LOCAL_CACHE_MAX_BYTES, ttl=settings.LOCAL_CACHE_TTL)
+            _local_cache_pid = os.getpid()
+            InvalidationSubscriber(_local_cache, settings.LOCAL_CACHE_CHANNEL).start()
+    return _local_cache
+
+
+def broadcast_invalidation(model_name: str) -> None:
+    """
+    Evict a model's entries from this process's local cache and tell every other process to do the same.
+
+    Args:
+        model_name (str): The name of the model that was saved or deleted.
+
+    """
+    if not settings.LOCAL_CACHE_ENABLED:
+        return
+    if (local_cache := get_local_cache()) is not None:
+        local_cache.evict_tag(model_name)
+    try:
+        from django_redis import get_redis_connection
+
+        get_redis_connection("default").publish(settings.LOCAL_CACHE_CHANNEL, model_name)
+    except Exception as e:
+        logger.error(f"Unable to Broadcast Local Cache Invalidation for {model_name}: {e}")
@@ -0,0 +1,289 @@
+"""
+Module: common.mail_queue
+
+This module moves outbound email off the request path and onto a dedicated Celery queue.
+
+`PostOffice.post()` serializes composed messages and queues them with `enqueue_messages`, which returns as soon as the
+broker has the task. The `send_queued_emails` task runs on the `MAIL_QUEUE` worker, opens one SMTP connection per batch
+and sends every message in the batch over it, pacing delivery with a rate limiter shared by all mail workers. If the SMTP
+server fails part way through a batch, only the undelivered messages are retried, with exponential backoff.
+
+`PostOffice.send_bulk()` fans one template out to every recipient of a queryset, queuing one `send_bulk_emails` task per
+`MAIL_BATCH_SIZE` recipients. Each task loads its recipients, renders each message from the recipient's own attributes,
+and delivers the batch over one SMTP connection. Every delivered recipient is checkpointed in the cache, and the task is
+only acknowledged once it finishes, so a batch interrupted by a worker crash is redelivered and skips the recipients
+already emailed, as does a send queued again under the same campaign.
+
+Classes:
+- MailRateLimiter: A fixed-window, per-second send limit shared through the default cache.
+- BulkMailCheckpoint: The progress of one bulk send, kept in the default cache.
+
+Functions:
+- serialize_message: Converts an EmailMessage into a JSON-serializable dict for the task payload.
+- deserialize_message: Rebuilds the EmailMultiAlternatives described by `serialize_message`.
+- enqueue_messages: Queues messages for delivery in batches of `MAIL_BATCH_SIZE`.
+- send_queued_emails: Celery task that delivers one batch over a single SMTP connection.
+- compose_bulk_message: Renders one recipient's message of a bulk send.
+- send_bulk_emails: Celery task that delivers one batch of a bulk send, skipping recipients already emailed.
+
+Settings:
+- MAIL_QUEUE (str): The Celery queue consumed by the mail worker.
+- MAIL_BATCH_SIZE (int): The maximum number of messages, or bulk send recipients, delivered per task and so per SMTP connection.
+- MAIL_RATE_LIMIT_PER_SECOND (int): The maximum number of messages sent per second across all mail workers.
+- MAIL_BULK_CHECKPOINT_TTL (int): The number of seconds a bulk send remembers the recipients it has emailed.
+
+"""
+
+import smtplib
+import time
+
+from celery import shared_task
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.db import models
+from loguru import logger
+
+from common.email_rendering import CompiledEmail, get_compiled_email
+from common.metrics import metrics
+
+MAIL_RETRY_BASE_DELAY = 4  # seconds; doubled on every retry
+MAIL_RETRY_MAX_DELAY = 300
+
+
+def serialize_message(message: EmailMessage) -> dict:
+    """
+    Convert a message into a JSON-serializable dict for a task payload.
+
+    Args:
+        message (EmailMessage): The composed message. Attachments are not supported.
+
+    Returns:
+        dict: The message's envelope, headers, body and alternative parts.
+
+    """
+    return {
+        "subject": message.subject,
+        "body": message.body,
+        "from_email": message.from_email,
+        "to": list(message.to),
+        "cc": list(message.cc),
+        "bcc": list(message.bcc),
+        "reply_to": list(message.reply_to),
+        "headers": dict(message.extra_headers),
+        "alternatives": [[content, mimetype] for content, mimetype in getattr(message, "alternatives", [])],
+    }
+
+
+def deserialize_message(payload: dict) -> EmailMultiAlternatives:
+    """
+    Rebuild a message serialized by `serialize_message`.
+
+    Args:
+        payload (dict): The serialized message.
+
+    Returns:
+        EmailMultiAlternatives: The message, ready to send.
+
+    """
+    return EmailMultiAlternatives(
+        subject=payload["subject"],
+        body=payload["body"],
+        from_email=payload["from_email"],
+        to=payload["to"],
+        cc=payload["cc"],
+        bcc=payload["bcc"],
+        reply_to=payload["reply_to"],
+        headers=payload["headers"],
+        alternatives=[tuple(alternative) for alternative in payload["alternatives"]],
+    )
+
+
+class MailRateLimiter:
+    """
+    Fixed-window, per-second send limit shared by every mail worker through the default cache.
+
+    Attributes:
+        per_second (int): The number of messages that may be sent per one-second window.
+
+    """
+
+    KEY_PREFIX = "mail-rate"
+
+    def __init__(self, per_second: int):
+        self.per_second = per_second
+
+    def acquire(self) -> None:
+        """
+        Block until one more message may be sent without exceeding the limit.
+        """
+        while True:
+            window = int(time.time())
+            key = f"{self.KEY_PREFIX}:{window}"
+            cache.add(key, 0, timeout=2)
+            try:
+                if cache.incr(key) <= self.per_second:
+                    return
+            except ValueError:
+                # NOTE: The window expired between add() and incr(); start over in the next one.
+                continue
+            time.sleep(max(window + 1 - time.time(), 0))
+
+
+def enqueue_messages(messages: list[EmailMessage]) -> int:
+    """
+    Queue messages for delivery by the mail worker.
+
+    Args:
+        messages (list[EmailMessage]): The composed messages.
+
+    Returns:
+        int: The number of messages queued.
+
+    """
+    payloads = [serialize_message(message) for message in messages]
+    for start in range(0, len(payloads), settings.MAIL_BATCH_SIZE):
+        send_queued_emails.apply_async(args=[payloads[start : start + settings.MAIL_BATCH_SIZE]], queue=settings.MAIL_QUEUE)
+    logger.debug(f"Queued {len(payloads)} Emails for Delivery")
+    return len(payloads)
+
+
+@shared_task(bind=True, max_retries=5)
+def send_queued_emails(self, payloads: list[dict]) -> int:
+    """
+    Deliver a batch of queued messages over a single SMTP connection.
+
+    Args:
+        self: The Celery task instance.
+        payloads (list[dict]): The messages, as serialized by `serialize_message`.
+
+    Returns:
+        int: The number of messages delivered.
+
+    """
+    rate_limiter = MailRateLimiter(per_second=settings.MAIL_RATE_LIMIT_PER_SECOND)
+    delivered = 0
+    try:
+        with get_connection() as connection:
+            for payload in payloads:
+                rate_limiter.acquire()
+                connection.send_messages([deserialize_message(payload)])
+                delivered += 1
+    except Exception as e:
+        metrics.increment_emails(outcome="sent", count=delivered)
+        metrics.increment_emails(outcome="retried", count=len(payloads) - delivered)
+        logger.warning(f"Email Delivery Failed After {delivered} of {len(payloads)} Messages - Retrying the Rest: {e}")
+        # NOTE: Only the undelivered messages are retried, so recipients earlier in the batch are not emailed twice.
+        raise self.retry(args=[payloads[delivered:]], exc=e, countdown=min(MAIL_RETRY_BASE_DELAY * 2**self.request.retries, MAIL_RETRY_MAX_DELAY)) from e
+    metrics.increment_emails(outcome="sent", count=delivered)
+    logger.info(f"Delivered {delivered} Queued Emails")
+    return delivered
+
+
+class BulkMailCheckpoint:
+    """
+    The recipients one bulk send has emailed, kept in the default cache so a redelivered or requeued batch skips them.
+
+    Attributes:
+        campaign_id (str): The identifier of the bulk send.
+
+    """
+
+    KEY_PREFIX = "mail-bulk"
+
+    def __init__(self, campaign_id: str):
+        self.campaign_id = campaign_id
+
+    def key(self, recipient_id: int) -> str:
+        return f"{self.KEY_PREFIX}:{self.campaign_id}:{recipient_id}"
+
+    def pending(self, recipient_ids: list[int]) -> list[int]:
+        """
+        Return the recipients not emailed yet, in the given order, with a single cache read.
+        """
+        delivered = cache.get_many([self.key(recipient_id) for recipient_id in recipient_ids])
+        return [recipient_id for recipient_id in recipient_ids if self.key(recipient_id) not in delivered]
+
+    def save(self, recipient_id: int) -> None:
+        """
+        Record that a recipient has been processed.
+        """
+        cache.set(self.key(recipient_id), True, timeout=settings.MAIL_BULK_CHECKPOINT_TTL)
+
+
+def compose_bulk_message(compiled: CompiledEmail, recipient: models.Model, context: dict, from_email: str, reply_to: str) -> EmailMultiAlternatives:
+    """
+    Render one recipient's message of a bulk send.
+
+    Args:
+        compiled (CompiledEmail): The compiled email template.
+        recipient (models.Model): The recipient. Placeholders missing from `context` are read from its attributes.
+        context (dict): The placeholder values shared by every recipient.
+        from_email (str): The sender's address.
+        reply_to (str): The reply-to address.
+
+    Returns:
+        EmailMultiAlternatives: The composed message.
+
+    """
+    email = compiled.render({**{name: getattr(recipient, name) for name in compiled.names - context.keys()}, **context})
+    message = EmailMultiAlternatives(subject=email.subject, body=email.text, from_email=from_email, to=[recipient.email.lower()], reply_to=[reply_to])
+    if email.html is not None:
+        message.attach_alternative(email.html, "text/html")
+    return message
+
+
+@shared_task(bind=True, max_retries=5, acks_late=True, reject_on_worker_lost=True)
+def send_bulk_emails(self, campaign_id: str, template_name: str, model_label: str, recipient_ids: list[int], context: dict, from_email: str, reply_to: str) -> int:
+    """
+    Deliver one template to one batch of a bulk send's recipients, skipping those the send has already emailed.
+
+    The batch is loaded with one query and every message is sent over the same SMTP connection. Recipients refused by the
+    SMTP server are skipped; any other failure retries the task, which resumes after the last recipient processed.
+
+    Args:
+        self: The Celery task instance.
+        campaign_id (str): The identifier of the bulk send, used as its checkpoint key.
+        template_name (str): The name of the email in `common.email_rendering.EMAIL_TEMPLATES`.
+        model_label (str): The "app_label.ModelName" of the recipients.
+        recipient_ids (list[int]): The primary keys of the batch's recipients, at most `MAIL_BATCH_SIZE`, in delivery order.
+        context (dict): The placeholder values shared by every recipient.
+        from_email (str): The sender's address.
+        reply_to (str): The reply-to address.
+
+    Returns:
+        int: The number of recipients processed by this attempt.
+
+    """
+    model = apps.get_model(model_label)
+    compiled = get_compiled_email(template_name, settings.LANGUAGE_CODE)
+    checkpoint = BulkMailCheckpoint(campaign_id)
+    rate_limiter = MailRateLimiter(per_second=settings.MAIL_RATE_LIMIT_PER_SECOND)
+    pending_ids = checkpoint.pending(recipient_ids)
+    if len(pending_ids) < len(recipient_ids):
+        logger.info(f"Resuming Bulk Email {campaign_id} - {len(recipient_ids) - len(pending_ids)} of {len(recipient_ids)} Recipients Already Processed")
+    processed = sent = refused = 0
+    start = time.perf_counter()
+    try:
+        recipients = model._default_manager.in_bulk(pending_ids)
+        with get_connection() as connection:
+            for recipient_id in pending_ids:
+                # NOTE: Recipients deleted since the send was queued, or without an address, are skipped.
+                if (recipient := recipients.get(recipient_id)) is not None and recipient.email:
+                    rate_limiter.acquire()
+                    try:
+                        connection.send_messages([compose_bulk_message(compiled, recipient, context, from_email, reply_to)])
+                        sent += 1
+                    except smtplib.SMTPRecipientsRefused as e:
+                        refused += 1
+                        logger.warning(f"Bulk Email {campaign_id} Refused For {model_label} {recipient_id}: {e}")
+                checkpoint.save(recipient_id)
+                processed += 1
+    except Exception as e:
+        logger.warning(f"Bulk Email {campaign_id} Failed After {processed} of {len(pending_ids)} Recipients - Retrying: {e}")
+        raise self.retry(exc=e, countdown=min(MAIL_RETRY_BASE_DELAY * 2**self.request.retries, MAIL_RETRY_MAX_DELAY)) from e
+    finally:
+        metrics.observe_bulk_email_batch(template=template_name, sent=sent, refused=refused, duration=time.perf_counter() - start)
+    logger.info(f"Delivered Bulk Email {campaign_id} to a Batch of {len(recipient_ids)} Recipients")
+    return processed
@@ -1,24 +1,15 @@
+from uuid import uuid4
+
 from django.conf import settings
-from django.core.mail import EmailMessage, EmailMultiAlternatives, mail_managers
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.db.models import QuerySet
 from django.forms.models import model_to_dict
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from applications.web.models import ClientInterestSubmission, EmploymentApplicationModel
-from common.email_templates import (
-    APPLICATION_BODY,
-    CLIENT_BODY,
-    INTERNAL_APPLICATION_NOTIFICATION,
-    INTERNAL_CLIENT_SERVICE_REQUEST_NOTIFICATION,
-    NEW_HIRE_ONBOARDING_TEMPLATE_BODY,
-    PLAIN_TEXT_APPLICATION_BODY,
-    PLAIN_TEXT_CLIENT_BODY,
-    PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE,
-    PLAIN_TEXT_REJECTION_EMAIL_TEMPLATE,
-    PLAIN_TEXT_TERMINATION_EMAIL_TEMPLATE,
-    REJECTION_TEMPLATE_BODY,
-)
+from common.email_rendering import render_email
 from common.errors import ElectronicMailTransmissionError
+from common.mail_queue import enqueue_messages, send_bulk_emails
 
 
 class PostOffice(EmailMultiAlternatives):
@@ -28,18 +19,104 @@ class PostOffice(EmailMultiAlternatives):
     cc = (None,)
     reply_to = settings.EMAIL_HOST_USER
     internal_distro_list = settings.MANAGERS
-    MAIL_RETRY_MULTIPLIER = 1
-    MAIL_RETRY_MIN_WAIT = 4
-    MAIL_RETRY_MAX_WAIT = 10
-    MAX_ATTEMPTS = stop_after_attempt(3)
-    WAIT_STRATEGY = wait_exponential(multiplier=MAIL_RETRY_MULTIPLIER, min=MAIL_RETRY_MIN_WAIT, max=MAIL_RETRY_MAX_WAIT)
 
     def __init__(self, from_email=settings.DEFAULT_FROM_EMAIL, reply_to=settings.DEFAULT_FROM_EMAIL):
         self.from_email = from_email
         self.reply_to = reply_to
         super().__init__()
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
+    def post(self, *messages: EmailMessage) -> int:
+        """
+        Queue composed messages for delivery by the mail worker, so callers never wait on SMTP.
+
+        Delivery, retries and rate limiting happen in `common.mail_queue.send_queued_emails`.
+
+        Args:
+            *messages (EmailMessage): The messages to send.
+
+        Returns:
+            int: The number of messages queued.
+
+        """
+        return enqueue_messages(list(messages))
+
+    def compose_managers_notification(self, subject: str, body: str) -> EmailMessage:
+        """
+        Compose a plain-text notification to the site managers, as `django.core.mail.mail_managers` would send it.
+
+        Args:
+            subject (str): The subject, without the `EMAIL_SUBJECT_PREFIX`.
+            body (str): The message body.
+
+        Returns:
+            EmailMessage: The composed message.
+
+        """
+        return EmailMessage(subject=f"{settings.EMAIL_SUBJECT_PREFIX}{subject}", body=body, from_email=settings.SERVER_EMAIL, to=[address for _, address in self.internal_distro_list])
+
+    def compose(self, template_name: str, to: str, context: dict) -> EmailMultiAlternatives:
+        """
+        Compose a message from one of the compiled templates in `common.email_rendering.EMAIL_TEMPLATES`.
+
+        Args:
+            template_name (str): The name of the email template.
+            to (str): The recipient's email address.
+            context (dict): The value of every placeholder in the template.
+
+        Returns:
+            EmailMultiAlternatives: The composed message, with an HTML alternative if the template has one.
+
+        """
+        email = render_email(template_name, context)
+        msg = EmailMultiAlternatives(subject=email.subject, to=[to.lower()], body=email.text, from_email=self.from_email, reply_to=[self.reply_to])
+        if email.html is not None:
+            msg.attach_alternative(email.html, "text/html")
+        return msg
+
+    def send_bulk(self, template_name: str, recipients: QuerySet, context: dict | None = None, campaign_id: str | None = None) -> str:
+        """
+        Queue one message per recipient, rendered from each recipient's own attributes, for delivery by the mail worker.
+
+        The recipients' primary keys are read now with a server-side cursor and queued in batches of `MAIL_BATCH_SIZE`, one
+        task per batch, so neither this process nor any broker message grows with the number of recipients. Each task
+        emails its batch over one SMTP connection and checkpoints every recipient, so a batch interrupted by a worker crash
+        resumes instead of starting over. See `common.mail_queue.send_bulk_emails`.
+
+        Args:
+            template_name (str): The name of the email template.
+            recipients (QuerySet): The recipients. Each must have an `email` attribute.
+            context (dict | None): JSON-serializable placeholder values shared by every recipient. Placeholders not provided
+                here are read from each recipient, e.g. `first_name`.
+            campaign_id (str | None): Identifies the send. Queuing a send again under the same identifier will not email
+                recipients it has already reached. Defaults to a new random identifier.
+
+        Returns:
+            str: The campaign identifier.
+
+        """
+        campaign_id = campaign_id or uuid4().hex
+        task_kwargs = {
+            "campaign_id": campaign_id,
+            "template_name": template_name,
+            "model_label": recipients.model._meta.label,
+            "context": context or {},
+            "from_email": self.from_email,
+            "reply_to": self.reply_to,
+        }
+        recipient_count = 0
+        batch_ids: list[int] = []
+        for recipient_id in recipients.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=settings.MAIL_BATCH_SIZE):
+            batch_ids.append(recipient_id)
+            if len(batch_ids) == settings.MAIL_BATCH_SIZE:
+                send_bulk_emails.apply_async(kwargs={**task_kwargs, "recipient_ids": batch_ids}, queue=settings.MAIL_QUEUE)
+                recipient_count += len(batch_ids)
+                batch_ids = []
+        if batch_ids:
+            send_bulk_emails.apply_async(kwargs={**task_kwargs, "recipient_ids": batch_ids}, queue=settings.MAIL_QUEUE)
+            recipient_count += len(batch_ids)
+        logger.info(f"Queued Bulk Email {campaign_id} ({template_name}) for {recipient_count} Recipients")
+        return campaign_id
+
     def send_external_application_submission_confirmation(self, applicant: dict) -> bool:
         """
         Sends a confirmation email for a new employment interest or client interest submission.
@@ -48,7 +125,7 @@ class PostOffice(EmailMultiAlternatives):
             applicant (dict): Dictionary containing the applicant's information including first_name, email, etc.
 
         Returns:
-            bool: True if email was successfully sent.
+            bool: True once the email is queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
@@ -65,22 +142,14 @@ class PostOffice(EmailMultiAlternatives):
 
     # TODO Rename this here and in `send_external_application_submission_confirmation`
     def _extracted_from_send_external_application_submission_confirmation_17(self, applicant):
-        subject: str = f"Thanks For Your Employment Interest, {applicant['first_name']}!"
-        to = applicant["email"].lower()
-        content_subtype = "text/html"
-        html_content = APPLICATION_BODY.substitute(first_name=applicant["first_name"])
-        text_content = PLAIN_TEXT_APPLICATION_BODY.substitute(first_name=applicant["first_name"])
-
-        msg = EmailMultiAlternatives(subject=subject, to=[to], body=text_content, from_email=self.from_email, reply_to=[self.reply_to])
-        msg.attach_alternative(html_content, content_subtype)
-        sent_emails: int = msg.send()
+        msg = self.compose("application_confirmation", to=applicant["email"], context={"first_name": applicant["first_name"]})
+        sent_emails: int = self.post(msg)
         if sent_emails <= 0:
             logger.error(f"EMAIL TRANSMISSION FAILURE - {sent_emails}")
             raise ElectronicMailTransmissionError("Email Not Sent")
-        logger.info(f"Number of External Emails Sent:{sent_emails}")
+        logger.info(f"Number of External Emails Queued:{sent_emails}")
         return True
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
     def send_external_client_submission_confirmation(self, interested_client: dict) -> None:
         """
         Sends a confirmation email for a new client interest submission.
@@ -89,7 +158,7 @@ class PostOffice(EmailMultiAlternatives):
             interested_client (dict): Dictionary representation of the client submission instance containing first_name, email, etc.
 
         Returns:
-            bool: True if email was successfully sent.
+            bool: True once the email is queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
@@ -98,15 +167,8 @@ class PostOffice(EmailMultiAlternatives):
         if not isinstance(interested_client, dict):
             interested_client = model_to_dict(interested_client)
         try:
-            subject: str = f"We Are On It, {interested_client['first_name']}!"
-            to = interested_client["email"].lower()
-            content_subtype = "text/html"
-            html_content = CLIENT_BODY.substitute(first_name=interested_client["first_name"])
-            text_content = PLAIN_TEXT_CLIENT_BODY.substitute(first_name=interested_client["first_name"])
-
-            msg = EmailMultiAlternatives(subject=subject, to=[to], from_email=self.from_email, reply_to=[self.reply_to], body=text_content)
-            msg.attach_alternative(html_content, content_subtype)
-            sent_emails = msg.send()
+            msg = self.compose("client_confirmation", to=interested_client["email"], context={"first_name": interested_client["first_name"]})
+            sent_emails = self.post(msg)
             if sent_emails <= 0:
                 logger.error(f"EMAIL TRANSMISSION FAILURE - {sent_emails}")
                 raise ElectronicMailTransmissionError("Email Not Sents")
@@ -116,7 +178,6 @@ class PostOffice(EmailMultiAlternatives):
             settings.HIGHLIGHT_MONITORING.record_exception(f"ERROR: Unable to Send Email - {e}")
             raise ElectronicMailTransmissionError(f"Exception Raised During EMail Transmission:{e}") from e
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
     def send_external_applicant_rejection_email(self, rejected_applicant: dict) -> int:
         """
         Sends email rerjecting the application for employment of the reciepent
@@ -125,7 +186,7 @@ class PostOffice(EmailMultiAlternatives):
             rejected_applicant (dict): Dictionary representation of the rejected applicant's information including first_name, last_name, email, etc.
 
         Returns:
-            bool: True if email was successfully sent.
+            bool: True once the email is queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
@@ -137,14 +198,8 @@ class PostOffice(EmailMultiAlternatives):
             logger.info(f"Inititating EMAIL Transmission - Rejection Email - Receipent {rejected_applicant['last_name'], rejected_applicant['first_name']}({rejected_applicant['email']})")
 
         try:
-            subject: str = f"Thank You So Much For Considering Nett Hands, {rejected_applicant['first_name']}!"
-            to = rejected_applicant["email"].lower()
-            content_subtype = "text/html"
-            html_content = REJECTION_TEMPLATE_BODY.substitute(first_name=rejected_applicant["first_name"])
-            text_content = PLAIN_TEXT_REJECTION_EMAIL_TEMPLATE.substitute(first_name=rejected_applicant["first_name"])
-            msg = EmailMultiAlternatives(subject=subject, to=[to], from_email=self.from_email, reply_to=self.reply_to, body=text_content)
-            msg.attach_alternative(html_content, content_subtype)
-            sent_emails = msg.send()
+            msg = self.compose("rejection", to=rejected_applicant["email"], context={"first_name": rejected_applicant["first_name"]})
+            sent_emails = self.post(msg)
             if sent_emails <= 0:
                 logger.error(f"EMAIL TRANSMISSION FAILURE - {sent_emails}")
                 raise ElectronicMailTransmissionError("Email Not Sent")
@@ -153,7 +208,6 @@ class PostOffice(EmailMultiAlternatives):
             logger.trace(f"ERROR: Unable to Send Email - {e}")
             raise ElectronicMailTransmissionError(f"Exception Raised During EMail Transmission:{e}") from e
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
     def send_external_applicant_termination_email(self, terminated_employee: dict) -> int:
         """
         Sends email terminating  employment of the recipient
@@ -162,7 +216,7 @@ class PostOffice(EmailMultiAlternatives):
             terminated_employee (dict): Dictionary representation of the terminated employee's information including first_name, last_name, email, etc.
 
         Returns:
-            bool: True if email was successfully sent.
+            bool: True once the email is queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
@@ -174,11 +228,8 @@ class PostOffice(EmailMultiAlternatives):
             logger.info(f"Initiating EMAIL Transmission - Termination Email - Recipient {terminated_employee['last_name'], terminated_employee['first_name']}({terminated_employee['email']})")
 
         try:
-            subject: str = "NOTICE: Termination of Employment from Nett Hands Home Care"
-            to = terminated_employee["email"].lower()
-            text_content = PLAIN_TEXT_TERMINATION_EMAIL_TEMPLATE.substitute(first_name=terminated_employee["first_name"])
-            msg = EmailMessage(subject=subject, to=[to], from_email=self.from_email, reply_to=self.reply_to, body=text_content)
-            sent_emails = msg.send()
+            msg = self.compose("termination", to=terminated_employee["email"], context={"first_name": terminated_employee["first_name"]})
+            sent_emails = self.post(msg)
             if sent_emails <= 0:
                 logger.error(f"EMAIL TRANSMISSION FAILURE - {sent_emails}")
                 raise ElectronicMailTransmissionError("Email Not Sent")
@@ -187,7 +238,22 @@ class PostOffice(EmailMultiAlternatives):
             logger.trace(f"ERROR: Unable to Send Email - {e}")
             raise ElectronicMailTransmissionError(f"Exception Raised During EMail Transmission:{e}") from e
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
+    def compose_external_applicant_new_hire_onboarding_email(self, new_hire: dict) -> EmailMultiAlternatives:
+        """
+        Composes the email informing a new hire of their Login Credentials and the start of their employment
+
+        Args:
+            new_hire (dict): Dictionary representation of the newly hired employee's information including first_name, email, username, plaintext_temp_password, etc.
+
+        Returns:
+            EmailMultiAlternatives: The composed message.
+
+        """
+        if not isinstance(new_hire, dict):
+            new_hire = model_to_dict(new_hire)
+        context = {"first_name": new_hire["first_name"], "username": new_hire["username"], "plaintext_password": new_hire["plaintext_temp_password"]}
+        return self.compose("new_hire_onboarding", to=new_hire["email"], context=context)
+
     def send_external_applicant_new_hire_onboarding_email(self, new_hire: dict) -> int:
         """
         Sends email informing the application of their Login Credentials and the start of their emoployment
@@ -196,26 +262,31 @@ class PostOffice(EmailMultiAlternatives):
             new_hire (dict): Dictionary representation of the newly hired employee's information including first_name, email, username, plaintext_temp_password, etc.
 
         Returns:
-            bool: True if email was successfully sent.
+            bool: True once the email is queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
 
         """
-        if not isinstance(new_hire, dict):
-            new_hire = model_to_dict(new_hire)
+        return self.send_external_applicant_new_hire_onboarding_emails([new_hire])
+
+    def send_external_applicant_new_hire_onboarding_emails(self, new_hires: list[dict]) -> bool:
+        """
+        Sends the onboarding email to every employee of a batch hire; the batch is delivered over one SMTP connection.
+
+        Args:
+            new_hires (list[dict]): The newly hired employees' information, as for `send_external_applicant_new_hire_onboarding_email`.
+
+        Returns:
+            bool: True once the emails are queued for delivery.
+
+        Raises:
+            ElectronicMailTransmissionError: If the emails could not be queued.
+
+        """
         try:
-            subject: str = f"Welcome to Nett Hands, {new_hire['first_name']}!"
-            to = new_hire["email"].lower()
-            content_subtype = "text/html"
-            html_content = NEW_HIRE_ONBOARDING_TEMPLATE_BODY.substitute(first_name=new_hire["first_name"], username=new_hire["username"], plaintext_password=new_hire["plaintext_temp_password"])
-            text_content = PLAIN_TEXT_NEW_HIRE_ONBOARDING_EMAIL_TEMPLATE.substitute(
-                first_name=new_hire["first_name"], username=new_hire["username"], plaintext_password=new_hire["plaintext_temp_password"]
-            )
-            msg = EmailMultiAlternatives(subject=subject, to=[to], from_email=self.from_email, reply_to=[self.reply_to], body=text_content)
-            msg.attach_alternative(html_content, content_subtype)
-            sent_emails = msg.send()
-            if sent_emails <= 0:
+            sent_emails = self.post(*(self.compose_external_applicant_new_hire_onboarding_email(new_hire) for new_hire in new_hires))
+            if sent_emails < len(new_hires):
                 logger.error(f"EMAIL TRANSMISSION FAILURE - {sent_emails}")
                 raise ElectronicMailTransmissionError("Email Not Sent")
             return True
@@ -223,7 +294,6 @@ class PostOffice(EmailMultiAlternatives):
             logger.trace(f"ERROR: Unable to Send Email - {e}")
             raise ElectronicMailTransmissionError(f"Exception Raised During Email Transmission:{e}") from e
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
     def send_internal_new_applicant_notification(self, applicant: dict) -> bool:
         """
         Trigger Intrernal Notification of a New Application
@@ -232,7 +302,7 @@ class PostOffice(EmailMultiAlternatives):
             applicant (dict): Dictionary representation of the applicant's employment application including first_name, last_name, email, contact_number, home_address1, city, state, zipcode, mobility, prior_experience, availability details, resume_cv, etc.
 
         Returns:
-            bool: True if emails successfully sent.
+            bool: True once the emails are queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
@@ -241,35 +311,34 @@ class PostOffice(EmailMultiAlternatives):
         if not isinstance(applicant, dict):
             applicant = model_to_dict(applicant)
         try:
-            subject: str = f"NOTICE: New Application For Employment - {applicant['last_name']}, {applicant['first_name']}!"
-            body = INTERNAL_APPLICATION_NOTIFICATION.substitute(
-                first_name=applicant["first_name"],
-                last_name=applicant["last_name"],
-                email=applicant["email"],
-                contact_number=applicant["contact_number"],
-                home_address=applicant["home_address1"],
-                city=applicant["city"],
-                state=applicant["state"],
-                zipcode=applicant["zipcode"],
-                mobility=applicant["mobility"],
-                prior_experience=applicant["prior_experience"],
-                availability_monday=applicant["availability_monday"],
-                availability_tuesday=applicant["availability_tuesday"],
-                availability_wednesday=applicant["availability_wednesday"],
-                availability_thursday=applicant["availability_thursday"],
-                availability_friday=applicant["availability_friday"],
-                availability_saturday=applicant["availability_saturday"],
-                availability_sunday=applicant["availability_sunday"],
-                url_slug=EmploymentApplicationModel.objects.filter(email=applicant["email"], zipcode=applicant["zipcode"]).order_by("-date_submitted")[0].__dict__["id"],
-                resume_url=applicant["resume_cv"],
-            )
-            mail_managers(subject=subject, fail_silently=False, message=body)
+            context = {
+                "first_name": applicant["first_name"],
+                "last_name": applicant["last_name"],
+                "email": applicant["email"],
+                "contact_number": applicant["contact_number"],
+                "home_address": applicant["home_address1"],
+                "city": applicant["city"],
+                "state": applicant["state"],
+                "zipcode": applicant["zipcode"],
+                "mobility": applicant["mobility"],
+                "prior_experience": applicant["prior_experience"],
+                "availability_monday": applicant["availability_monday"],
+                "availability_tuesday": applicant["availability_tuesday"],
+                "availability_wednesday": applicant["availability_wednesday"],
+                "availability_thursday": applicant["availability_thursday"],
+                "availability_friday": applicant["availability_friday"],
+                "availability_saturday": applicant["availability_saturday"],
+                "availability_sunday": applicant["availability_sunday"],
+                "url_slug": EmploymentApplicationModel.objects.filter_blind(email=applicant["email"]).filter(zipcode=applicant["zipcode"]).order_by("-date_submitted").values_list("id", flat=True)[0],
+                "resume_url": applicant["resume_cv"],
+            }
+            email = render_email("internal_application_notification", context)
+            self.post(self.compose_managers_notification(email.subject, email.text))
             return True
         except Exception as e:
             logger.trace(f"ERROR: Unable to Send Email - {e}")
             raise ElectronicMailTransmissionError(f"Exception Raised During EMail Transmission:{e}") from e
 
-    @retry(stop=MAX_ATTEMPTS, wait=WAIT_STRATEGY, reraise=True)
     def send_internal_new_client_service_request_notification(self, interested_client: dict) -> int:
         """
         Trigger Intrernal Notification of a New Application
@@ -278,7 +347,7 @@ class PostOffice(EmailMultiAlternatives):
             interested_client (dict): Dictionary representation of the client service request including first_name, last_name, email, desired_service, contact_number, zipcode, insurance_carrier, etc.
 
         Returns:
-            bool: True if emails successfully sent.
+            bool: True once the emails are queued for delivery.
 
         Raises:
             ElectronicMailTransmissionError: If the email transmission fails.
@@ -287,20 +356,22 @@ class PostOffice(EmailMultiAlternatives):
         if not isinstance(interested_client, dict):
             interested_client = model_to_dict(interested_client)
         try:
-            subject: str = f"NOTICE: New Client Service Request - {interested_client['last_name']}, {interested_client['first_name']}!"
-            body = INTERNAL_CLIENT_SERVICE_REQUEST_NOTIFICATION.substitute(
-                first_name=interested_client["first_name"],
-                last_name=interested_client["last_name"],
-                email=interested_client["email"],
-                desired_service=interested_client["desired_service"],
-                contact_number=interested_client["contact_number"],
-                zipcode=interested_client["zipcode"],
-                insurance_carrier=interested_client["insurance_carrier"],
-                url_slug=ClientInterestSubmission.objects.filter(email=interested_client["email"], insurance_carrier=interested_client["insurance_carrier"], zipcode=interested_client["zipcode"])
-                .order_by("-date_submitted")[0]
-                .__dict__["id"],
-            )
-            mail_managers(subject=subject, fail_silently=False, message=body)
+            context = {
+                "first_name": interested_client["first_name"],
+                "last_name": interested_client["last_name"],
+                "email": interested_client["email"],
+                "desired_service": interested_client["desired_service"],
+                "contact_number": interested_client["contact_number"],
+                "zipcode": interested_client["zipcode"],
+                "insurance_carrier": interested_client["insurance_carrier"],
+                # NOTE: insurance_carrier is encrypted without a blind index, so filtering on it would decrypt every row.
+                "url_slug": ClientInterestSubmission.objects.filter_blind(email=interested_client["email"])
+                .filter(zipcode=interested_client["zipcode"])
+                .order_by("-date_submitted")
+                .values_list("id", flat=True)[0],
+            }
+            email = render_email("internal_client_service_request_notification", context)
+            self.post(self.compose_managers_notification(email.subject, email.text))
             return True
         except Exception as e:
             logger.trace(f"ERROR: Unable to Send Email - {e}")
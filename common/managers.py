@@ -1,52 +1,224 @@
+import datetime
+import decimal
+import hashlib
 import json
+import uuid
+from collections.abc import Iterator, Sequence
+from typing import Any
 
+import msgpack
 from django.conf import settings
 from django.core.cache import cache
-from django.core.serializers import deserialize, serialize
-from django.db.models import QuerySet
+from django.db.models import Model, QuerySet
 from loguru import logger
 
+from common.local_cache import MISSING, get_local_cache
+from common.metrics import metrics
+
+# msgpack extension type codes for the non-native values found in model rows.
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_TIME = 3
+_EXT_DECIMAL = 4
+_EXT_UUID = 5
+_EXT_TIMEDELTA = 6
+
+
+def _encode_value(value: Any) -> msgpack.ExtType:
+    if isinstance(value, datetime.datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode("utf-8"))
+    if isinstance(value, datetime.date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode("utf-8"))
+    if isinstance(value, datetime.time):
+        return msgpack.ExtType(_EXT_TIME, value.isoformat().encode("utf-8"))
+    if isinstance(value, decimal.Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode("utf-8"))
+    if isinstance(value, uuid.UUID):
+        return msgpack.ExtType(_EXT_UUID, value.bytes)
+    if isinstance(value, datetime.timedelta):
+        return msgpack.ExtType(_EXT_TIMEDELTA, str(value.total_seconds()).encode("utf-8"))
+    raise TypeError(f"Cannot serialize {type(value).__name__} for the queryset cache")
+
+
+def _decode_value(code: int, data: bytes) -> Any:
+    if code == _EXT_DATETIME:
+        return datetime.datetime.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_DATE:
+        return datetime.date.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_TIME:
+        return datetime.time.fromisoformat(data.decode("utf-8"))
+    if code == _EXT_DECIMAL:
+        return decimal.Decimal(data.decode("utf-8"))
+    if code == _EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == _EXT_TIMEDELTA:
+        return datetime.timedelta(seconds=float(data.decode("utf-8")))
+    return msgpack.ExtType(code, data)
+
+
+def pack_rows(field_names: list[str], rows: list[tuple]) -> bytes:
+    """
+    Encode queryset rows as a compact msgpack payload.
+
+    Args:
+        field_names (list[str]): The attribute names of the columns in each row.
+        rows (list[tuple]): The row tuples returned by `values_list`.
+
+    Returns:
+        bytes: The encoded payload.
+
+    """
+    return msgpack.packb([field_names, rows], default=_encode_value, use_bin_type=True)
+
+
+def unpack_rows(payload: bytes) -> tuple[list[str], list[list]]:
+    """
+    Decode a payload produced by `pack_rows`.
+
+    Args:
+        payload (bytes): The encoded payload.
+
+    Returns:
+        tuple: The column attribute names and the decoded rows.
+
+    """
+    field_names, rows = msgpack.unpackb(payload, ext_hook=_decode_value, raw=False)
+    return field_names, rows
+
+
+class CachedRows(Sequence):
+    """
+    Read-only sequence of cached rows that builds model instances only when they are accessed.
+
+    Instances are created with `Model.from_db`, exactly as the ORM does, and memoized per index.
+
+    Attributes:
+        model: The model class the rows belong to.
+        field_names (list[str]): The attribute names of the columns in each row.
+
+    """
+
+    def __init__(self, model: type[Model], field_names: list[str], rows: list, using: str = "default"):
+        self.model = model
+        self.field_names = field_names
+        self._rows = rows
+        self._using = using
+        self._instances: list[Model | None] = [None] * len(rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._instances[index] is None:
+            self._instances[index] = self.model.from_db(self._using, self.field_names, tuple(self._rows[index]))
+        return self._instances[index]
+
+    def __iter__(self) -> Iterator[Model]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self) -> str:
+        return f"<CachedRows {self.model.__name__}: {len(self)} rows>"
+
+    def values(self) -> list[dict]:
+        """
+        Return the cached rows as dictionaries without building model instances.
+
+        Returns:
+            list[dict]: One dictionary per row keyed by field attribute name.
+
+        """
+        return [dict(zip(self.field_names, row, strict=True)) for row in self._rows]
+
 
 class CachedQuerySet(QuerySet):
-    def queryset_from_cache(self, filterdict=None):
+    def get_queryset_cache_key(self, filterdict: dict) -> str:
+        """
+        Build the cache key for a filtered queryset.
+
+        The key includes the model's current cache generation (bumped by `common.cache.invalidate_cache` on every save or delete)
+        and a stable hash of the filter, so differently filtered querysets never collide and saved rows are never served stale.
+
+        Args:
+            filterdict (dict): The keyword arguments passed to `filter()`.
+
+        Returns:
+            str: The cache key for the queryset.
+
+        """
+        # NOTE: Imported lazily because common.cache imports this module.
+        from common.cache import get_model_generation
+
+        model_name = self.model.__name__
+        filter_hash = hashlib.md5(json.dumps(filterdict, sort_keys=True, default=str).encode("utf-8"), usedforsecurity=False).hexdigest()
+        return f"queryset:{model_name.lower()}:g{get_model_generation(model_name)}:{filter_hash}"
+
+    def queryset_from_cache(self, filterdict=None) -> CachedRows:
+        """
+        Return the rows matching `filterdict`, served from the cache when possible.
+
+        Rows are cached as msgpack-encoded `values_list` tuples and handed back as a `CachedRows` sequence,
+        which only builds model instances for the rows that are actually accessed. Result sets larger than
+        `QUERYSET_CACHE_MAX_ROWS` rows or `QUERYSET_CACHE_MAX_BYTES` bytes are returned without being cached.
+
+        Args:
+            filterdict (dict, optional): The keyword arguments passed to `filter()`.
+
+        Returns:
+            CachedRows: The matching rows.
+
+        """
         if filterdict is None:
             filterdict = {}
-        # Generate a cache key based on the model name
-        cachekey = str(self.model.__name__).lower()
-
-        # Attempt to retrieve the queryset from the cache
-        queryset = cache.get(cachekey)
-        self.model.objects.all()
-
-        if queryset:
-            logger.debug(f"Cache Hit On Queryset for {cachekey}")
-            logger.debug(type(queryset))
-            cache_hit_queryset = queryset
-            # If the queryset is found in the cache, return it with a flag indicating it was cached
-            # data = {
-            #     'in_cache': True,
-            #     'queryset': queryset
-            #     }
-            # query = self.data['ps']]
-            # Use Django's serialization instead of pickle for security
+        model_name = self.model.__name__
+        field_names = [field.attname for field in self.model._meta.concrete_fields]
+        cachekey = self.get_queryset_cache_key(filterdict)
+
+        # Attempt to retrieve the payload from the local tier first, then from the shared cache.
+        # NOTE: The local tier holds the encoded payload rather than model instances, so callers never share mutable objects.
+        local_cache = get_local_cache()
+        payload = local_cache.get(cachekey) if local_cache is not None else MISSING
+        if payload is not MISSING:
+            metrics.increment_cache_tier(model=model_name, tier="local")
+        else:
+            payload = cache.get(cachekey)
+            if payload is not None:
+                metrics.increment_cache_tier(model=model_name, tier="redis")
+                if local_cache is not None:
+                    local_cache.set(cachekey, payload, tags=[model_name])
+
+        if payload:
             try:
-                deserialized_data = json.loads(cache_hit_queryset)
-                return [obj.object for obj in deserialize("json", deserialized_data)]
-            except (json.JSONDecodeError, ValueError):
-                logger.warning(f"Failed to deserialize cached queryset for {cachekey}")
-                # Fall through to fresh query
+                cached_field_names, rows = unpack_rows(payload)
+            except (ValueError, TypeError, msgpack.UnpackException):
+                logger.warning(f"Failed to decode cached queryset for {cachekey}")
+            else:
+                # NOTE: A payload written before a schema change is ignored rather than mapped onto the wrong columns.
+                if cached_field_names == field_names:
+                    logger.debug(f"Cache Hit On Queryset for {cachekey}")
+                    metrics.increment_cache(model=model_name, type="hit")
+                    return CachedRows(self.model, field_names, rows, using=self.db)
 
-        # Cache miss or deserialization failed - generate fresh query
+        # Cache miss or decoding failed - generate fresh query
         logger.debug(f"Cache Miss On Queryset for {cachekey}, Setting In Cache")
-        logger.debug(type(queryset))
-        # If the queryset is not found in the cache, generate it from the database and store it in the cache
-        fresh_query = self.model.objects.filter(**filterdict)
-        # Use Django's serialization instead of pickle for security
+        metrics.increment_cache(model=model_name, type="miss")
+        rows = list(self.model.objects.filter(**filterdict).values_list(*field_names))
+        if len(rows) > settings.QUERYSET_CACHE_MAX_ROWS:
+            logger.warning(f"Queryset for {cachekey} has {len(rows)} rows - exceeds QUERYSET_CACHE_MAX_ROWS, not caching")
+            return CachedRows(self.model, field_names, rows, using=self.db)
         try:
-            serialized_data = serialize("json", fresh_query)
-            cache.set(cachekey, json.dumps(serialized_data), settings.QUERYSET_TTL)
-        except Exception as e:
+            payload = pack_rows(field_names, rows)
+        except (TypeError, ValueError) as e:
             logger.warning(f"Failed to serialize queryset for caching: {e}")
-        return fresh_query
+            return CachedRows(self.model, field_names, rows, using=self.db)
+        if len(payload) > settings.QUERYSET_CACHE_MAX_BYTES:
+            logger.warning(f"Queryset for {cachekey} encodes to {len(payload)} bytes - exceeds QUERYSET_CACHE_MAX_BYTES, not caching")
+        else:
+            cache.set(cachekey, payload, settings.QUERYSET_TTL)
+            if local_cache is not None:
+                local_cache.set(cachekey, payload, tags=[model_name])
+        return CachedRows(self.model, field_names, rows, using=self.db)
 
     queryset_from_cache.queryset_only = False
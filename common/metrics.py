@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 
 class NHHCMetrics:
@@ -29,6 +29,24 @@ class NHHCMetrics:
             ["model"],
         )
         self.cached_queryset_evicted = Counter("cached_queryset_evicted", "Number of cached Querysets evicted", ["model"])
+        self.cached_queryset_stale = Counter("cached_queryset_stale", "Number of requests served a stale cached response while it was being recomputed", ["model"])
+        self.cached_queryset_recompute = Counter("cached_queryset_recompute", "Number of cached responses recomputed by the worker holding the recompute lock", ["model"])
+        self.cache_tier_hit = Counter("cache_tier_hit", "Number of cache reads served by each cache tier ('local' in-process LRU or shared 'redis')", ["model", "tier"])
+        self.local_cache_entries = Gauge("local_cache_entries", "Number of entries held in this process's local cache tier")
+        self.local_cache_bytes = Gauge("local_cache_bytes", "Approximate size in bytes of the entries held in this process's local cache tier")
+        self.request_query_count = Histogram("request_query_count", "Number of SQL queries executed while serving a request", ["view"], buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, float("inf")))
+        self.request_query_duration = Histogram("request_query_duration", "Total time in seconds spent executing SQL queries while serving a request", ["view"])
+        self.n_plus_one_detected = Counter("n_plus_one_detected", "Number of requests in which one query fingerprint repeated often enough to suggest an N+1 pattern", ["view"])
+        self.query_budget_exceeded = Counter("query_budget_exceeded", "Number of requests that ran more SQL queries than their view's declared query budget", ["view"])
+        self.slow_queries_dropped = Counter("slow_queries_dropped", "Number of sampled slow queries dropped because the slow query log queue was full")
+        self.emails_delivered = Counter("emails_delivered", "Number of queued emails by delivery outcome ('sent', 'retried' or 'refused')", ["outcome"])
+        self.bulk_email_batch_duration = Histogram("bulk_email_batch_duration", "Time in seconds taken to deliver one batch of a bulk email send", ["template"])
+        self.s3_upload_bytes = Counter("s3_upload_bytes", "Number of bytes transferred to S3 by file uploads, counted as each chunk is sent")
+        self.s3_upload_throughput = Histogram(
+            "s3_upload_throughput",
+            "Throughput in bytes per second of each file upload to S3",
+            buckets=(256 * 1024, 1024**2, 4 * 1024**2, 16 * 1024**2, 64 * 1024**2, 256 * 1024**2, float("inf")),
+        )
         self.s3_upload_recorder = Histogram("s3_upload_duration", "Metric of the Duration of S3 upload of Compliance Documents from the application's /tmp to AWS S3 block storage.")
         self.docuseal_download_recorder = Histogram(
             "docuseal_download_duration", "Metric of the Duration of downloading singed  Compliance Documents from the DocSeal External Signing Service to /tmp storage."
@@ -55,11 +73,11 @@ class NHHCMetrics:
         Tracks cache performance metrics for different database models.
 
         This method increments the appropriate counter based on the cache interaction type,
-        providing insights into cache hit, miss, and eviction rates for specific models.
+        providing insights into cache hit, miss, stale-serve, recompute and eviction rates for specific models.
 
         Args:
             model: The name of the database model being cached.
-            type: The type of cache interaction ('hit', 'miss', or 'eviction').
+            type: The type of cache interaction ('hit', 'miss', 'stale', 'recompute' or 'eviction').
 
         Returns:
             None
@@ -69,9 +87,156 @@ class NHHCMetrics:
             self.cached_queryset_hit.labels(model=model).inc()
         elif type == "miss":
             self.cached_queryset_miss.labels(model=model).inc()
+        elif type == "stale":
+            self.cached_queryset_stale.labels(model=model).inc()
+        elif type == "recompute":
+            self.cached_queryset_recompute.labels(model=model).inc()
         elif type == "eviction":
             self.cached_queryset_evicted.labels(model=model).inc()
 
+    def increment_cache_tier(self, model: str, tier: str) -> None:
+        """
+        Tracks which cache tier served a cache hit.
+
+        Args:
+            model: The name of the database model being cached.
+            tier: The tier that served the read ('local' or 'redis').
+
+        Returns:
+            None
+
+        """
+        self.cache_tier_hit.labels(model=model, tier=tier).inc()
+
+    def set_local_cache_size(self, entries: int, size: int) -> None:
+        """
+        Records the current occupancy of the process's local cache tier.
+
+        Args:
+            entries: The number of entries held.
+            size: The approximate size of the held entries in bytes.
+
+        Returns:
+            None
+
+        """
+        self.local_cache_entries.set(entries)
+        self.local_cache_bytes.set(size)
+
+    def observe_request_queries(self, view: str, count: int, duration: float) -> None:
+        """
+        Records the number of SQL queries a request executed and the time spent executing them.
+
+        Args:
+            view: The name of the view that served the request.
+            count: The number of queries executed.
+            duration: The total query execution time in seconds.
+
+        Returns:
+            None
+
+        """
+        self.request_query_count.labels(view=view).observe(count)
+        self.request_query_duration.labels(view=view).observe(duration)
+
+    def increment_slow_query_dropped(self) -> None:
+        """
+        Tracks slow queries that could not be queued for logging.
+
+        Returns:
+            None
+
+        """
+        self.slow_queries_dropped.inc()
+
+    def increment_n_plus_one(self, view: str) -> None:
+        """
+        Tracks requests that repeated a query often enough to suggest an N+1 pattern.
+
+        Args:
+            view: The name of the view that served the request.
+
+        Returns:
+            None
+
+        """
+        self.n_plus_one_detected.labels(view=view).inc()
+
+    def increment_query_budget_exceeded(self, view: str) -> None:
+        """
+        Tracks requests that ran more queries than their view's declared budget.
+
+        Args:
+            view: The name of the view that served the request.
+
+        Returns:
+            None
+
+        """
+        self.query_budget_exceeded.labels(view=view).inc()
+
+    def increment_emails(self, outcome: str, count: int = 1) -> None:
+        """
+        Tracks the delivery outcome of queued emails.
+
+        Args:
+            outcome: The outcome ('sent', 'retried' or 'refused').
+            count: The number of emails with that outcome.
+
+        Returns:
+            None
+
+        """
+        if count:
+            self.emails_delivered.labels(outcome=outcome).inc(count)
+
+    def observe_bulk_email_batch(self, template: str, sent: int, refused: int, duration: float) -> None:
+        """
+        Records the delivery of one batch of a bulk email send.
+
+        Args:
+            template: The name of the email template being sent.
+            sent: The number of messages accepted by the SMTP server.
+            refused: The number of messages whose recipients were refused by the SMTP server.
+            duration: The time in seconds taken to deliver the batch.
+
+        Returns:
+            None
+
+        """
+        self.bulk_email_batch_duration.labels(template=template).observe(duration)
+        self.increment_emails(outcome="sent", count=sent)
+        self.increment_emails(outcome="refused", count=refused)
+
+    def increment_s3_upload_bytes(self, bytes_amount: int) -> None:
+        """
+        Counts bytes sent to S3. Used as the progress callback of managed transfers, which call it once per chunk from
+        the transfer's worker threads.
+
+        Args:
+            bytes_amount: The number of bytes sent since the last call.
+
+        Returns:
+            None
+
+        """
+        self.s3_upload_bytes.inc(bytes_amount)
+
+    def observe_s3_upload(self, size: int, duration: float) -> None:
+        """
+        Records the throughput of one completed file upload to S3.
+
+        Args:
+            size: The size of the uploaded file in bytes.
+            duration: The time in seconds taken to upload it.
+
+        Returns:
+            None
+
+        """
+        if duration > 0:
+            self.s3_upload_throughput.observe(size / duration)
+
 
 # Create a singleton instance for global use
 metrics = NHHCMetrics()
@@ -1,14 +1,50 @@
 import re
 
-from authentication.models import UserProfile
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponseRedirect
 from django.shortcuts import reverse
 from django.utils.deprecation import MiddlewareMixin
 
+from applications.authentication.models import UserProfile
+
+EXEMPT_PATHS = re.compile(r"^/(__debug__/|password/change/?)")
+
+
+def get_force_password_change_cache_key(user_id: int) -> str:
+    return f"force-password-change:{user_id}"
+
+
+def get_force_password_change(user_id: int) -> bool:
+    """
+    Return whether a user must change their password, reading the flag from the cache before the database.
+
+    Args:
+        user_id (int): The primary key of the user.
+
+    Returns:
+        bool: The user's `UserProfile.force_password_change` flag; False if the user has no profile.
+
+    """
+    cache_key = get_force_password_change_cache_key(user_id)
+    if (force_password_change := cache.get(cache_key)) is None:
+        force_password_change = bool(UserProfile.objects.filter(user_id=user_id).values_list("force_password_change", flat=True).first())
+        cache.set(cache_key, force_password_change, timeout=settings.FORCE_PASSWORD_CHANGE_CACHE_TTL)
+    return force_password_change
+
+
+def clear_force_password_change(user_id: int) -> None:
+    """
+    Drop a user's cached `force_password_change` flag so the next request reads it from the database.
+
+    Args:
+        user_id (int): The primary key of the user.
+
+    """
+    cache.delete(get_force_password_change_cache_key(user_id))
+
 
 class PasswordChangeMiddleware(MiddlewareMixin):
     def process_request(self, request):
-        if request.user.is_authenticated and not re.match(r"/__debug__/", request.path) and not re.match(r"^/password/change/?", request.path):
-            profile = UserProfile.objects.get(user=request.user)
-            if profile.force_password_change:
-                return HttpResponseRedirect(reverse("account_change_password"), {"first_time": True})
+        if request.user.is_authenticated and not EXEMPT_PATHS.match(request.path) and get_force_password_change(request.user.pk):
+            return HttpResponseRedirect(reverse("account_change_password"), {"first_time": True})
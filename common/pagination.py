@@ -0,0 +1,150 @@
+"""
+Module: common.pagination
+
+This module provides keyset (cursor) pagination for template views and DRF API views.
+
+Rather than counting the table and skipping `OFFSET` rows, each page is selected with a `WHERE (a, b) > (x, y)`
+predicate on the ordering columns, so every page costs the same index range scan no matter how deep into the list it is.
+The ordering must be ascending, non-null and end in a unique column (usually the primary key).
+
+Classes:
+- KeysetPaginator: Selects one page of a queryset and builds the opaque cursor for the next page.
+- KeysetPagination: DRF pagination class built on KeysetPaginator.
+
+"""
+
+import base64
+import json
+from typing import Any
+
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by the values of its ordering columns.
+
+    Attributes:
+        ordering (tuple[str, ...]): The ascending ordering columns; the last one must be unique.
+        page_size (int): The number of rows per page.
+
+    """
+
+    def __init__(self, ordering: tuple[str, ...], page_size: int):
+        self.ordering = ordering
+        self.page_size = page_size
+
+    @staticmethod
+    def encode_cursor(values: list[Any]) -> str:
+        return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, cursor: str) -> list[Any]:
+        """
+        Decode a cursor produced by `encode_cursor`.
+
+        Args:
+            cursor (str): The opaque cursor from the request.
+
+        Returns:
+            list: The ordering column values of the last row on the previous page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (UnicodeEncodeError, json.JSONDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValueError(f"Invalid cursor: {cursor}")
+        return values
+
+    def get_after_filter(self, values: list[Any]) -> Q:
+        """
+        Build the predicate selecting the rows that sort after the provided ordering values.
+
+        The leading `>=` on the first column lets PostgreSQL use the composite index as a range scan.
+
+        Args:
+            values (list): The ordering column values of the last row on the previous page.
+
+        Returns:
+            Q: The filter expression.
+
+        """
+        after = Q()
+        for index, field in enumerate(self.ordering):
+            equal_prefix = {previous_field: values[position] for position, previous_field in enumerate(self.ordering[:index])}
+            after |= Q(**equal_prefix, **{f"{field}__gt": values[index]})
+        return Q(**{f"{self.ordering[0]}__gte": values[0]}) & after
+
+    def paginate(self, queryset: QuerySet, cursor: str | None = None) -> tuple[list, str | None]:
+        """
+        Select one page of the queryset.
+
+        Args:
+            queryset (QuerySet): The rows to paginate.
+            cursor (str, optional): The cursor returned with the previous page; the first page is returned when omitted.
+
+        Returns:
+            tuple: The rows on the page and the cursor for the next page, or None if this is the last page.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+
+        """
+        queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.get_after_filter(self.decode_cursor(cursor)))
+        # NOTE: Fetching one extra row tells us whether a next page exists without a COUNT(*).
+        rows = list(queryset[: self.page_size + 1])
+        if len(rows) <= self.page_size:
+            return rows, None
+        rows = rows[: self.page_size]
+        last_row = rows[-1]
+        values = [last_row[field] if isinstance(last_row, dict) else getattr(last_row, field) for field in self.ordering]
+        return rows, self.encode_cursor(values)
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination class that pages by the view's `keyset_ordering` columns.
+
+    Responses are shaped as `{"next": <url or null>, "results": [...]}`.
+    """
+
+    page_size: int = 25
+    ordering: tuple[str, ...] = ("pk",)
+    cursor_query_param: str = "cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(ordering=getattr(view, "keyset_ordering", self.ordering), page_size=self.page_size)
+        try:
+            page, self.next_cursor = paginator.paginate(queryset, request.query_params.get(self.cursor_query_param))
+        except ValueError as e:
+            raise NotFound("Invalid cursor") from e
+        return page
+
+    def get_next_link(self) -> str | None:
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
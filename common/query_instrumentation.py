@@ -0,0 +1,373 @@
+"""
+Module: common.query_instrumentation
+
+This module provides low-overhead SQL query instrumentation for web requests.
+
+`QueryInstrumentationMiddleware` installs an execute wrapper on every database connection for the duration of a request.
+The wrapper only times each query and adds it to the request's totals; the per-view query count and database time are
+exported as Prometheus histograms once the response is built. Queries slower than `QUERY_SLOW_THRESHOLD_MS` are sampled
+onto a bounded queue and fingerprinted and logged by a background thread, so logging never blocks a request. When
+`QUERY_INSTRUMENTATION_ENABLED` is off the middleware removes itself at startup and adds no per-query cost.
+
+Queries are also grouped by fingerprint, so a statement repeated `QUERY_N_PLUS_ONE_THRESHOLD` or more times in one request
+is flagged as a likely N+1. Views may declare a `query_budget` (class attribute or `@query_budget(...)`); exceeding it is
+counted and logged in production, and raises `QueryBudgetExceeded` when `QUERY_BUDGET_RAISE` is on (as it is under test).
+
+Classes:
+- RequestQueryStats: Query count, database time and per-fingerprint counts accumulated while serving one request.
+- QueryBudgetExceeded: Raised when a view runs more queries than its declared budget and `QUERY_BUDGET_RAISE` is on.
+- SlowQuery: A sampled slow query waiting to be logged.
+- SlowQueryLogger: A daemon thread that drains the slow query queue to the DATABASE_QUERY log.
+- QueryInstrumentationMiddleware: Times every query run while serving a request and checks it against the view's budget.
+- QueryBudgetTestMixin: TestCase assertions for query budgets and N+1 patterns.
+
+Functions:
+- fingerprint_sql: Normalizes a SQL statement so queries that differ only in their literals share a fingerprint.
+- get_request_query_stats: Returns the statistics of the request being served, if it is instrumented.
+- instrument_query: The execute wrapper installed on each connection.
+- capture_queries: Context manager that records the queries run inside it.
+- query_budget: Decorator declaring the maximum number of queries a view may run.
+
+Settings:
+- QUERY_INSTRUMENTATION_ENABLED (bool): Turns the instrumentation on.
+- QUERY_SLOW_THRESHOLD_MS (float): Queries at least this slow are sampled for logging.
+- QUERY_SLOW_SAMPLE_RATE (float): The fraction of slow queries that are logged.
+- QUERY_SLOW_QUEUE_SIZE (int): The number of slow queries that may wait to be logged before new ones are dropped.
+- QUERY_N_PLUS_ONE_THRESHOLD (int): How many times one fingerprint may run in a request before it is flagged.
+- QUERY_BUDGET_RAISE (bool): Raise `QueryBudgetExceeded` instead of only counting budget overruns.
+
+"""
+
+import hashlib
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache, partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from loguru import logger
+
+from common.metrics import metrics
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMERIC_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+_request_query_stats: ContextVar["RequestQueryStats | None"] = ContextVar("request_query_stats", default=None)
+_request_view: ContextVar[str] = ContextVar("request_view", default="unknown")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_sql(sql: str) -> tuple[str, str]:
+    """
+    Normalize a SQL statement and hash it.
+
+    String and numeric literals become `?`, placeholder lists such as `IN (%s, %s, %s)` collapse to `(?+)`, and whitespace
+    is squeezed, so the same query run with different values or batch sizes produces the same fingerprint.
+
+    Args:
+        sql (str): The SQL statement as passed to the cursor.
+
+    Returns:
+        tuple[str, str]: The short fingerprint and the normalized statement.
+
+    """
+    normalized = STRING_LITERAL.sub("?", sql)
+    normalized = NUMERIC_LITERAL.sub("?", normalized)
+    normalized = PLACEHOLDER_LIST.sub("(?+)", normalized)
+    normalized = WHITESPACE.sub(" ", normalized.replace("%s", "?")).strip()
+    return hashlib.md5(normalized.encode("utf-8"), usedforsecurity=False).hexdigest()[:12], normalized
+
+
+class RequestQueryStats:
+    """
+    Query count, database time and per-fingerprint counts accumulated while serving one request.
+
+    Attributes:
+        count (int): The number of queries executed.
+        duration (float): The total time spent executing queries, in seconds.
+        fingerprints (Counter[str]): The number of times each query fingerprint was executed.
+        statements (dict[str, str]): The first SQL statement seen for each fingerprint.
+
+    """
+
+    __slots__ = ("count", "duration", "fingerprints", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints: Counter[str] = Counter()
+        self.statements: dict[str, str] = {}
+
+    def repeated_queries(self, threshold: int) -> list[tuple[str, int, str]]:
+        """
+        List the fingerprints executed at least `threshold` times, most repeated first.
+
+        Args:
+            threshold (int): The minimum number of executions to report.
+
+        Returns:
+            list[tuple[str, int, str]]: The fingerprint, execution count and normalized statement of each repeated query.
+
+        """
+        return [(fingerprint, count, fingerprint_sql(self.statements[fingerprint])[1]) for fingerprint, count in self.fingerprints.most_common() if count >= threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a view runs more queries than its declared `query_budget` and `QUERY_BUDGET_RAISE` is on.
+    """
+
+
+def get_request_query_stats() -> RequestQueryStats | None:
+    """
+    Return the query statistics of the request currently being served.
+
+    Returns:
+        RequestQueryStats or None: The statistics, or None outside of an instrumented request.
+
+    """
+    return _request_query_stats.get()
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    sql: str
+    duration: float
+    view: str
+
+
+class SlowQueryLogger(threading.Thread):
+    """
+    Daemon thread that fingerprints sampled slow queries and writes them to the DATABASE_QUERY log.
+    """
+
+    def __init__(self, slow_queries: queue.Queue):
+        super().__init__(name="slow-query-logger", daemon=True)
+        self.slow_queries = slow_queries
+
+    def run(self) -> None:
+        while True:
+            slow_query = self.slow_queries.get()
+            try:
+                fingerprint, normalized = fingerprint_sql(slow_query.sql)
+                logger.log("DATABASE_QUERY", f"Slow Query {fingerprint} ({slow_query.duration * 1000:.1f}ms) in {slow_query.view}: {normalized}")
+            except Exception as e:
+                logger.error(f"Unable to Log Slow Query: {e}")
+
+
+_slow_queries: queue.Queue | None = None
+_slow_queries_pid: int | None = None
+_slow_queries_lock = threading.Lock()
+
+
+def get_slow_query_queue() -> queue.Queue:
+    """
+    Return the process-wide slow query queue, starting its logger thread on first use.
+
+    The queue and thread are recreated after a fork, since threads do not survive into the child process.
+
+    Returns:
+        queue.Queue: The bounded queue of slow queries waiting to be logged.
+
+    """
+    global _slow_queries, _slow_queries_pid
+    if _slow_queries is not None and _slow_queries_pid == os.getpid():
+        return _slow_queries
+    with _slow_queries_lock:
+        if _slow_queries is None or _slow_queries_pid != os.getpid():
+            _slow_queries = queue.Queue(maxsize=settings.QUERY_SLOW_QUEUE_SIZE)
+            _slow_queries_pid = os.getpid()
+            SlowQueryLogger(_slow_queries).start()
+    return _slow_queries
+
+
+def instrument_query(stats: RequestQueryStats, execute, sql, params, many, context):
+    """
+    Execute wrapper that times a query, adds it to the provided statistics and samples it if it is slow.
+
+    Installed on a connection with the statistics bound through `functools.partial` (see `capture_queries`).
+
+    Args:
+        stats (RequestQueryStats): The statistics to add the query to.
+        execute (Callable): The next wrapper, or the cursor's execute method.
+        sql (str): The SQL statement.
+        params: The statement's parameters.
+        many (bool): Whether this is an `executemany` call.
+        context (dict): The connection and cursor executing the statement.
+
+    Returns:
+        Any: The result of the execution.
+
+    """
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started_at
+        fingerprint = fingerprint_sql(sql)[0]
+        stats.count += 1
+        stats.duration += duration
+        stats.fingerprints[fingerprint] += 1
+        stats.statements.setdefault(fingerprint, sql)
+        if duration * 1000 >= settings.QUERY_SLOW_THRESHOLD_MS and random.random() < settings.QUERY_SLOW_SAMPLE_RATE:  # noqa: S311
+            try:
+                get_slow_query_queue().put_nowait(SlowQuery(sql=sql, duration=duration, view=_request_view.get()))
+            except queue.Full:
+                metrics.increment_slow_query_dropped()
+
+
+@contextmanager
+def capture_queries() -> Iterator[RequestQueryStats]:
+    """
+    Record every query run on any connection in the current thread while the block executes.
+
+    Yields:
+        RequestQueryStats: The statistics, filled in as queries run.
+
+    """
+    stats = RequestQueryStats()
+    token = _request_query_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(partial(instrument_query, stats)))
+            yield stats
+    finally:
+        _request_query_stats.reset(token)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declare the maximum number of queries a view may run.
+
+    Apply it to a function view (beneath any wrapping decorators) or a class-based view; class-based views may set the
+    `query_budget` class attribute instead.
+
+    Args:
+        max_queries (int): The budget.
+
+    Returns:
+        Callable: The decorator.
+
+    """
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def get_view_query_budget(view_func: Callable) -> int | None:
+    """
+    Look up the query budget declared on a view function or on the class behind an `as_view()` function.
+
+    Args:
+        view_func (Callable): The resolved view.
+
+    Returns:
+        int or None: The budget, or None if the view does not declare one.
+
+    """
+    if (budget := getattr(view_func, "query_budget", None)) is not None:
+        return budget
+    return getattr(getattr(view_func, "view_class", None), "query_budget", None)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Times every query run while serving a request, records the per-view totals and checks them against the view's budget.
+
+    Raises `MiddlewareNotUsed` when `QUERY_INSTRUMENTATION_ENABLED` is off, so Django drops it from the chain entirely.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_budget = None
+        request.queries_before_view = 0
+        view_token = _request_view.set(request.path)
+        try:
+            with capture_queries() as stats:
+                response = self.get_response(request)
+        finally:
+            _request_view.reset(view_token)
+        view = request.resolver_match.view_name if request.resolver_match is not None else "unresolved"
+        metrics.observe_request_queries(view=view, count=stats.count, duration=stats.duration)
+        self.check_query_patterns(view, stats, request.query_budget, stats.count - request.queries_before_view)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # NOTE: The budget covers the queries run from view dispatch until the response is returned, so session and
+        # authentication lookups made by earlier middleware do not count against it.
+        request.query_budget = get_view_query_budget(view_func)
+        request.queries_before_view = stats.count if (stats := get_request_query_stats()) is not None else 0
+        _request_view.set(request.resolver_match.view_name if request.resolver_match is not None else request.path)
+
+    @staticmethod
+    def check_query_patterns(view: str, stats: RequestQueryStats, budget: int | None, view_queries: int) -> None:
+        """
+        Flag repeated queries and enforce the view's query budget.
+
+        Args:
+            view (str): The name of the view that served the request.
+            stats (RequestQueryStats): The queries the request ran.
+            budget (int, optional): The view's declared query budget.
+            view_queries (int): The number of queries run from view dispatch onward.
+
+        Raises:
+            QueryBudgetExceeded: If the budget was exceeded and `QUERY_BUDGET_RAISE` is on.
+
+        """
+        for fingerprint, count, statement in stats.repeated_queries(settings.QUERY_N_PLUS_ONE_THRESHOLD):
+            metrics.increment_n_plus_one(view=view)
+            logger.warning(f"Possible N+1 in {view}: Query {fingerprint} Ran {count} Times - {statement}")
+        if budget is not None and view_queries > budget:
+            metrics.increment_query_budget_exceeded(view=view)
+            message = f"{view} Ran {view_queries} Queries - Budget is {budget}"
+            if settings.QUERY_BUDGET_RAISE:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase assertions for query budgets and N+1 patterns.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries: int, n_plus_one_threshold: int | None = None) -> Iterator[RequestQueryStats]:
+        """
+        Fail if the block runs more than `max_queries` queries, or repeats any query `n_plus_one_threshold` or more times.
+
+        Args:
+            max_queries (int): The maximum number of queries allowed.
+            n_plus_one_threshold (int, optional): Defaults to `QUERY_N_PLUS_ONE_THRESHOLD`.
+
+        Yields:
+            RequestQueryStats: The statistics of the queries run inside the block.
+
+        """
+        with capture_queries() as stats:
+            yield stats
+        repeated = stats.repeated_queries(n_plus_one_threshold or settings.QUERY_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            self.fail("Possible N+1 queries:\n" + "\n".join(f"{count} x {statement}" for _, count, statement in repeated))
+        if stats.count > max_queries:
+            statements = "\n".join(f"{count} x {fingerprint_sql(stats.statements[fingerprint])[1]}" for fingerprint, count in stats.fingerprints.most_common())
+            self.fail(f"{stats.count} queries executed, budget is {max_queries}:\n{statements}")
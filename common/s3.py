@@ -0,0 +1,100 @@
+"""
+Module: common.s3
+
+This module provides the process-wide S3 client used for every direct S3 call the application makes.
+
+Creating a boto3 client resolves credentials, loads the S3 service model and builds a fresh HTTP connection pool, so a
+client per upload pays that setup plus a new TLS handshake every time. boto3 clients are thread-safe, so each process
+instead creates one client on first use, from its own session, with a connection pool sized by
+`AWS_S3_MAX_POOL_CONNECTIONS` for concurrent uploads. The client is recreated after a fork, so Celery prefork and gunicorn
+workers never share their parent's sockets.
+
+File uploads go through boto3's managed transfer, tuned by `create_transfer_config`: files above the multipart
+threshold are split into parts uploaded concurrently over the shared connection pool.
+
+Functions:
+- create_s3_client: Builds a new S3 client from the AWS settings.
+- get_s3_client: Returns the process-wide S3 client, creating it on first use.
+- create_transfer_config: Builds the managed transfer configuration from the S3 upload settings.
+
+Settings:
+- AWS_S3_REGION_NAME (str), AWS_S3_ENDPOINT_URL (str), AWS_ACCESS_KEY_ID (str), AWS_SECRET_ACCESS_KEY (str): Where and as whom to connect.
+- AWS_S3_MAX_POOL_CONNECTIONS (int): The maximum number of HTTP connections each process keeps open to S3.
+- S3_MULTIPART_THRESHOLD (int): The file size, in bytes, from which uploads are split into parts.
+- S3_MULTIPART_PART_SIZE (int): The size of each part, in bytes.
+- S3_MAX_CONCURRENCY (int): The number of parts of one file uploaded at once. Capped by AWS_S3_MAX_POOL_CONNECTIONS.
+
+"""
+
+import os
+import threading
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.client import BaseClient, Config
+from django.conf import settings
+
+_s3_client: BaseClient | None = None
+_s3_client_pid: int | None = None
+_s3_client_lock = threading.Lock()
+
+
+def create_s3_client() -> BaseClient:
+    """
+    Build a new S3 client, from its own session, using the AWS settings.
+
+    Returns:
+        BaseClient: The S3 client.
+
+    """
+    session = boto3.session.Session()
+    return session.client(
+        "s3",
+        region_name=settings.AWS_S3_REGION_NAME,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        config=Config(max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS, tcp_keepalive=True, retries={"mode": "standard"}),
+    )
+
+
+def get_s3_client() -> BaseClient:
+    """
+    Return the process-wide S3 client, creating it on first use.
+
+    The client is recreated after a fork, so Celery prefork and gunicorn workers never reuse their parent's connections.
+
+    Returns:
+        BaseClient: The S3 client. It is safe to share between threads.
+
+    """
+    global _s3_client, _s3_client_pid
+    if _s3_client is not None and _s3_client_pid == os.getpid():
+        return _s3_client
+    with _s3_client_lock:
+        if _s3_client is None or _s3_client_pid != os.getpid():
+            _s3_client = create_s3_client()
+            _s3_client_pid = os.getpid()
+    return _s3_client
+
+
+def create_transfer_config(multipart_threshold: int | None = None, multipart_chunksize: int | None = None, max_concurrency: int | None = None) -> TransferConfig:
+    """
+    Build the managed transfer configuration for file uploads from the S3 upload settings.
+
+    Args:
+        multipart_threshold (int | None): Overrides `S3_MULTIPART_THRESHOLD`.
+        multipart_chunksize (int | None): Overrides `S3_MULTIPART_PART_SIZE`.
+        max_concurrency (int | None): Overrides `S3_MAX_CONCURRENCY`.
+
+    Returns:
+        TransferConfig: The transfer configuration. Concurrency never exceeds the client's connection pool, so parts never
+        wait on a connection.
+
+    """
+    return TransferConfig(
+        multipart_threshold=multipart_threshold or settings.S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=multipart_chunksize or settings.S3_MULTIPART_PART_SIZE,
+        max_concurrency=min(max_concurrency or settings.S3_MAX_CONCURRENCY, settings.AWS_S3_MAX_POOL_CONNECTIONS),
+        use_threads=True,
+    )
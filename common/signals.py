@@ -14,13 +14,13 @@ import contextlib
 from collections.abc import Callable
 from uuid import uuid4
 
-from django.db.backends.signals import connection_created
 from django.db.models import signals
 from loguru import logger
 
 from applications.authentication.models import UserProfile
 from applications.compliance.models import Compliance
 from applications.employee.models import Employee
+from common.middleware.password_change import clear_force_password_change
 
 
 # SECTION - User Management Signals
@@ -67,6 +67,7 @@ def password_change_signal(sender, instance, **kwargs) -> None:
             profile = UserProfile.objects.get(user=instance)
             profile.force_password_change = False
             profile.save()
+            clear_force_password_change(instance.pk)
 
 
 def employee_terminated_signal(sender, instance, **kwargs) -> None:
@@ -93,27 +94,6 @@ def employee_terminated_signal(sender, instance, **kwargs) -> None:
             # TODO: Complete Storage Set up AND then implement profile archival
 
 
-def log_database_queries(sender, connection, **kwargs):
-    """
-    Log database queries.
-
-    This function logs the creation of database connections and the execution of SQL queries.
-    It attaches a wrapper function to the connection's `execute_wrapper` method to log query details.
-
-    Args:
-        sender: The sender of the signal.
-        connection: The database connection object.
-        **kwargs: Additional keyword arguments.
-
-    """
-    logger.log("DATABASE_QUERY", f"Database connection created: {connection.settings_dict}")
-
-    def log_query(sql, params=None):
-        logger.log("DATABASE_QUERY", "Executing SQL Query: {sql} | Params: {params}")
-
-    connection.execute_wrapper(log_query)
-
-
 signals.pre_save.connect(employee_terminated_signal, sender=Employee, dispatch_uid="employee.models")
 
 
@@ -128,6 +108,3 @@ signals.post_save.connect(
     sender=Employee,
     dispatch_uid=f"employee.models + {str(uuid4())}",
 )
-
-
-connection_created.connect(log_database_queries)
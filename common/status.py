@@ -4,7 +4,6 @@ import os
 import secrets
 import time
 
-import boto3
 import requests
 from django.conf import settings
 from django.core.mail import EmailMessage
@@ -13,6 +12,8 @@ from health_check.backends import BaseHealthCheckBackend
 from health_check.exceptions import ServiceUnavailable
 from loguru import logger
 
+from common.s3 import get_s3_client
+
 Faker.seed(time.time())
 mock_data = Faker()
 
@@ -158,8 +159,7 @@ class CloudObjectStorageBackend(BaseHealthCheckBackend):
     def check_s3_health(self):
         """Check the health of an S3 bucket."""
         try:
-            s3 = boto3.client("s3", region_name=settings.AWS_S3_REGION_NAME, aws_access_key_id=settings.AWS_ACCESS_KEY_ID, aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY)
-            s3.head_bucket(Bucket=settings.AWS_STORAGE_BUCKET_NAME)
+            get_s3_client().head_bucket(Bucket=settings.AWS_STORAGE_BUCKET_NAME)
             return {"s3": "healthy"}
         except Exception as e:
             logger.error(f"S3 health check failed: {e}")
@@ -5,47 +5,69 @@ This module contains classes and functions related to handling file uploads and
 
 Classes:
 - FileValidationError: Custom exception for file validation errors.
-- UploadHandler: Class for handling file uploads to S3 with customized file naming.
-- ProgressPercentage: Class for tracking upload progress.
+- UploadHandler: Class for handling file uploads to S3 with customized file naming, and presigned direct uploads.
+- PresignedUpload: A presigned POST letting the browser upload one file straight to S3.
 - S3HANDLER: Class for uploading and downloading files to and from S3.
 
 Functions:
-- S3HANDLER.upload_file_to_s3: Uploads a file to an S3 bucket.
+- S3HANDLER.upload_file_to_s3: Uploads a file to an S3 bucket, in concurrent parts above the multipart threshold.
+- S3HANDLER.stream_to_s3: Streams the body of a URL into an S3 object in bounded parts, without touching local disk.
 - S3HANDLER.generate_filename: Generates a filename based on payload data.
-- S3HANDLER.download_pdf_file: Downloads a PDF file from a URL and uploads it to S3.
+- S3HANDLER.download_pdf_file: Streams a signed PDF from DocuSeal into S3.
+- S3HANDLER.confirm_direct_upload: Verifies a presigned direct upload and returns the FileField name it was stored under.
 
 Usage:
 Import the module and utilize the classes and functions for handling file uploads and downloads to and from an S3 bucket.
 
 """
 
+import base64
+import hashlib
+import mimetypes
 import os
-import sys
-import threading
+import time
+import uuid
+from typing import NamedTuple
 
-import boto3
 import requests
+from boto3.s3.transfer import TransferConfig
 from botocore.exceptions import ClientError
 from django.conf import settings
+from django.core import signing
 from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadhandler import FileUploadHandler
 from django.utils.deconstruct import deconstructible
 from loguru import logger
 
+from common.documents import get_document_registry, get_document_type
 from common.metrics import metrics
+from common.s3 import create_transfer_config, get_s3_client
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_REQUEST_TIMEOUT = 30
+PRIVATE_LOCATION = "restricted"  # NOTE: PrivateMediaStorage.location, which FileField names are relative to
+DIRECT_UPLOAD_SALT = "common.upload.direct-upload"
+
+
+class FileValidationError(Exception):
+    pass
+
+
+class PresignedUpload(NamedTuple):
+    url: str
+    fields: dict[str, str]
+    token: str
 
 
 @deconstructible
 class UploadHandler(FileUploadHandler):
     def __init__(self, upload_type):
         self.s3_path = upload_type
-        self.s3_client = boto3.client(
-            "s3",
-            region_name=os.environ["AWS_S3_REGION_NAME"],
-            endpoint_url=os.environ["AWS_S3_ENDPOINT_URL"],
-            aws_access_key_id=os.environ["AWS_SES_ACCESS_KEY_ID"],
-            aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
-        )
+
+    @property
+    def s3_client(self):
+        # NOTE: Handlers are built when model modules are imported, before workers fork, so the client is looked up on use.
+        return get_s3_client()
 
     def receive_data_chunk(self, raw_data, start):
         pass
@@ -73,37 +95,58 @@ class UploadHandler(FileUploadHandler):
         logger.debug(final_path)
         return final_path
 
-    def __eq__(self, other):
-        return isinstance(other, UploadHandler) and self.s3_path == other.s3_path
+    def presign_upload(self, instance, content_type: str, max_size: int, scope: str) -> PresignedUpload:
+        """
+        Issue a short-lived presigned POST letting the browser upload one file straight to S3, bypassing the web workers.
 
+        The policy only accepts the object `generate_randomized_file_name` names for the uploader, suffixed with a random
+        UUID so an issued policy cannot overwrite another upload, with the declared content type and at most `max_size`
+        bytes. The returned token names that object and is needed to confirm it.
 
-class ProgressPercentage:
+        Args:
+            instance: The uploader, or the record the file belongs to, with a `first_name` and `last_name`.
+            content_type (str): The content type of the file, which also decides its extension.
+            max_size (int): The maximum size of the file in bytes.
+            scope (str): What the upload is for. The token is only accepted when confirming the same scope.
 
-    def __init__(self, filename):
-        self._filename = filename
-        self._size = float(os.path.getsize(filename))
-        self._seen_so_far = 0
-        self._lock = threading.Lock()
+        Returns:
+            PresignedUpload: The URL and form fields to POST the file with, and the confirmation token.
 
-    def __call__(self, bytes_amount):
-        # To simplify, assume this is hooked up to a single filename
-        with self._lock:
-            self._seen_so_far += bytes_amount
-            percentage = (self._seen_so_far / self._size) * 100
-            sys.stdout.write(f"\r{self._filename}  {self._seen_so_far} / {self._size}  ({percentage:.2f}%)")
-            sys.stdout.flush()
+        """
+        stem, extension = os.path.splitext(self.generate_randomized_file_name(instance, f"upload{mimetypes.guess_extension(content_type) or '.bin'}"))
+        name = f"{stem}_{uuid.uuid4().hex}{extension}"
+        presigned_post = self.s3_client.generate_presigned_post(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Key=os.path.join(PRIVATE_LOCATION, name),
+            Fields={"acl": "private", "Content-Type": content_type},
+            Conditions=[{"acl": "private"}, {"Content-Type": content_type}, ["content-length-range", 1, max_size]],
+            ExpiresIn=settings.S3_PRESIGNED_UPLOAD_TTL,
+        )
+        token = signing.dumps({"name": name, "scope": scope, "content_type": content_type, "max_size": max_size}, salt=DIRECT_UPLOAD_SALT)
+        return PresignedUpload(presigned_post["url"], presigned_post["fields"], token)
+
+    def __eq__(self, other):
+        return isinstance(other, UploadHandler) and self.s3_path == other.s3_path
+
+
+class StreamedUpload(NamedTuple):
+    object_name: str
+    size: int
+    sha256: str | None
 
 
 class S3HANDLER(FileSystemStorage):
     @staticmethod
     @metrics.s3_upload_recorder.time()
-    def upload_file_to_s3(file_name, bucket: str = settings.AWS_STORAGE_BUCKET_NAME, object_name=None) -> bool:
+    def upload_file_to_s3(file_name, bucket: str = settings.AWS_STORAGE_BUCKET_NAME, object_name=None, transfer_config: TransferConfig | None = None, content_type: str | None = None) -> bool:
         """
         Upload a file to an S3 bucket
         Args:
             file_name: File to upload
             bucket: Bucket to upload to
             object_name: S3 object name. If not specified then file_name is used
+            transfer_config: Multipart threshold, part size and concurrency. If not specified then the S3 upload settings are used
+            content_type: The Content-Type to store the object with. If not specified then S3's default is used
         Returns:
             bool  - True if file was uploaded, else False
         """
@@ -112,74 +155,148 @@ class S3HANDLER(FileSystemStorage):
             logger.debug(object_name)
             logger.debug(file_name)
 
-        # Upload the file
-        s3_client = boto3.client(
-            "s3",
-            region_name=os.environ["AWS_S3_REGION_NAME"],
-            endpoint_url=os.environ["AWS_S3_ENDPOINT_URL"],
-            aws_access_key_id=os.environ["AWS_ACCESS_KEY_ID"],
-            aws_secret_access_key=os.environ["AWS_SECRET_ACCESS_KEY"],
-        )
+        # NOTE: Progress is counted into Prometheus from the transfer's worker threads; nothing is written per chunk.
+        size = os.path.getsize(file_name)
+        start = time.perf_counter()
         try:
-            s3_client.upload_file(file_name, bucket, object_name, Callback=ProgressPercentage(file_name))
-            return True
+            extra_args = {"ContentType": content_type} if content_type else None
+            get_s3_client().upload_file(file_name, bucket, object_name, ExtraArgs=extra_args, Callback=metrics.increment_s3_upload_bytes, Config=transfer_config or create_transfer_config())
         except ClientError:
             return False
+        metrics.observe_s3_upload(size, time.perf_counter() - start)
+        return True
 
     @staticmethod
-    def get_doc_type(document_id: int) -> str:
-        match document_id:
-            case 90907:
-                return "do_not_drive_agreement_attestation"
-            case 101305:
-                return "state_w4_attestation"
-            case 91067:
-                return "dha_i9"
-            case 90909:
-                return "hca_policy_attestation"
-            case 90908:
-                return "doa_agency_policies_attestation"
-            case 90910:
-                return "job_duties_attestation"
-            case 116255:
-                return "idph_background_check_authorization"
-            case _:
-                return "unknown"
+    def stream_to_s3(url: str, object_name: str, bucket: str = settings.AWS_STORAGE_BUCKET_NAME, part_size: int | None = None, checksum: bool = True) -> StreamedUpload:
+        """
+        Stream the body of a URL into an S3 object, holding at most one part in memory and never writing to local disk.
+
+        Bodies that fit in a single part are stored with one `PutObject`; larger bodies are sent as a multipart upload,
+        which is aborted if the download or any part fails.
+
+        Args:
+            url: The URL to download.
+            object_name: The S3 object name.
+            bucket: The bucket to upload to.
+            part_size: The size in bytes of each multipart part. Defaults to `S3_MULTIPART_PART_SIZE`; S3 requires at least 5 MiB.
+            checksum: Whether to compute the SHA-256 of the body on the fly and send a Content-MD5 with every part, so S3 rejects corrupted parts.
+
+        Returns:
+            StreamedUpload: The object name, the size in bytes and, if `checksum` is set, the hex SHA-256 of the body.
+
+        Raises:
+            requests.RequestException: If the download fails.
+            ClientError: If the upload fails.
+
+        """
+        part_size = part_size or settings.S3_MULTIPART_PART_SIZE
+        s3_client = get_s3_client()
+        digest = hashlib.sha256() if checksum else None
+        size = 0
+        upload_id = None
+        parts: list[dict] = []
+        buffer = bytearray()
+
+        def part_arguments(body: bytes) -> dict:
+            arguments = {"Bucket": bucket, "Key": object_name, "Body": body}
+            if checksum:
+                arguments["ContentMD5"] = base64.b64encode(hashlib.md5(body, usedforsecurity=False).digest()).decode()
+            return arguments
+
+        def upload_part(body: bytes) -> None:
+            response = s3_client.upload_part(UploadId=upload_id, PartNumber=len(parts) + 1, **part_arguments(body))
+            parts.append({"ETag": response["ETag"], "PartNumber": len(parts) + 1})
+
+        with requests.get(url, stream=True, timeout=STREAM_REQUEST_TIMEOUT) as response:
+            response.raise_for_status()
+            try:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    size += len(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+                    buffer += chunk
+                    while len(buffer) >= part_size:
+                        if upload_id is None:
+                            upload_id = s3_client.create_multipart_upload(Bucket=bucket, Key=object_name, ContentType="application/pdf")["UploadId"]
+                        upload_part(bytes(buffer[:part_size]))
+                        del buffer[:part_size]
+                if upload_id is None:
+                    s3_client.put_object(ContentType="application/pdf", **part_arguments(bytes(buffer)))
+                else:
+                    if buffer:
+                        upload_part(bytes(buffer))
+                    s3_client.complete_multipart_upload(Bucket=bucket, Key=object_name, UploadId=upload_id, MultipartUpload={"Parts": parts})
+            except Exception:
+                if upload_id is not None:
+                    s3_client.abort_multipart_upload(Bucket=bucket, Key=object_name, UploadId=upload_id)
+                raise
+        logger.debug(f"Streamed {size} Bytes From {url} to {bucket}/{object_name} in {max(len(parts), 1)} Part(s)")
+        return StreamedUpload(object_name, size, digest.hexdigest() if digest is not None else None)
+
+    @staticmethod
+    def confirm_direct_upload(token: str, scope: str) -> str:
+        """
+        Verify that a presigned direct upload reached S3 within its limits.
+
+        Args:
+            token (str): The token issued with the presigned POST.
+            scope (str): What the upload is for. It must match the scope the token was issued for.
+
+        Returns:
+            str: The FileField name the file was stored under.
+
+        Raises:
+            FileValidationError: If the token is invalid, expired or for another scope, or the stored object is missing,
+                too large or of another content type.
+
+        """
+        try:
+            # NOTE: S3 checks the policy when the upload starts, so an upload may finish after the policy expires.
+            upload = signing.loads(token, salt=DIRECT_UPLOAD_SALT, max_age=settings.S3_PRESIGNED_UPLOAD_TTL * 2)
+        except signing.BadSignature as e:
+            raise FileValidationError("Invalid or expired upload token") from e
+        if upload["scope"] != scope:
+            raise FileValidationError("Upload token was issued for another upload")
+        try:
+            stored = get_s3_client().head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=os.path.join(PRIVATE_LOCATION, upload["name"]))
+        except ClientError as e:
+            raise FileValidationError("File was not uploaded") from e
+        if stored["ContentLength"] > upload["max_size"] or stored.get("ContentType") != upload["content_type"]:
+            raise FileValidationError("Uploaded file does not match the upload policy")
+        return upload["name"]
 
     @staticmethod
-    def generate_filename(payload: dict) -> str:
-        employee_upload_suffix = f"{payload['data']['metadata']['last_name'].lower()}_{payload['data']['metadata']['first_name'].lower()}.pdf"
-        document_id = payload["data"]["template"]["id"]
-        doc_type_prefix = S3HANDLER.get_doc_type(document_id)
+    def get_doc_type(document_id: int) -> str:
+        if (document_type := get_document_registry().by_template_id.get(document_id)) is None:
+            return "unknown"
+        return document_type.doc_type
 
-        path = os.path.join("restricted", "attestations", doc_type_prefix)
-        os.makedirs(path, exist_ok=True)
-        return os.path.join(path, f"{doc_type_prefix}_{employee_upload_suffix}")
+    @staticmethod
+    def generate_filename(payload: dict, document_index: int = 0) -> str:
+        employee_upload_suffix = f"{payload['data']['metadata']['last_name'].lower()}_{payload['data']['metadata']['first_name'].lower()}"
+        employee_upload_suffix += f"-{document_index + 1}.pdf" if document_index else ".pdf"
+        if (document_type := get_document_type(payload["data"]["template"])) is None:
+            return os.path.join("restricted", "attestations", "unknown", f"unknown_{employee_upload_suffix}")
+        return os.path.join(document_type.s3_prefix, f"{document_type.doc_type}_{employee_upload_suffix}")
 
     @staticmethod
     @metrics.docuseal_download_recorder.time()
     def download_pdf_file(payload: dict) -> bool:
         """
-        Download PDF from given URL to local directory.
+        Stream a signed PDF from DocuSeal into S3.
 
-        :param url: The url of the PDF file to be downloaded
-        :return: True if PDF file was successfully downloaded, otherwise False.
-        """
+        Args:
+            payload: The DocuSeal webhook payload.
 
-        # Request URL and get response object
-        response = requests.get(payload["data"]["documents"][0]["url"], stream=True, timeout=30)
+        Returns:
+            bool: True if the PDF was stored in S3, otherwise False.
 
-        # isolate PDF filename from URL
+        """
         pdf_file_name = S3HANDLER.generate_filename(payload)
-
-        if response.status_code == 200:
-            # Save in current working directory
-            with open(pdf_file_name, "wb+") as pdf_object:
-                pdf_object.write(response.content)
-                S3HANDLER.upload_file_to_s3(pdf_file_name)
-                logger.info(f"{pdf_file_name} was successfully saved!")
-                return True
-        else:
-            print(f"Uh oh! Could not download {pdf_file_name},")
-            print(f"HTTP response status code: {response.status_code}")
+        try:
+            upload = S3HANDLER.stream_to_s3(payload["data"]["documents"][0]["url"], pdf_file_name)
+        except (requests.RequestException, ClientError) as e:
+            logger.error(f"Could not transfer {pdf_file_name} to object storage: {e}")
             return False
+        logger.info(f"{pdf_file_name} ({upload.size} bytes, sha256 {upload.sha256}) was successfully saved!")
+        return True
@@ -83,6 +83,28 @@ class Base(Configuration):
     # SECTION - Database and Caching
     CACHE_TTL: int = int(os.environ["TIME_TO_LIVE_MINUTES"]) * 60
     QUERYSET_TTL: int = int(os.environ["QUERYSET_TTL"])
+    QUERYSET_CACHE_MAX_ROWS: int = int(os.environ.get("QUERYSET_CACHE_MAX_ROWS", 10_000))
+    QUERYSET_CACHE_MAX_BYTES: int = int(os.environ.get("QUERYSET_CACHE_MAX_BYTES", 1024 * 1024))
+    EXPORT_CHUNK_SIZE: int = int(os.environ.get("EXPORT_CHUNK_SIZE", 2000))  # rows fetched per round trip by streaming exports
+    QUERY_INSTRUMENTATION_ENABLED: bool = os.environ.get("QUERY_INSTRUMENTATION_ENABLED", "False").lower() in ("true", "1")
+    QUERY_SLOW_THRESHOLD_MS: float = float(os.environ.get("QUERY_SLOW_THRESHOLD_MS", 100))
+    QUERY_SLOW_SAMPLE_RATE: float = float(os.environ.get("QUERY_SLOW_SAMPLE_RATE", 1.0))
+    QUERY_SLOW_QUEUE_SIZE: int = 1000
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5  # executions of one query fingerprint per request before it is flagged
+    QUERY_BUDGET_RAISE: bool = False
+    FORCE_PASSWORD_CHANGE_CACHE_TTL: int = 60 * 15  # seconds; password changes clear the cached flag immediately
+    # NOTE: Cached API responses are evicted by dependency-aware generation bumps (see common.cache), so this can be long-lived.
+    VIEW_CACHE_TTL: int = int(os.environ.get("VIEW_CACHE_TTL", 60 * 60 * 6))
+    VIEW_CACHE_STALE_GRACE: int = int(os.environ.get("VIEW_CACHE_STALE_GRACE", 60 * 5))  # seconds a stale response may be served while it is recomputed
+    VIEW_CACHE_LOCK_TIMEOUT: int = 30  # seconds
+    VIEW_CACHE_LOCK_WAIT: float = 2.0  # seconds
+    VIEW_CACHE_EARLY_REFRESH_BETA: float = float(os.environ.get("VIEW_CACHE_EARLY_REFRESH_BETA", 1.0))  # 0 disables early refresh
+    # NOTE: Optional per-process LRU in front of Redis (see common.local_cache); requires a django-redis "default" cache for invalidation broadcasts.
+    LOCAL_CACHE_ENABLED: bool = os.environ.get("LOCAL_CACHE_ENABLED", "False").lower() in ("true", "1")
+    LOCAL_CACHE_MAX_ENTRIES: int = int(os.environ.get("LOCAL_CACHE_MAX_ENTRIES", 1024))
+    LOCAL_CACHE_MAX_BYTES: int = int(os.environ.get("LOCAL_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    LOCAL_CACHE_TTL: int = int(os.environ.get("LOCAL_CACHE_TTL", 30))  # seconds; bounds staleness if a broadcast is missed
+    LOCAL_CACHE_CHANNEL: str = "cache-invalidation"
     DEFAULT_AUTO_FIELD: str = "django.db.models.BigAutoField"
     HEALTHCHECK_CACHE_KEY: str = "cache-heartbeat"
     SESSION_ENGINE: str = "django.contrib.sessions.backends.cache"
@@ -91,6 +113,7 @@ class Base(Configuration):
     ENCRYPT_KEY: str = os.environ["ENCRYPT_KEY"]
     ENCRYPT_PRIVATE_KEY: str = os.environ["DB_GPG_PRIVATE_KEY"]
     ENCRYPT_PUBLIC_KEY: str = os.environ["DB_GPG_PUBLIC_KEY"]
+    BLIND_INDEX_KEY: str = os.environ.get("BLIND_INDEX_KEY", SECRET_KEY)  # changing this requires re-running backfill_blind_indexes
     REDIS_URL: str = os.environ["BASE_REDIS_CACHE_URI_TOKEN"]
 
     # Centralized Redis connection options
@@ -193,6 +216,70 @@ class Base(Configuration):
     AWS_QUERYSTRING_EXPIRE = 3600
     AWS_S3_FILE_OVERWRITE = True
     AWS_S3_ENDPOINT_URL = "https://nyc3.digitaloceanspaces.com"
+    AWS_S3_MAX_POOL_CONNECTIONS: int = 25  # HTTP connections each process keeps open to S3 (see common.s3)
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # bytes per part of multipart uploads and per buffer when streaming downloads into S3; S3 requires at least 5 MiB
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024  # file size in bytes from which uploads are split into concurrently uploaded parts
+    S3_MAX_CONCURRENCY: int = 16  # parts of one file uploaded at once; kept within AWS_S3_MAX_POOL_CONNECTIONS
+    S3_PRESIGNED_UPLOAD_TTL: int = 300  # seconds a presigned direct-to-S3 upload policy stays valid
+    S3_DIRECT_UPLOAD_MAX_SIZE: int = 25 * 1024 * 1024  # bytes; the largest compliance verification file accepted by direct upload
+    RESUME_PRESIGN_RATE_LIMIT: int = 10  # presigned resume uploads one client address may request per RESUME_PRESIGN_RATE_WINDOW
+    RESUME_PRESIGN_RATE_WINDOW: int = 60 * 60  # seconds
+    DOCUSEAL_IDEMPOTENCY_TTL: int = 60 * 60 * 24 * 7  # seconds a received webhook is remembered, so DocuSeal retries are not ingested twice
+    DOCUMENT_THUMBNAIL_WIDTH: int = 320  # pixels; first-page thumbnails shown on compliance pages instead of the full PDF
+    DOCUMENT_DERIVATIVE_SPOOL_MAX_SIZE: int = 16 * 1024 * 1024  # bytes; larger signed documents are spooled to disk rather than held in memory while rendering derivatives
+    # NOTE: The registry of signed documents (see common.documents). A new DocuSeal template only needs an entry here.
+    DOCUSEAL_DOCUMENT_TYPES: list[dict[str, Any]] = [
+        {
+            "template_id": 90907,
+            "template_name": "Nett Hands - Do Not Drive Agreement - 2024",
+            "doc_type": "do_not_drive_agreement_attestation",
+            "employee_field": "do_not_drive_agreement_attestation",
+        },
+        {
+            "template_id": 101305,
+            "template_name": "State of Illinois - Department of Revenue - Withholding Worksheet (W4)",
+            "doc_type": "state_w4_attestation",
+            "employee_field": "state_w4_attestation",
+        },
+        {
+            "template_id": None,
+            "template_name": "US Internal Revenue Services - Withholding Certificate (W4) - 2024",
+            "doc_type": "irs_w4_attestation",
+            "employee_field": "irs_w4_attestation",
+        },
+        {
+            "template_id": 91067,
+            "template_name": "US Department of Homeland Security - Employment Eligibility Verification (I-9)",
+            "doc_type": "dhs_i9",
+            "employee_field": "dhs_i9",
+            # NOTE: I-9s signed before the doc_type rename are stored under dha_i9, so the prefix is kept and no object moves.
+            "s3_prefix": "restricted/attestations/dha_i9",
+        },
+        {
+            "template_id": 90909,
+            "template_name": "Nett Hands HCA Policy - 2024",
+            "doc_type": "hca_policy_attestation",
+            "employee_field": "hca_policy_attestation",
+        },
+        {
+            "template_id": 90908,
+            "template_name": "Nett Hands & Illinois Department of Aging General Policies",
+            "doc_type": "doa_agency_policies_attestation",
+            "employee_field": "idoa_agency_policies_attestation",
+        },
+        {
+            "template_id": 90910,
+            "template_name": "Nett Hands Homehealth Care Aide (HCA)  Job Desc - 2024",
+            "doc_type": "job_duties_attestation",
+            "employee_field": "job_duties_attestation",
+        },
+        {
+            "template_id": 116255,
+            "template_name": "IDPH - Health Care Worker Background Check Authorization",
+            "doc_type": "idph_background_check_authorization",
+            "employee_field": "idph_background_check_authorization",
+        },
+    ]
     STATIC_LOCATION = "static/production"
     STATIC_URL = f"https://{AWS_S3_CUSTOM_DOMAIN}/{STATIC_LOCATION}/"
     STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
@@ -331,6 +418,12 @@ class Base(Configuration):
     CELERY_TASK_ACKS_LATE: bool = True
     CELERY_TASK_REJECT_ON_WORKER_LOST: bool = True
     CELERY_WORKER_PREFETCH_MULTIPLIER: int = 1
+    # NOTE: Outbound email is delivered by workers consuming MAIL_QUEUE (see common.mail_queue), so SMTP latency never reaches a request.
+    MAIL_QUEUE: str = "mail"
+    MAIL_BATCH_SIZE: int = 50  # messages delivered per task over one SMTP connection
+    MAIL_RATE_LIMIT_PER_SECOND: int = int(os.environ.get("MAIL_RATE_LIMIT_PER_SECOND", 10))
+    MAIL_BULK_CHECKPOINT_TTL: int = 60 * 60 * 24 * 7  # seconds a bulk send's progress is kept, so a redelivered task resumes instead of starting over
+    CELERY_TASK_ROUTES: dict[str, dict[str, str]] = {"common.mail_queue.send_queued_emails": {"queue": MAIL_QUEUE}, "common.mail_queue.send_bulk_emails": {"queue": MAIL_QUEUE}}
     # !SECTION
 
 
@@ -429,6 +522,7 @@ class Production(Base):
 
     MIDDLEWARE: list[str] = [
         "django_prometheus.middleware.PrometheusBeforeMiddleware",  # 1
+        "common.query_instrumentation.QueryInstrumentationMiddleware",
         "django.middleware.security.SecurityMiddleware",  # W2
         "whitenoise.middleware.WhiteNoiseMiddleware",  # 3
         "django.contrib.sessions.middleware.SessionMiddleware",  # 4
@@ -437,6 +531,7 @@ class Production(Base):
         "django.middleware.common.CommonMiddleware",  # 7
         "django.middleware.csrf.CsrfViewMiddleware",  # 8
         "django.contrib.auth.middleware.AuthenticationMiddleware",  # 9
+        "common.encryption.DecryptedValueCacheMiddleware",
         "allauth.account.middleware.AccountMiddleware",  # 9.1
         "defender.middleware.FailedLoginMiddleware",  # 10
         "django_require_login.middleware.LoginRequiredMiddleware",  # 11
@@ -661,6 +756,7 @@ class Development(Base):
     MIDDLEWARE: list[str] = [
         "kolo.middleware.KoloMiddleware",
         "django_prometheus.middleware.PrometheusBeforeMiddleware",  # 1
+        "common.query_instrumentation.QueryInstrumentationMiddleware",
         "django.middleware.security.SecurityMiddleware",  # 2
         "whitenoise.middleware.WhiteNoiseMiddleware",  # 3
         "django.contrib.sessions.middleware.SessionMiddleware",  # 4
@@ -670,6 +766,7 @@ class Development(Base):
         "django.middleware.common.CommonMiddleware",  # 7
         "django.middleware.csrf.CsrfViewMiddleware",  # 8
         "django.contrib.auth.middleware.AuthenticationMiddleware",  # 9
+        "common.encryption.DecryptedValueCacheMiddleware",
         "allauth.account.middleware.AccountMiddleware",  # 9.1
         "defender.middleware.FailedLoginMiddleware",  # 10
         # "django_require_login.middleware.LoginRequiredMiddleware",  # 11 - TEMPORARILY DISABLED
@@ -679,7 +776,6 @@ class Development(Base):
         "django_prometheus.middleware.PrometheusAfterMiddleware",  # 16
         "django.middleware.cache.FetchFromCacheMiddleware",
         "django_minify_html.middleware.MinifyHtmlMiddleware",
-        "common.middleware.database_logger.LogDatabaseQueriesMiddleware",
         # 17 (moved to the end)
         # "nhhc.middleware.maintenance.MaintenanceModeMiddleware",   # Uncomment if needed
     ]
@@ -746,6 +842,8 @@ class Development(Base):
         compression="zip",
     )
     REQUEST_LOG_USER: bool = True
+    QUERY_INSTRUMENTATION_ENABLED: bool = True
+    QUERY_SLOW_THRESHOLD_MS: float = 0  # log every query in development
     PROMETHEUS_METRIC_NAMESPACE: str = "development_care_nett"
     DEBUG_TOOLBAR_PANELS: list[str] = [
         "debug_toolbar.panels.history.HistoryPanel",
@@ -848,6 +946,9 @@ class Testing(Base):
     # !SECTION
     # SECTION - Basic Application Definition
     KOLO_DISABLE: bool = not DEBUG
+    QUERY_INSTRUMENTATION_ENABLED: bool = True
+    QUERY_SLOW_THRESHOLD_MS: float = 1000
+    QUERY_BUDGET_RAISE: bool = True  # views that exceed their query_budget fail the test suite
     RECAPTCHA_PUBLIC_KEY: str = "6LeIxAcTAMARAJcZVRqyHh71UMIEGNQ_MXjiZKhI"
     RECAPTCHA_PRIVATE_KEY: str = "6LeIxAcTAAAAAGG-vFI1TnRWxMZNFuojJ4WifJWe"
     # SECTION - Email Communication
@@ -911,6 +1012,7 @@ class Testing(Base):
 
     MIDDLEWARE: list[str] = [
         "django_prometheus.middleware.PrometheusBeforeMiddleware",  # 1
+        "common.query_instrumentation.QueryInstrumentationMiddleware",
         "django.middleware.security.SecurityMiddleware",  # 2
         "whitenoise.middleware.WhiteNoiseMiddleware",  # 3
         "django.contrib.sessions.middleware.SessionMiddleware",  # 4
@@ -919,6 +1021,7 @@ class Testing(Base):
         "django.middleware.common.CommonMiddleware",  # 7
         "django.middleware.csrf.CsrfViewMiddleware",  # 8
         "django.contrib.auth.middleware.AuthenticationMiddleware",  # 9
+        "common.encryption.DecryptedValueCacheMiddleware",
         "allauth.account.middleware.AccountMiddleware",  # 9.1
         "defender.middleware.FailedLoginMiddleware",  # 10
         "django_require_login.middleware.LoginRequiredMiddleware",  # 11
@@ -0,0 +1,70 @@
+// SECTION - Direct-to-S3 Uploads
+// File inputs with data-presign-url and data-confirm-url upload straight to object storage. The server only signs the
+// upload and confirms it, so the file never passes through the application. data-presign-from lists other fields of
+// the form to send with the presign request.
+
+function getCsrfToken() {
+  const cookie = document.cookie.split('; ').find((row) => row.startsWith('csrftoken='))
+  return cookie ? decodeURIComponent(cookie.split('=')[1]) : ''
+}
+
+async function postJson(url, body) {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken() },
+    body: JSON.stringify(body),
+  })
+  const payload = await response.json()
+  if (!response.ok) {
+    throw new Error(payload.error || response.statusText)
+  }
+  return payload
+}
+
+function showUploadStatus(input, message, failed = false) {
+  let status = input.parentElement.querySelector('.direct-upload-status')
+  if (!status) {
+    status = document.createElement('small')
+    status.className = 'direct-upload-status form-text'
+    input.parentElement.appendChild(status)
+  }
+  status.textContent = message
+  status.classList.toggle('text-danger', failed)
+}
+
+async function uploadDirectly(event) {
+  const input = event.target
+  const file = input.files[0]
+  if (!file) {
+    return
+  }
+  event.stopImmediatePropagation()
+  const request = { field: input.name, content_type: file.type }
+  for (const name of (input.dataset.presignFrom || '').split(',').filter(Boolean)) {
+    request[name] = input.form.elements[name].value
+  }
+  try {
+    showUploadStatus(input, `Uploading ${file.name}...`)
+    const presigned = await postJson(input.dataset.presignUrl, request)
+    const upload = new FormData()
+    Object.entries(presigned.fields).forEach(([key, value]) => upload.append(key, value))
+    upload.append('file', file)
+    const stored = await fetch(presigned.url, { method: 'POST', body: upload })
+    if (!stored.ok) {
+      throw new Error('The file was rejected by storage')
+    }
+    await postJson(input.dataset.confirmUrl, { field: input.name, token: presigned.token })
+    // NOTE: The file is stored; clearing the input keeps it out of the form submission.
+    input.value = ''
+    showUploadStatus(input, `${file.name} uploaded`)
+  } catch (error) {
+    input.value = ''
+    showUploadStatus(input, `Upload failed: ${error.message}`, true)
+  }
+}
+
+document.querySelectorAll('input[type=file][data-presign-url]').forEach((input) => {
+  input.addEventListener('change', uploadDirectly, { capture: true })
+})
+
+// !SECTION